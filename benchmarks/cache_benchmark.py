@@ -0,0 +1,80 @@
+"""
+Benchmark of the lookups of the code cache.
+
+Fills a cache with 100k entries, with keys as long as real conversations, and
+measures the time of `Cache.get` against a lookup in the legacy layout, which
+stored the full keys without any index.
+
+Usage:
+    python benchmarks/cache_benchmark.py [--entries 100000] [--lookups 1000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from pandasai.core.cache import Cache
+
+
+def fill(cache: Cache, entries: int, key_length: int) -> list:
+    padding = "x" * key_length
+    keys = [f"{index}: {padding}" for index in range(entries)]
+    entries_df = pd.DataFrame(
+        {
+            "key_hash": [cache.hashed_key(key) for key in keys],
+            "value": [f"result = {index}" for index in range(entries)],
+            "key": [cache.versioned_key(key) for key in keys],
+        }
+    )
+    cache.backend.connection.register("benchmark_entries", entries_df)
+    cache.backend.connection.execute(
+        "INSERT INTO cache_entries (key_hash, value) "
+        "SELECT key_hash, value FROM benchmark_entries"
+    )
+    cache.backend.connection.execute(
+        "CREATE TABLE legacy_cache AS SELECT key, value FROM benchmark_entries"
+    )
+    cache.backend.connection.unregister("benchmark_entries")
+    return keys
+
+
+def measure(lookup, keys: list) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        assert lookup(key) is not None
+    return (time.perf_counter() - start) / len(keys) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    parser.add_argument("--key-length", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = Cache(filename="benchmark", abs_path=cache_dir)
+        keys = fill(cache, args.entries, args.key_length)
+        sample = random.sample(keys, min(args.lookups, len(keys)))
+
+        def legacy_get(key):
+            row = cache.backend.connection.execute(
+                "SELECT value FROM legacy_cache WHERE key=?",
+                [cache.versioned_key(key)],
+            ).fetchone()
+            return row[0] if row else None
+
+        indexed_ms = measure(cache.get, sample)
+        legacy_ms = measure(legacy_get, sample)
+        cache.destroy()
+
+    print(f"Entries: {args.entries}, lookups: {len(sample)}")
+    print(f"Cache.get (hashed primary key): {indexed_ms:.3f} ms/lookup")
+    print(f"Legacy full-key scan:           {legacy_ms:.3f} ms/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple, Union
 
 from pandasai.core.prompts.base import BasePrompt
 from pandasai.helpers.memory import Memory
@@ -37,7 +37,10 @@ class BaseOpenAI(LLM):
     # Configure a custom httpx client. See the
     # [httpx documentation](https://www.python-httpx.org/api/#client) for more details.
     http_client: Union[Any, None] = None
+    # The asynchronous client needs an asynchronous httpx client
+    async_http_client: Union[Any, None] = None
     client: Any
+    async_client: Any = None
     _is_chat_model: bool
 
     def _set_params(self, **kwargs):
@@ -109,6 +112,10 @@ class BaseOpenAI(LLM):
             "http_client": self.http_client,
         }
 
+    @property
+    def _async_client_params(self) -> Dict[str, any]:
+        return {**self._client_params, "http_client": self.async_http_client}
+
     def completion(self, prompt: str, memory: Memory) -> str:
         """
         Query the completion API
@@ -120,6 +127,13 @@ class BaseOpenAI(LLM):
             str: LLM response.
 
         """
+        params = self._get_completion_params(prompt, memory)
+
+        response = self.client.create(**params)
+
+        return response.choices[0].text
+
+    def _get_completion_params(self, prompt: str, memory: Memory) -> Dict[str, Any]:
         prompt = self.prepend_system_prompt(prompt, memory)
 
         params = {**self._invocation_params, "prompt": prompt}
@@ -127,11 +141,9 @@ class BaseOpenAI(LLM):
         if self.stop is not None:
             params["stop"] = [self.stop]
 
-        response = self.client.create(**params)
-
         self.last_prompt = prompt
 
-        return response.choices[0].text
+        return params
 
     def chat_completion(self, value: str, memory: Memory) -> str:
         """
@@ -144,6 +156,13 @@ class BaseOpenAI(LLM):
             str: LLM response.
 
         """
+        params = self._get_chat_completion_params(value, memory)
+
+        response = self.client.create(**params)
+
+        return response.choices[0].message.content
+
+    def _get_chat_completion_params(self, value: str, memory: Memory) -> Dict[str, Any]:
         messages = memory.to_openai_messages() if memory else []
 
         # adding current prompt as latest query message
@@ -162,9 +181,7 @@ class BaseOpenAI(LLM):
         if self.stop is not None:
             params["stop"] = [self.stop]
 
-        response = self.client.create(**params)
-
-        return response.choices[0].message.content
+        return params
 
     def call(self, instruction: BasePrompt, context: AgentState = None):
         """
@@ -189,3 +206,60 @@ class BaseOpenAI(LLM):
             if self._is_chat_model
             else self.completion(self.last_prompt, memory)
         )
+
+    def call_many(
+        self, instruction: BasePrompt, context: AgentState = None, n: int = 1
+    ) -> List[str]:
+        """
+        Call the OpenAI LLM once, requesting `n` choices with the `n` parameter.
+
+        Args:
+            instruction (BasePrompt): A prompt object with instruction for LLM.
+            context (AgentState): context to pass.
+            n (int): number of responses.
+
+        Returns:
+            List[str]: Responses
+        """
+        if n <= 1:
+            return [self.call(instruction, context)]
+
+        self.last_prompt = instruction.to_string()
+
+        memory = context.memory if context else None
+
+        if self._is_chat_model:
+            params = self._get_chat_completion_params(self.last_prompt, memory)
+            response = self.client.create(**{**params, "n": n})
+            return [choice.message.content for choice in response.choices]
+
+        params = self._get_completion_params(self.last_prompt, memory)
+        response = self.client.create(**{**params, "n": n})
+        return [choice.text for choice in response.choices]
+
+    async def acall(self, instruction: BasePrompt, context: AgentState = None):
+        """
+        Call the OpenAI LLM with the asynchronous client.
+
+        Args:
+            instruction (BasePrompt): A prompt object with instruction for LLM.
+            context (AgentState): context to pass.
+
+        Returns:
+            str: Response
+        """
+        if self.async_client is None:
+            return await super().acall(instruction, context)
+
+        self.last_prompt = instruction.to_string()
+
+        memory = context.memory if context else None
+
+        if self._is_chat_model:
+            params = self._get_chat_completion_params(self.last_prompt, memory)
+            response = await self.async_client.create(**params)
+            return response.choices[0].message.content
+
+        params = self._get_completion_params(self.last_prompt, memory)
+        response = await self.async_client.create(**params)
+        return response.choices[0].text
@@ -77,9 +77,15 @@ class OpenAI(BaseOpenAI):
         if model_name in self._supported_chat_models:
             self._is_chat_model = True
             self.client = openai.OpenAI(**self._client_params).chat.completions
+            self.async_client = openai.AsyncOpenAI(
+                **self._async_client_params
+            ).chat.completions
         elif model_name in self._supported_completion_models:
             self._is_chat_model = False
             self.client = openai.OpenAI(**self._client_params).completions
+            self.async_client = openai.AsyncOpenAI(
+                **self._async_client_params
+            ).completions
         else:
             raise UnsupportedModelError(self.model)
 
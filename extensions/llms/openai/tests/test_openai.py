@@ -1,5 +1,6 @@
 """Unit tests for the openai LLM class"""
 
+import asyncio
 import os
 from unittest import mock
 
@@ -138,3 +139,38 @@ class TestOpenAILLM:
 
         result = openai.call(instruction=prompt)
         assert result == "response"
+
+    def test_call_many_requests_n_choices(self, prompt):
+        openai = OpenAI(api_token="test", model="gpt-4")
+        response = OpenAIObject(
+            {
+                "choices": [
+                    OpenAIObject({"message": OpenAIObject({"content": content})})
+                    for content in ["a", "b", "c"]
+                ]
+            }
+        )
+        openai.client = mock.Mock(create=mock.Mock(return_value=response))
+
+        result = openai.call_many(instruction=prompt, n=3)
+
+        assert result == ["a", "b", "c"]
+        openai.client.create.assert_called_once()
+        assert openai.client.create.call_args.kwargs["n"] == 3
+
+    def test_acall_uses_async_client(self, prompt):
+        openai = OpenAI(api_token="test", model="gpt-4")
+        response = OpenAIObject(
+            {"choices": [OpenAIObject({"message": OpenAIObject({"content": "hi"})})]}
+        )
+        openai.async_client = mock.Mock(create=mock.AsyncMock(return_value=response))
+        openai.client = mock.Mock()
+
+        result = asyncio.run(openai.acall(instruction=prompt))
+
+        assert result == "hi"
+        openai.async_client.create.assert_awaited_once()
+        assert openai.async_client.create.call_args.kwargs["messages"] == [
+            {"role": "user", "content": "instruction"}
+        ]
+        openai.client.create.assert_not_called()
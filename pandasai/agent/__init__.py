@@ -1,3 +1,4 @@
 from .base import Agent
+from .batch import BatchResult
 
-__all__ = ["Agent"]
+__all__ = ["Agent", "BatchResult"]
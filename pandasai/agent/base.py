@@ -1,39 +1,111 @@
+import contextvars
+import copy
+import logging
+import os
+import threading
+import time
 import traceback
+import uuid
 import warnings
-from typing import Any, List, Optional, Union
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
+from sqlglot import exp
 
 from pandasai.core.cache import Cache
 from pandasai.core.code_execution.code_executor import CodeExecutor
 from pandasai.core.code_generation.base import CodeGenerator
 from pandasai.core.prompts import (
+    BasePrompt,
     get_chat_prompt_for_sql,
+    get_compact_correct_error_prompt,
     get_correct_error_prompt_for_sql,
     get_correct_output_type_error_prompt,
 )
+from pandasai.core.prompts.generate_python_code_with_sql import (
+    GeneratePythonCodeWithSQLPrompt,
+)
+from pandasai.core.response.base import BaseResponse
 from pandasai.core.response.error import ErrorResponse
 from pandasai.core.response.parser import ResponseParser
+from pandasai.core.result_cache import ResultCache
+from pandasai.core.semantic_cache import SemanticCache
+from pandasai.core.tracing import start_span, start_trace
 from pandasai.core.user_query import UserQuery
 from pandasai.dataframe.base import DataFrame
 from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
 from pandasai.exceptions import (
     CodeExecutionError,
+    InvalidConfigError,
     InvalidLLMOutputType,
     MissingVectorStoreError,
 )
+from pandasai.helpers.async_utils import run_in_thread
+from pandasai.helpers.error_trace import format_code_error
+from pandasai.helpers.memory import Memory
 from pandasai.sandbox import Sandbox
 from pandasai.vectorstores.vectorstore import VectorStore
 
 from .. import SqlQueryBuilder
 from ..config import Config
-from ..constants import LOCAL_SOURCE_TYPES
+from ..constants import (
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_CHART_DIRECTORY,
+    DEFAULT_CHART_PATH,
+    LOCAL_SOURCE_TYPES,
+    ROW_SAMPLING_DIALECTS,
+)
 from ..data_loader.duck_db_connection_manager import DuckDBConnectionManager
+from ..data_loader.sql_loader import memoize_data_versions
 from ..query_builders.base_query_builder import BaseQueryBuilder
 from ..query_builders.sql_parser import SQLParser
+from .batch import BatchResult
 from .state import AgentState
 
+# Set while executing a code candidate, to stop it once another one succeeded
+_candidate_cancelled: "contextvars.ContextVar[Optional[threading.Event]]" = (
+    contextvars.ContextVar("candidate_cancelled", default=None)
+)
+
+# Set while executing a code concurrently with others, to save its chart to its
+# own path instead of the default one
+_chart_path: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar(
+    "chart_path", default=None
+)
+
+# Set while executing a code, to collect the warnings of its SQL queries results
+_sql_result_warnings: "contextvars.ContextVar[Optional[List[str]]]" = (
+    contextvars.ContextVar("sql_result_warnings", default=None)
+)
+
+
+def _new_chart_path() -> str:
+    """Return a new path for the chart of a code executed concurrently."""
+    return str(Path(DEFAULT_CHART_DIRECTORY) / f"temp_chart_{uuid.uuid4().hex}.png")
+
+
+def _remove_chart(chart_path: str) -> None:
+    """Remove the chart of a code candidate whose response wasn't used."""
+    with suppress(OSError):
+        os.remove(chart_path)
+
+
+@contextmanager
+def _collect_sql_result_warnings() -> Iterator[List[str]]:
+    """Collect the warnings of the SQL queries results of the block."""
+    sql_result_warnings: List[str] = []
+    token = _sql_result_warnings.set(sql_result_warnings)
+    try:
+        yield sql_result_warnings
+    finally:
+        _sql_result_warnings.reset(token)
+
 
 class Agent:
     """
@@ -50,6 +122,7 @@ class Agent:
         vectorstore: Optional[VectorStore] = None,
         description: str = None,
         sandbox: Sandbox = None,
+        namespace: Optional[str] = None,
     ):
         """
         Args:
@@ -58,6 +131,9 @@ class Agent:
             memory_size (Optional[int]): The size of the memory.
             vectorstore (Optional[VectorStore]): The vectorstore to be used for the conversation.
             description (str): The description of the agent.
+            namespace (Optional[str]): The DuckDB namespace in which the local
+                datasets are registered and queried. Agents sharing a namespace
+                share their tables; by default each agent gets its own.
         """
 
         # Deprecation warnings
@@ -77,12 +153,18 @@ class Agent:
                 )
 
         self.description = description
-        self._state = AgentState()
+        # The caches are created by `initialize`, from the config of the agent
+        self._state = AgentState(_config=Config(enable_cache=False))
         self._state.initialize(dfs, config, memory_size, vectorstore, description)
 
         self._code_generator = CodeGenerator(self._state)
         self._response_parser = ResponseParser()
         self._sandbox = sandbox
+        self._table_mapping: Optional[Tuple[tuple, Dict[str, exp.Expression]]] = None
+        self._namespace = namespace or f"agent_{uuid.uuid4().hex}"
+        self._drop_namespace_on_exit = namespace is None
+        # Serialized tables of the conversations of `chat_in_new_conversation`
+        self._serialized_dfs: Dict[int, str] = {}
 
     def chat(self, query: str, output_type: Optional[str] = None):
         """
@@ -97,17 +179,166 @@ class Agent:
         """
         return self._process_query(query, output_type)
 
+    def chat_in_new_conversation(self, query: str, output_type: Optional[str] = None):
+        """
+        Answer a question in a conversation of its own, leaving the
+        conversation of this agent untouched.
+
+        The conversations share the data, the caches and the DuckDB namespace
+        of this agent, and the tables are serialized for the prompts once for
+        all of them, so many questions can be answered at the same time, e.g.
+        by the threads of a server.
+        """
+        # The conversations query the namespace of this agent
+        if self._drop_namespace_on_exit:
+            self._get_namespace(DuckDBConnectionManager())
+
+        # The questions may be answered at the same time, each saves its chart
+        chart_path_token = _chart_path.set(_new_chart_path())
+        try:
+            agent = self._create_batch_agent(self._serialized_dfs)
+            return agent._process_query(query, output_type)
+        finally:
+            _chart_path.reset(chart_path_token)
+
+    async def achat(self, query: str, output_type: Optional[str] = None):
+        """
+        Start a new chat interaction with the assistant on Dataframe,
+        asynchronously.
+
+        The LLM is called through `LLM.acall`, and the blocking steps (rendering
+        the tables, reading the cache and executing the code and its SQL
+        queries) run in threads, so many conversations can share an event loop.
+        Use one agent per concurrent conversation.
+        """
+        self.start_new_conversation()
+        return await self._aprocess_query(query, output_type)
+
+    async def afollow_up(self, query: str, output_type: Optional[str] = None):
+        """
+        Continue the existing chat interaction with the assistant on Dataframe,
+        asynchronously.
+        """
+        return await self._aprocess_query(query, output_type)
+
+    def chat_many(
+        self,
+        queries: List[str],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        output_type: Optional[str] = None,
+    ) -> List[BatchResult]:
+        """
+        Answer a batch of questions concurrently, each in a new conversation.
+
+        The questions share the loaded dataframes, their registration in
+        DuckDB, the caches and the serialized tables of the prompts, so the
+        data is only loaded and serialized once for the whole batch.
+
+        Args:
+            queries (List[str]): questions to answer.
+            max_concurrency (int): maximum number of questions answered at the
+                same time, i.e. of concurrent LLM calls and code executions.
+            output_type (Optional[str]): output type of all the responses.
+
+        Returns:
+            List[BatchResult]: the result of each question, in the order of
+                the questions, with its error and duration.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer.")
+
+        # The agents of the batch query the namespace of this agent
+        if self._drop_namespace_on_exit:
+            self._get_namespace(DuckDBConnectionManager())
+
+        serialized_dfs = {}
+
+        def answer(query: str) -> BatchResult:
+            start = time.perf_counter()
+            # The questions are answered at the same time, each saves its chart
+            chart_path_token = _chart_path.set(_new_chart_path())
+            try:
+                agent = self._create_batch_agent(serialized_dfs)
+                response = agent._process_query(query, output_type)
+            except Exception as e:
+                self._state.logger.log(f"Question '{query}' failed: {e}")
+                return BatchResult(
+                    query, error=str(e), duration=time.perf_counter() - start
+                )
+            finally:
+                _chart_path.reset(chart_path_token)
+
+            error = response.error if isinstance(response, ErrorResponse) else None
+            return BatchResult(query, response, error, time.perf_counter() - start)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(answer, queries))
+
+    def _create_batch_agent(self, serialized_dfs: Dict[int, str]) -> "Agent":
+        """
+        Return an agent answering a question of a batch. It shares the data,
+        the configuration, the caches and the DuckDB namespace of this agent,
+        but has its own conversation.
+        """
+        state = AgentState(
+            dfs=self._state.dfs,
+            _config=self._state.config,
+            memory=Memory(
+                self._state.memory.size,
+                agent_description=self._state.memory.agent_description,
+            ),
+            cache=self._state.cache,
+            semantic_cache=self._state.semantic_cache,
+            result_cache=self._state.result_cache,
+            vectorstore=self._state.vectorstore,
+            logger=self._state.logger,
+            serialized_dfs=serialized_dfs,
+        )
+
+        agent = copy.copy(self)
+        agent._state = state
+        agent._code_generator = CodeGenerator(state)
+        agent._drop_namespace_on_exit = False
+        return agent
+
+    def warm_up(self, queries: List[str]) -> Dict[str, int]:
+        """
+        Fill the cache by asking each query in a new conversation, e.g. before
+        a new deployment takes traffic.
+
+        Args:
+            queries (List[str]): queries to ask.
+
+        Returns:
+            Dict[str, int]: number of queries answered and cached, and of
+                queries that failed.
+        """
+        if not self._state.config.enable_cache:
+            raise InvalidConfigError("The cache must be enabled to warm it up.")
+
+        counts = {"cached": 0, "failed": 0}
+        for query in queries:
+            try:
+                response = self.chat(query)
+            except Exception as e:
+                self._state.logger.log(f"Warm-up of '{query}' failed: {e}")
+                response = None
+
+            if response is None or isinstance(response, ErrorResponse):
+                counts["failed"] += 1
+            else:
+                counts["cached"] += 1
+
+        self.start_new_conversation()
+        return counts
+
     def generate_code(self, query: Union[UserQuery, str]) -> str:
         """Generate code using the LLM."""
 
         self._state.memory.add(str(query), is_user=True)
-        if self._state.config.enable_cache:
-            cached_code = self._state.cache.get(
-                self._state.cache.get_cache_key(self._state)
-            )
-            if cached_code:
-                self._state.logger.log("Using cached code.")
-                return self._code_generator.validate_and_clean_code(cached_code)
+        cached_code = self._get_cached_code(query)
+        if cached_code:
+            return cached_code
 
         self._state.logger.log("Generating new code...")
         prompt = get_chat_prompt_for_sql(self._state)
@@ -116,66 +347,366 @@ class Agent:
         self._state.last_prompt_used = prompt
         return code
 
+    def _generate_code_candidates(self, query: Union[UserQuery, str]) -> List[str]:
+        """
+        Generate the candidate codes of the query, i.e. the `code_candidates`
+        of the config, or a single code if the code is cached.
+        """
+        n = self._state.config.code_candidates
+        if n <= 1:
+            return [self.generate_code(query)]
+
+        self._state.memory.add(str(query), is_user=True)
+        cached_code = self._get_cached_code(query)
+        if cached_code:
+            return [cached_code]
+
+        self._state.logger.log(f"Generating {n} code candidates...")
+        prompt = get_chat_prompt_for_sql(self._state)
+
+        codes = self._code_generator.generate_code_candidates(prompt, n)
+        self._state.last_prompt_used = prompt
+        return codes
+
+    async def agenerate_code(self, query: Union[UserQuery, str]) -> str:
+        """Generate code using the LLM, asynchronously."""
+
+        self._state.memory.add(str(query), is_user=True)
+        cached_code = await run_in_thread(self._get_cached_code, query)
+        if cached_code:
+            return cached_code
+
+        self._state.logger.log("Generating new code...")
+        prompt = get_chat_prompt_for_sql(self._state)
+
+        code = await self._code_generator.agenerate_code(prompt)
+        self._state.last_prompt_used = prompt
+        return code
+
+    def _get_cached_code(self, query: Union[UserQuery, str]) -> Optional[str]:
+        """Return the validated code cached for the query, if any."""
+        if not self._state.config.enable_cache:
+            return None
+
+        with start_span("cache_lookup"):
+            cache_key = self._state.cache.get_cache_key(self._state)
+            cached_code = self._state.cache.get_validated(cache_key)
+            if cached_code:
+                self._state.logger.log("Using cached code.")
+                return cached_code
+
+            cached_code = self._state.cache.get(cache_key)
+            if cached_code:
+                self._state.logger.log("Using cached code.")
+                code = self._code_generator.validate_and_clean_code(cached_code)
+                self._state.cache.set_validated(cache_key, code)
+                return code
+
+            if self._state.semantic_cache is not None:
+                return self._get_semantically_cached_code(query)
+
+            return None
+
+    def _get_semantically_cached_code(
+        self, query: Union[UserQuery, str]
+    ) -> Optional[str]:
+        """
+        Return the code cached for a question similar to the query, validated
+        and cleaned again, or None if there is no similar question or its code
+        is not valid anymore.
+        """
+        cached_code = self._state.semantic_cache.get(
+            str(query), SemanticCache.get_context(self._state)
+        )
+        if not cached_code:
+            return None
+
+        try:
+            code = self._code_generator.validate_and_clean_code(cached_code)
+        except Exception as e:
+            self._state.logger.log(f"Cached code of a similar question is invalid: {e}")
+            return None
+
+        self._state.logger.log("Using cached code of a similar question.")
+        return code
+
     def execute_code(self, code: str) -> dict:
         """Execute the generated code."""
+        chart_path = _chart_path.get()
+        if chart_path is not None:
+            code = code.replace(str(Path(DEFAULT_CHART_PATH)), chart_path)
+
         self._state.logger.log(f"Executing code: {code}")
 
         code_executor = CodeExecutor(self._state.config)
-        code_executor.add_to_env("execute_sql_query", self._execute_sql_query)
+        code_executor.add_to_env("execute_sql_query", self._execute_traced_sql_query)
 
-        if self._sandbox:
-            return self._sandbox.execute(code, code_executor.environment)
+        with start_span("code_execution"):
+            if self._sandbox:
+                return self._sandbox.execute(code, code_executor.environment)
 
-        return code_executor.execute_and_return_result(code)
+            return code_executor.execute_and_return_result(code)
 
-    @staticmethod
-    def _parse_correct_table_name(query: str, dfs: List[VirtualDataFrame]) -> str:
-        table_mapping = {
-            df.schema.name: df.query_builder._get_table_expression() for df in dfs
-        }
+    async def aexecute_code(self, code: str) -> dict:
+        """
+        Execute the generated code in a thread, so the code and the SQL
+        queries it runs don't block the event loop.
+        """
+        return await run_in_thread(self.execute_code, code)
+
+    def _get_table_mapping(
+        self, dfs: List[VirtualDataFrame]
+    ) -> Dict[str, exp.Expression]:
+        """
+        Return the parsed table expressions of the dataframes, recomputing them
+        only when one of the schemas has changed.
+        """
+        fingerprint = tuple(df.query_builder.get_schema_fingerprint() for df in dfs)
+        if self._table_mapping is None or self._table_mapping[0] != fingerprint:
+            table_mapping = {
+                df.schema.name: df.query_builder._get_table_expression() for df in dfs
+            }
+            self._table_mapping = (
+                fingerprint,
+                SQLParser.parse_table_mapping(table_mapping),
+            )
+
+        return self._table_mapping[1]
 
+    def _parse_correct_table_name(self, query: str, dfs: List[VirtualDataFrame]) -> str:
+        table_mapping = self._get_table_mapping(dfs)
         return SQLParser.replace_table_and_column_names(query, table_mapping)
 
-    def _execute_local_sql_query(self, query: str) -> pd.DataFrame:
+    def _get_namespace(self, db_manager: DuckDBConnectionManager) -> str:
+        """
+        Return the DuckDB namespace of the agent. A namespace created for the
+        agent is released, with its tables, when the agent is garbage collected.
+        """
+        if self._drop_namespace_on_exit:
+            self._drop_namespace_on_exit = False
+            weakref.finalize(self, db_manager.release_namespace, self._namespace)
+        return self._namespace
+
+    def _execute_local_sql_query(
+        self,
+        query: str,
+        dtype_backend: Optional[str] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         try:
             db_manager = DuckDBConnectionManager()
+            namespace = self._get_namespace(db_manager)
             for df in self._state.dfs:
-                db_manager.register(df.schema.name, df)
-            return db_manager.sql(query).df()
+                if not self._register_stored(db_manager, df, namespace):
+                    db_manager.register(df.schema.name, df, namespace=namespace)
+
+            if chunksize:
+                batches = db_manager.fetch_record_batches(
+                    query, chunksize, namespace=namespace
+                )
+                return self._iter_record_batches(batches, dtype_backend)
+
+            relation = db_manager.sql(query, namespace=namespace)
+            if dtype_backend == "pyarrow":
+                return relation.fetch_arrow_table().to_pandas(
+                    types_mapper=pd.ArrowDtype
+                )
+            return relation.df()
         except duckdb.Error as e:
             raise RuntimeError(f"SQL execution failed: {e}") from e
 
-    def _execute_sql_query(self, query: str) -> pd.DataFrame:
+    @staticmethod
+    def _register_stored(
+        db_manager: DuckDBConnectionManager, df: DataFrame, namespace: str
+    ) -> bool:
+        """
+        Register the native table of the persistent store of a dataset loaded
+        from it, with its statistics, instead of its DataFrame, unless the shape
+        of the DataFrame changed since it was loaded.
+        """
+        stored_version = getattr(df, "_stored_version", None)
+        if stored_version is None:
+            return False
+
+        version, df_version = stored_version
+        if db_manager.get_data_version(df) != df_version:
+            return False
+        if db_manager.is_registered(
+            df.schema.name, version=version, namespace=namespace
+        ):
+            return True
+        return db_manager.register_stored(df.schema.name, version, namespace=namespace)
+
+    @staticmethod
+    def _iter_record_batches(
+        batches: Iterator[pa.RecordBatch], dtype_backend: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        types_mapper = pd.ArrowDtype if dtype_backend == "pyarrow" else None
+        try:
+            for batch in batches:
+                yield batch.to_pandas(types_mapper=types_mapper)
+        except duckdb.Error as e:
+            raise RuntimeError(f"SQL execution failed: {e}") from e
+
+    def _execute_traced_sql_query(
+        self,
+        query: str,
+        dtype_backend: Optional[str] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """Execute an SQL query of the code, recording its duration and rows."""
+        with start_span("execute_sql_query", query=query) as span:
+            result = self._execute_sql_query(query, dtype_backend, chunksize)
+            if span is not None and isinstance(result, pd.DataFrame):
+                span.set_attribute("rows", len(result))
+            return result
+
+    def _execute_sql_query(
+        self,
+        query: str,
+        dtype_backend: Optional[str] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """
         Executes an SQL query on registered DataFrames.
 
         Args:
             query (str): The SQL query to execute.
+            dtype_backend (Optional[str]): Pass "pyarrow" to get a DataFrame
+                backed by Arrow types, which uses less memory for strings.
+            chunksize (Optional[int]): If set, return an iterator of DataFrames
+                of at most `chunksize` rows, so large results can be processed
+                incrementally.
 
         Returns:
-            pd.DataFrame: The result of the SQL query as a pandas DataFrame.
+            Union[pd.DataFrame, Iterator[pd.DataFrame]]: The result of the SQL
+                query as a pandas DataFrame, or an iterator of DataFrames if
+                `chunksize` is set.
         """
+        cancelled = _candidate_cancelled.get()
+        if cancelled is not None and cancelled.is_set():
+            raise CodeExecutionError("Another code candidate already succeeded.")
         if not self._state.dfs:
             raise ValueError("No DataFrames available to register for query execution.")
+        if dtype_backend not in (None, "pyarrow"):
+            raise ValueError(
+                f"Invalid dtype_backend '{dtype_backend}', expected 'pyarrow'."
+            )
+        if chunksize is not None and chunksize <= 0:
+            raise ValueError("chunksize must be a positive integer.")
 
         df0 = self._state.dfs[0]
         source = df0.schema.source or None
 
         if source and source.type in LOCAL_SOURCE_TYPES:
-            return self._execute_local_sql_query(query)
+            query = self._guard_sql_query(query, dialect="duckdb")
+            result = self._execute_local_sql_query(query, dtype_backend, chunksize)
         else:
             query = self._parse_correct_table_name(query, self._state.dfs)
-            return df0.execute_sql_query(query)
+            query = self._guard_sql_query(
+                query, dialect=source.type if source else None
+            )
+            # Views over local datasets query their tables in the namespace
+            namespace = self._get_namespace(DuckDBConnectionManager())
+            # Remote sources return materialized DataFrames, which are converted
+            result = df0.execute_sql_query(query, namespace=namespace)
+            if dtype_backend == "pyarrow":
+                result = result.convert_dtypes(dtype_backend="pyarrow")
+            if chunksize:
+                result = (
+                    result.iloc[start : start + chunksize]
+                    for start in range(0, len(result), chunksize)
+                )
+
+        if chunksize:
+            return self._check_sql_result_batches_size(query, result)
+        return self._check_sql_result_size(query, result)
+
+    def _guard_sql_query(self, query: str, dialect: Optional[str] = None) -> str:
+        """
+        Limit the number of rows a query can return, based on the
+        `max_sql_result_rows` config. In approximate mode, the table the query
+        selects from is also sampled when the dialect supports it.
+        """
+        max_rows = self._state.config.max_sql_result_rows
+        if not max_rows:
+            return query
+
+        if self._state.config.approximate_sql_results:
+            if dialect in ROW_SAMPLING_DIALECTS:
+                sampled_query = SQLParser.sample_query(query, max_rows)
+                if sampled_query != query:
+                    self._add_sql_result_warning(
+                        f"The result of the SQL query is computed on a random "
+                        f"sample of {max_rows} rows, it is approximate:\n{query}"
+                    )
+                query = sampled_query
+            else:
+                self._state.logger.log(
+                    f"Sampling is not supported for {dialect or 'this'} source, "
+                    "the query will only be limited.",
+                    level=logging.WARNING,
+                )
+
+        # Fetch one extra row to detect whether the result has been truncated
+        return SQLParser.limit_query(query, max_rows + 1)
+
+    def _check_sql_result_size(
+        self, query: str, result: pd.DataFrame, remaining_rows: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Truncate the result of a guarded query and warn when it happens."""
+        max_rows = self._state.config.max_sql_result_rows
+        if remaining_rows is None:
+            remaining_rows = max_rows
+        if not max_rows or len(result) <= remaining_rows:
+            return result
 
-    def execute_with_retries(self, code: str) -> Any:
+        message = (
+            f"The result of the SQL query has been truncated to {max_rows} rows, "
+            f"filter or aggregate the data in the query to get complete results:\n{query}"
+        )
+        self._state.logger.log(message, level=logging.WARNING)
+        warnings.warn(message, stacklevel=2)
+        self._add_sql_result_warning(message)
+        return result.head(remaining_rows)
+
+    def _add_sql_result_warning(self, message: str) -> None:
+        """
+        Record that the result of an SQL query is incomplete or approximate,
+        so the response of the code can tell it.
+        """
+        sql_result_warnings = _sql_result_warnings.get()
+        if sql_result_warnings is not None:
+            sql_result_warnings.append(message)
+
+    def _check_sql_result_batches_size(
+        self, query: str, batches: Iterator[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        """Stop the batches of a guarded query at the maximum number of rows."""
+        max_rows = self._state.config.max_sql_result_rows
+        if not max_rows:
+            yield from batches
+            return
+
+        rows = 0
+        for batch in batches:
+            if rows + len(batch) > max_rows:
+                yield self._check_sql_result_size(query, batch, max_rows - rows)
+                return
+            rows += len(batch)
+            yield batch
+
+    def execute_with_retries(self, code: str, max_retries: Optional[int] = None) -> Any:
         """Execute the code with retry logic."""
-        max_retries = self._state.config.max_retries
+        if max_retries is None:
+            max_retries = self._state.config.max_retries
         attempts = 0
 
         while attempts <= max_retries:
             try:
-                result = self.execute_code(code)
-                return self._response_parser.parse(result, code)
+                with _collect_sql_result_warnings() as sql_result_warnings:
+                    result = self.execute_code(code)
+                return self._parse_response(result, code, sql_result_warnings)
             except CodeExecutionError as e:
                 attempts += 1
                 if attempts > max_retries:
@@ -186,6 +717,101 @@ class Agent:
                 )
                 code = self._regenerate_code_after_error(code, e)
 
+    def _parse_response(
+        self, result: dict, code: str, sql_result_warnings: List[str]
+    ) -> BaseResponse:
+        """
+        Parse the result of the code into a response, marked with the warnings
+        of its truncated or sampled SQL queries results.
+        """
+        response = self._response_parser.parse(result, code)
+        response.warnings = list(sql_result_warnings)
+        return response
+
+    def _execute_code_candidates(self, codes: List[str]) -> Tuple[str, BaseResponse]:
+        """
+        Execute the candidate codes concurrently and return the first one
+        producing a valid response, with its response. The SQL queries of the
+        other candidates fail once a candidate succeeded, and their charts are
+        removed once they finished. Each candidate saves its chart to its own
+        path.
+
+        If all the candidates fail, the first one is corrected and executed
+        with the remaining retries, as in `execute_with_retries`.
+        """
+        # The candidates query the namespace of this agent
+        if self._drop_namespace_on_exit:
+            self._get_namespace(DuckDBConnectionManager())
+
+        cancelled = threading.Event()
+        chart_paths = [_new_chart_path() for _ in codes]
+
+        def execute(code: str, chart_path: str) -> Tuple[str, BaseResponse]:
+            _candidate_cancelled.set(cancelled)
+            _chart_path.set(chart_path)
+            with _collect_sql_result_warnings() as sql_result_warnings:
+                result = self.execute_code(code)
+            return code, self._parse_response(result, code, sql_result_warnings)
+
+        executor = ThreadPoolExecutor(max_workers=len(codes))
+        futures = [
+            executor.submit(contextvars.copy_context().run, execute, code, chart_path)
+            for code, chart_path in zip(codes, chart_paths)
+        ]
+        winner = None
+        try:
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    winner = future
+                    break
+        finally:
+            # Stop the other candidates at their next SQL query, without
+            # waiting for them
+            cancelled.set()
+            executor.shutdown(wait=False)
+
+        for future, chart_path in zip(futures, chart_paths):
+            if future is not winner:
+                future.add_done_callback(
+                    lambda _, chart_path=chart_path: _remove_chart(chart_path)
+                )
+        if winner is not None:
+            return winner.result()
+
+        self._state.logger.log(f"All the {len(codes)} code candidates failed.")
+        error = futures[0].exception()
+        max_retries = self._state.config.max_retries
+        if not isinstance(error, CodeExecutionError) or max_retries < 1:
+            raise error
+
+        self._state.logger.log(f"Retrying execution (1/{max_retries})...")
+        code = self._regenerate_code_after_error(codes[0], error)
+        return code, self.execute_with_retries(code, max_retries - 1)
+
+    async def aexecute_with_retries(self, code: str) -> Any:
+        """Execute the code with retry logic, asynchronously."""
+        max_retries = self._state.config.max_retries
+        attempts = 0
+
+        while attempts <= max_retries:
+            try:
+                with _collect_sql_result_warnings() as sql_result_warnings:
+                    result = await self.aexecute_code(code)
+                return await run_in_thread(
+                    self._parse_response, result, code, sql_result_warnings
+                )
+            except CodeExecutionError as e:
+                attempts += 1
+                if attempts > max_retries:
+                    self._state.logger.log(f"Max retries reached. Error: {e}")
+                    raise
+                self._state.logger.log(
+                    f"Retrying execution ({attempts}/{max_retries})..."
+                )
+                with start_span("error_correction"):
+                    prompt = await run_in_thread(self._get_error_prompt, code, e)
+                    code = await self._code_generator.agenerate_code(prompt)
+
     def train(
         self,
         queries: Optional[List[str]] = None,
@@ -240,7 +866,85 @@ class Agent:
         self.clear_memory()
 
     def _process_query(self, query: str, output_type: Optional[str] = None):
-        """Process a user query and return the result."""
+        """Process a user query and return the result, with its trace."""
+        exporter = self._state.config.trace_exporter
+        with start_trace("chat", exporter, query=query) as trace:
+            # The caches fingerprint the data several times while answering
+            with memoize_data_versions():
+                query = self._start_query(query, output_type)
+                response = self._answer_query(query)
+            if isinstance(response, BaseResponse):
+                response.trace = trace
+            return response
+
+    def _answer_query(self, query: UserQuery):
+        """Generate and execute the code answering a query."""
+        try:
+            # Generate code, or several candidates of it
+            with start_span("code_generation"):
+                codes = self._generate_code_candidates(query)
+            code = codes[0]
+
+            # Reuse the result of the same code on the same data
+            cached_result, data_fingerprint = self._get_cached_result(code)
+            if cached_result is not None:
+                return cached_result
+
+            # Execute code with retries, or the candidates concurrently
+            if len(codes) > 1:
+                code, result = self._execute_code_candidates(codes)
+            else:
+                result = self.execute_with_retries(code)
+
+            self._cache_response(query, code, result, data_fingerprint)
+            return result
+
+        except CodeExecutionError:
+            return self._handle_exception(code)
+
+    async def _aprocess_query(self, query: str, output_type: Optional[str] = None):
+        """Process a user query and return the result, asynchronously."""
+        exporter = self._state.config.trace_exporter
+        with start_trace("chat", exporter, query=query) as trace:
+            # The caches fingerprint the data several times while answering
+            with memoize_data_versions():
+                query = await run_in_thread(self._start_query, query, output_type)
+                response = await self._aanswer_query(query)
+            if isinstance(response, BaseResponse):
+                response.trace = trace
+            return response
+
+    async def _aanswer_query(self, query: UserQuery):
+        """Generate and execute the code answering a query, asynchronously."""
+        try:
+            with start_span("code_generation"):
+                if self._state.config.code_candidates > 1:
+                    codes = await run_in_thread(self._generate_code_candidates, query)
+                else:
+                    codes = [await self.agenerate_code(query)]
+            code = codes[0]
+
+            cached_result, data_fingerprint = await run_in_thread(
+                self._get_cached_result, code
+            )
+            if cached_result is not None:
+                return cached_result
+
+            if len(codes) > 1:
+                code, result = await run_in_thread(self._execute_code_candidates, codes)
+            else:
+                result = await self.aexecute_with_retries(code)
+
+            await run_in_thread(
+                self._cache_response, query, code, result, data_fingerprint
+            )
+            return result
+
+        except CodeExecutionError:
+            return self._handle_exception(code)
+
+    def _start_query(self, query: str, output_type: Optional[str]) -> UserQuery:
+        """Log the query and prepare the state and the caches to process it."""
         query = UserQuery(query)
         self._state.logger.log(f"Question: {query}")
         self._state.logger.log(
@@ -248,45 +952,112 @@ class Agent:
         )
 
         self._state.output_type = output_type
-        try:
-            self._state.assign_prompt_id()
+        self._state.assign_prompt_id()
+        # Set once the code of this query is generated, not reused from cache
+        self._state.last_prompt_used = None
 
-            # To ensure the cache is set properly if config is changed in between
-            if self._state.config.enable_cache and self._state.cache is None:
-                self._state.cache = Cache()
+        # To ensure the cache is set properly if config is changed in between
+        if self._state.config.enable_cache and self._state.cache is None:
+            self._state.cache = Cache.from_config(self._state.config)
 
-            # Generate code
-            code = self.generate_code(query)
+        if (
+            self._state.config.enable_cache
+            and self._state.config.enable_semantic_cache
+            and self._state.semantic_cache is None
+        ):
+            self._state.semantic_cache = SemanticCache.from_config(
+                self._state.cache, self._state.config
+            )
 
-            # Execute code with retries
-            result = self.execute_with_retries(code)
+        if self._state.config.enable_result_cache and self._state.result_cache is None:
+            self._state.result_cache = ResultCache.from_config(self._state.config)
 
-            # Cache the result if caching is enabled
-            if self._state.config.enable_cache:
-                self._state.cache.set(
-                    self._state.cache.get_cache_key(self._state), code
-                )
+        return query
 
-            self._state.logger.log("Response generated successfully.")
-            # Generate and return the final response
-            return result
+    def _get_cached_result(
+        self, code: str
+    ) -> Tuple[Optional[BaseResponse], Optional[str]]:
+        """
+        Return the cached result of the code on the current data, if any, and
+        the fingerprint of the data to cache the result with.
+        """
+        if not self._state.config.enable_result_cache:
+            return None, None
 
-        except CodeExecutionError:
-            return self._handle_exception(code)
+        # Results of data without a version can only be reused until they expire
+        data_fingerprint = ResultCache.get_data_fingerprint(
+            self._state.dfs,
+            allow_unversioned=self._state.config.result_cache_ttl is not None,
+        )
+        if data_fingerprint is None:
+            return None, None
+
+        with start_span("result_cache_lookup"):
+            cached_result = self._state.result_cache.get(code, data_fingerprint)
+        if cached_result is not None:
+            self._state.logger.log("Using cached result.")
+        return cached_result, data_fingerprint
+
+    def _cache_response(
+        self,
+        query: UserQuery,
+        code: str,
+        result: BaseResponse,
+        data_fingerprint: Optional[str],
+    ) -> None:
+        """Cache the code and the result of a successfully answered query."""
+        if data_fingerprint is not None:
+            self._state.result_cache.set(code, data_fingerprint, result)
+
+        # Cache the result if caching is enabled
+        if self._state.config.enable_cache:
+            cache_key = self._state.cache.get_cache_key(self._state)
+            self._state.cache.set(cache_key, code)
+            self._state.cache.set_validated(cache_key, code)
+            if self._state.semantic_cache is not None:
+                self._state.semantic_cache.set(
+                    str(query), SemanticCache.get_context(self._state), code
+                )
+
+        self._state.logger.log("Response generated successfully.")
 
     def _regenerate_code_after_error(self, code: str, error: Exception) -> str:
         """Generate a new code snippet based on the error."""
-        error_trace = traceback.format_exc()
+        with start_span("error_correction"):
+            prompt = self._get_error_prompt(code, error)
+            return self._code_generator.generate_code(prompt)
+
+    def _get_error_prompt(self, code: str, error: Exception) -> BasePrompt:
+        """Return the prompt asking to correct the code based on the error."""
+        error_trace = "".join(
+            traceback.format_exception(type(error), error, error.__traceback__)
+        )
         self._state.logger.log(f"Execution failed with error: {error_trace}")
 
-        if isinstance(error, InvalidLLMOutputType):
-            prompt = get_correct_output_type_error_prompt(
-                self._state, code, error_trace
+        if self._state.config.compact_error_prompts:
+            # Reuse the tables rendered for the first attempt of the query
+            prompt = self._state.last_prompt_used
+            tables = (
+                prompt.get_tables()
+                if isinstance(prompt, GeneratePythonCodeWithSQLPrompt)
+                else None
+            )
+            exception_type = (
+                "InvalidLLMOutputType"
+                if isinstance(error, InvalidLLMOutputType)
+                else "ExecuteSQLQueryNotUsed"
+            )
+            return get_compact_correct_error_prompt(
+                self._state,
+                code,
+                format_code_error(error, code),
+                exception_type,
+                tables,
             )
-        else:
-            prompt = get_correct_error_prompt_for_sql(self._state, code, error_trace)
 
-        return self._code_generator.generate_code(prompt)
+        if isinstance(error, InvalidLLMOutputType):
+            return get_correct_output_type_error_prompt(self._state, code, error_trace)
+        return get_correct_error_prompt_for_sql(self._state, code, error_trace)
 
     def _handle_exception(self, code: str) -> str:
         """Handle exceptions and return an error message."""
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from pandasai.core.response.base import BaseResponse
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of a question of a batch answered by `Agent.chat_many`.
+
+    Attributes:
+        query (str): the question.
+        response (BaseResponse, optional): the response, an `ErrorResponse`
+            if the generated code kept failing, or None if an error was raised.
+        error (str, optional): the error of a failed question.
+        duration (float): the number of seconds spent answering the question.
+    """
+
+    query: str
+    response: Optional[BaseResponse] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
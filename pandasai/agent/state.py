@@ -9,6 +9,9 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from pandasai.config import Config, ConfigManager
 from pandasai.constants import DEFAULT_CACHE_DIRECTORY, DEFAULT_CHART_DIRECTORY
 from pandasai.core.cache import Cache
+from pandasai.core.result_cache import ResultCache
+from pandasai.core.semantic_cache import SemanticCache
+from pandasai.core.tracing import start_span
 from pandasai.data_loader.semantic_layer_schema import is_schema_source_same
 from pandasai.exceptions import InvalidConfigError
 from pandasai.helpers.folder import Folder
@@ -32,6 +35,8 @@ class AgentState:
     _config: Union[Config, dict] = field(default_factory=dict)
     memory: Memory = field(default_factory=Memory)
     cache: Optional[Cache] = None
+    semantic_cache: Optional[SemanticCache] = None
+    result_cache: Optional[ResultCache] = None
     vectorstore: Optional[VectorStore] = None
     intermediate_values: Dict[str, Any] = field(default_factory=dict)
     logger: Optional[Logger] = None
@@ -40,6 +45,7 @@ class AgentState:
     last_prompt_id: str = None
     last_prompt_used: str = None
     output_type: Optional[str] = None
+    serialized_dfs: Optional[Dict[int, str]] = None
 
     def __post_init__(self):
         if isinstance(self.config, dict):
@@ -47,7 +53,7 @@ class AgentState:
 
         # Initialize cache only if enabled in config
         if getattr(self.config, "enable_cache", False) and self.cache is None:
-            self.cache = Cache()
+            self.cache = Cache.from_config(self.config)
 
     def initialize(
         self,
@@ -69,7 +75,19 @@ class AgentState:
             save_logs=self.config.save_logs, verbose=self.config.verbose
         )
         self.vectorstore = vectorstore
-        self.cache = Cache() if self.config.enable_cache else None
+        self.cache = (
+            Cache.from_config(self.config) if self.config.enable_cache else None
+        )
+        self.semantic_cache = (
+            SemanticCache.from_config(self.cache, self.config)
+            if self.cache is not None and self.config.enable_semantic_cache
+            else None
+        )
+        self.result_cache = (
+            ResultCache.from_config(self.config)
+            if self.config.enable_result_cache
+            else None
+        )
 
         self._validate_input()
         self._configure()
@@ -89,7 +107,7 @@ class AgentState:
         Folder.create(DEFAULT_CHART_DIRECTORY)
 
         # Add project root path if cache_path is default
-        if self.config.enable_cache:
+        if self.config.enable_cache or self.config.enable_result_cache:
             Folder.create(DEFAULT_CACHE_DIRECTORY)
 
     def _get_config(self, config: Union[Config, dict, None]) -> Config:
@@ -125,6 +143,31 @@ class AgentState:
         if self.logger:
             self.logger.log(f"Prompt ID: {self.last_prompt_id}")
 
+    def serialize_dataframe(self, df: Union[DataFrame, VirtualDataFrame]) -> str:
+        """
+        Serialize a dataframe for the prompts. When `serialized_dfs` is set, the
+        serialized dataframes are stored in it and reused, e.g. by the agents
+        answering a batch of questions on the same data.
+        """
+        if self.serialized_dfs is None:
+            with start_span("serialize_dataframe", table=df.schema.name):
+                return df.serialize_dataframe()
+
+        if id(df) not in self.serialized_dfs:
+            with start_span("serialize_dataframe", table=df.schema.name):
+                self.serialized_dfs[id(df)] = df.serialize_dataframe()
+        return self.serialized_dfs[id(df)]
+
+    def get_relevant_qa_documents(self, question: str) -> List[str]:
+        """Return the trained questions and codes relevant to the question."""
+        with start_span("vectorstore", documents="qa"):
+            return self.vectorstore.get_relevant_qa_documents(question)
+
+    def get_relevant_docs_documents(self, question: str) -> List[str]:
+        """Return the trained documents relevant to the question."""
+        with start_span("vectorstore", documents="docs"):
+            return self.vectorstore.get_relevant_docs_documents(question)
+
     def reset_intermediate_values(self):
         """Resets the intermediate values dictionary."""
         self.intermediate_values.clear()
@@ -4,6 +4,15 @@ import re
 import click
 
 from pandasai import DatasetLoader
+from pandasai.config import ConfigManager
+from pandasai.constants import (
+    DEFAULT_SERVER_HOST,
+    DEFAULT_SERVER_PORT,
+    DEFAULT_SERVER_QUEUE_SIZE,
+    DEFAULT_SERVER_WORKER_CONCURRENCY,
+    DEFAULT_SERVER_WORKERS,
+)
+from pandasai.core.cache import Cache
 from pandasai.data_loader.semantic_layer_schema import (
     SemanticLayerSchema,
     Source,
@@ -158,5 +167,139 @@ def push(dataset_path):
         click.echo(f"❌ Error pushing dataset: {str(e)}")
 
 
+@cli.group()
+def cache():
+    """🗄️ Cache management commands"""
+    pass
+
+
+FILE_FORMAT_OPTION = click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["jsonl", "parquet"]),
+    default=None,
+    help="Format of the file. Inferred from its extension by default.",
+)
+
+
+@cache.command("export")
+@click.argument("path")
+@FILE_FORMAT_OPTION
+def export_cache(path, file_format):
+    """📤 Export the cached code to a file"""
+    try:
+        cache = Cache.from_config(ConfigManager.get())
+        try:
+            count = cache.export_entries(path, file_format)
+        finally:
+            cache.close()
+        click.echo(f"✨ Exported {count} cache entries to: {path}")
+    except Exception as e:
+        click.echo(f"❌ Error exporting cache: {str(e)}")
+
+
+@cache.command("import")
+@click.argument("path")
+@FILE_FORMAT_OPTION
+def import_cache(path, file_format):
+    """📥 Import cached code from a file"""
+    try:
+        cache = Cache.from_config(ConfigManager.get())
+        try:
+            count = cache.import_entries(path, file_format)
+        finally:
+            cache.close()
+        click.echo(f"✨ Imported {count} cache entries from: {path}")
+    except Exception as e:
+        click.echo(f"❌ Error importing cache: {str(e)}")
+
+
+@cache.command("warm-up")
+@click.argument("questions_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--dataset",
+    "dataset_paths",
+    multiple=True,
+    required=True,
+    help="Path of a dataset to query (format: organization/dataset).",
+)
+def warm_up(questions_file, dataset_paths):
+    """🔥 Fill the cache by asking the questions of a file, one per line"""
+    from pandasai import Agent
+
+    try:
+        with open(questions_file, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+
+        click.echo(f"🔄 Warming up the cache with {len(questions)} questions")
+        dfs = [
+            DatasetLoader.create_loader_from_path(path).load() for path in dataset_paths
+        ]
+        counts = Agent(dfs).warm_up(questions)
+        click.echo(
+            f"\n✨ Cached {counts['cached']} questions, {counts['failed']} failed"
+        )
+    except Exception as e:
+        click.echo(f"❌ Error warming up the cache: {str(e)}")
+
+
+@cli.command("serve")
+@click.option(
+    "--dataset",
+    "dataset_paths",
+    multiple=True,
+    required=True,
+    help="Path of a dataset preloaded by the workers (format: organization/dataset).",
+)
+@click.option("--host", default=DEFAULT_SERVER_HOST, show_default=True)
+@click.option("--port", default=DEFAULT_SERVER_PORT, show_default=True, type=int)
+@click.option(
+    "--socket", "socket_path", default=None, help="Listen on a Unix socket instead."
+)
+@click.option("--workers", default=DEFAULT_SERVER_WORKERS, show_default=True, type=int)
+@click.option(
+    "--concurrency",
+    default=DEFAULT_SERVER_WORKER_CONCURRENCY,
+    show_default=True,
+    type=int,
+    help="Number of questions answered at the same time by each worker.",
+)
+@click.option(
+    "--queue-size",
+    default=DEFAULT_SERVER_QUEUE_SIZE,
+    show_default=True,
+    type=int,
+    help="Maximum number of pending questions.",
+)
+@click.option(
+    "--timeout", default=None, type=float, help="Timeout of a question in seconds."
+)
+def serve(
+    dataset_paths, host, port, socket_path, workers, concurrency, queue_size, timeout
+):
+    """🚀 Serve questions on preloaded datasets with a pool of workers"""
+    from pandasai import server
+
+    try:
+        pool = server.WorkerPool(
+            list(dataset_paths),
+            workers=workers,
+            max_concurrency=concurrency,
+            max_queue_size=queue_size,
+        )
+        address = socket_path or f"http://{host}:{port}"
+        click.echo(f"🔄 Starting {workers} workers, serving on: {address}")
+        server.serve(
+            pool,
+            host=host,
+            port=port,
+            socket_path=socket_path,
+            request_timeout=timeout,
+        )
+        click.echo("\n✨ Server stopped")
+    except Exception as e:
+        click.echo(f"❌ Error serving: {str(e)}")
+
+
 if __name__ == "__main__":
     cli()
@@ -1,9 +1,15 @@
 import os
 from importlib.util import find_spec
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from pydantic import BaseModel, ConfigDict
 
+from pandasai.constants import (
+    DEFAULT_CACHE_MEMORY_SIZE,
+    DEFAULT_SEMANTIC_CACHE_THRESHOLD,
+)
+from pandasai.core.cache_backends import CacheBackend
+from pandasai.core.tracing import Span
 from pandasai.helpers.filemanager import DefaultFileManager, FileManager
 from pandasai.llm.base import LLM
 
@@ -12,7 +18,30 @@ class Config(BaseModel):
     save_logs: bool = True
     verbose: bool = False
     enable_cache: bool = True
+    cache_backend: Union[str, CacheBackend] = "duckdb"
+    cache_url: Optional[str] = None
+    cache_ttl: Optional[float] = None
+    cache_max_entries: Optional[int] = None
+    cache_max_bytes: Optional[int] = None
+    cache_memory_size: int = DEFAULT_CACHE_MEMORY_SIZE
+    enable_semantic_cache: bool = False
+    semantic_cache_threshold: float = DEFAULT_SEMANTIC_CACHE_THRESHOLD
+    embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None
+    enable_result_cache: bool = False
+    result_cache_ttl: Optional[float] = None
+    sql_data_version_query: Optional[str] = None
     max_retries: int = 3
+    code_candidates: int = 1
+    compact_error_prompts: bool = False
+    trace_exporter: Optional[Callable[[Span], None]] = None
+    max_sql_result_rows: Optional[int] = None
+    approximate_sql_results: bool = False
+    duckdb_threads: Optional[int] = None
+    duckdb_memory_limit: Optional[str] = None
+    duckdb_temp_directory: Optional[str] = None
+    duckdb_preserve_insertion_order: Optional[bool] = None
+    duckdb_database_path: Optional[str] = None
+    duckdb_read_only: bool = False
     llm: Optional[LLM] = None
     file_manager: FileManager = DefaultFileManager()
 
@@ -33,6 +62,7 @@ class ConfigManager:
         """Set the global configuration."""
         cls._config = Config.from_dict(config_dict)
         cls.validate_llm()
+        cls.apply_duckdb_settings()
 
     @classmethod
     def get(cls) -> Config:
@@ -53,6 +83,16 @@ class ConfigManager:
         current_config = cls._config.model_dump()
         current_config.update(config_dict)
         cls._config = Config.from_dict(current_config)
+        cls.apply_duckdb_settings()
+
+    @classmethod
+    def apply_duckdb_settings(cls):
+        """Apply the DuckDB settings to the database, if it's already open."""
+        from pandasai.data_loader.duck_db_connection_manager import (
+            DuckDBConnectionManager,
+        )
+
+        DuckDBConnectionManager.apply_config(cls._config)
 
     @classmethod
     def validate_llm(cls):
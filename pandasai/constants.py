@@ -8,15 +8,55 @@ DEFAULT_API_URL = "https://api.pandabi.ai"
 # Default directory to store chart if user doesn't provide any
 DEFAULT_CHART_DIRECTORY = "exports/charts"
 
+# Path the generated code saves its charts to
+DEFAULT_CHART_PATH = f"{DEFAULT_CHART_DIRECTORY}/temp_chart.png"
+
 # Default directory for cache
 DEFAULT_CACHE_DIRECTORY = "cache"
 
 # Default permissions for files and directories
 DEFAULT_FILE_PERMISSIONS = 0o755
 
+# Time in seconds during which the row count statistics of a dataset are reused
+DEFAULT_ROW_COUNT_STATISTICS_TTL = 60 * 60
+
 # Token needed to invalidate the cache after breaking changes
 CACHE_TOKEN = "pandasai1"
 
+# Number of cache sets between two sweeps of the expired and evicted entries
+DEFAULT_CACHE_SWEEP_INTERVAL = 100
+
+# Maximum number of validated code snippets kept in memory in front of the cache
+DEFAULT_CACHE_MEMORY_SIZE = 128
+
+# Number of entries read or written at once by the bulk operations of the cache
+DEFAULT_CACHE_BATCH_SIZE = 1000
+
+# Number of seconds to wait for another process writing to the cache
+DEFAULT_CACHE_LOCK_TIMEOUT = 30
+
+# Default server and connection limits of the Redis cache backend
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+DEFAULT_REDIS_MAX_CONNECTIONS = 16
+DEFAULT_REDIS_TIMEOUT = 10
+
+# Number of questions of a batch answered at the same time by default
+DEFAULT_BATCH_CONCURRENCY = 4
+
+# Default address, number of worker processes, number of questions answered at
+# the same time by each worker and maximum number of pending questions of the server
+DEFAULT_SERVER_HOST = "127.0.0.1"
+DEFAULT_SERVER_PORT = 8000
+DEFAULT_SERVER_WORKERS = 2
+DEFAULT_SERVER_WORKER_CONCURRENCY = 4
+DEFAULT_SERVER_QUEUE_SIZE = 256
+
+# Number of seconds to wait for the workers of the server to load the datasets
+DEFAULT_SERVER_START_TIMEOUT = 120
+
+# Minimum cosine similarity for a question to reuse the code of a cached one
+DEFAULT_SEMANTIC_CACHE_THRESHOLD = 0.95
+
 PANDABI_SETUP_MESSAGE = (
     "The api_key client option must be set either by passing api_key to the client "
     "or by setting the PANDABI_API_KEY environment variable. To get the key follow below steps:\n"
@@ -49,6 +89,8 @@ REMOTE_SOURCE_TYPES = [
     "oracle",
 ]
 SQL_SOURCE_TYPES = ["mysql", "postgres", "cockroachdb", "oracle"]
+# SQL dialects supporting row-based table sampling, e.g. TABLESAMPLE (100 ROWS)
+ROW_SAMPLING_DIALECTS = ["duckdb", "snowflake", "databricks"]
 VALID_COLUMN_TYPES = ["string", "integer", "float", "datetime", "boolean"]
 
 VALID_TRANSFORMATION_TYPES = [
@@ -1,22 +1,191 @@
-import glob
+import hashlib
+import json
 import os
-from typing import Any
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, Union
 
-import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from pandasai.constants import CACHE_TOKEN, DEFAULT_FILE_PERMISSIONS
+from pandasai.constants import (
+    CACHE_TOKEN,
+    DEFAULT_CACHE_BATCH_SIZE,
+    DEFAULT_CACHE_MEMORY_SIZE,
+    DEFAULT_CACHE_SWEEP_INTERVAL,
+    DEFAULT_FILE_PERMISSIONS,
+)
+from pandasai.core.cache_backends import (
+    CacheBackend,
+    DuckDBCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+)
+from pandasai.core.cache_backends.base import SQLCacheBackend
+from pandasai.exceptions import InvalidConfigError
 from pandasai.helpers.path import find_project_root
 
+_ENTRIES_SCHEMA = pa.schema(
+    [("key_hash", pa.string()), ("value", pa.string()), ("expires_at", pa.float64())]
+)
+
+
+class MemoryCache:
+    """Thread-safe in-memory LRU cache of values with an optional expiry time."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class Cache:
     """Cache class for caching queries. It is used to cache queries
     to save time and money.
 
+    Entries are stored by the SHA-256 hash of their versioned key in a
+    backend: a DuckDB file by default, a SQLite file in WAL mode, which
+    several processes can share, a server speaking the Redis protocol, which
+    several hosts can share, or any implementation of `CacheBackend`.
+
+    Entries can expire after a TTL, and the cache can be bounded in number of
+    entries and bytes, evicting the least recently used entries first. The
+    limits are enforced by `sweep()`, which runs every `sweep_interval` sets.
+
+    In front of the backend, an in-memory LRU tier holds the code that has
+    already been validated and cleaned, so hot entries are served without
+    any I/O nor AST processing. The tier is shared by the caches of the
+    process using the same backend, e.g. by the agents created by each call
+    to `pai.chat` or `df.chat`.
+
     Args:
         filename (str): filename to store the cache.
+        abs_path (str, optional): directory to store the cache in.
+        ttl (float, optional): default time to live of the entries, in seconds.
+        max_entries (int, optional): maximum number of entries.
+        max_bytes (int, optional): maximum total size of the values, in bytes.
+        sweep_interval (int): number of sets between two sweeps.
+        memory_size (int): maximum number of entries of the in-memory tier,
+            0 to disable it.
+        backend (Union[str, CacheBackend]): backend storing the entries,
+            "duckdb", "sqlite", "redis" or a `CacheBackend` instance.
+        url (str, optional): URL of the server of the "redis" backend.
     """
 
-    def __init__(self, filename="cache_db_0.12", abs_path=None):
+    file_backends: Dict[str, Type[SQLCacheBackend]] = {
+        "duckdb": DuckDBCacheBackend,
+        "sqlite": SQLiteCacheBackend,
+    }
+
+    # In-memory tiers of the process, by location of the backend, or by
+    # backend for the `CacheBackend` instances
+    _memory_tiers: Dict[str, MemoryCache] = {}
+    _backend_memory_tiers: "weakref.WeakKeyDictionary[CacheBackend, MemoryCache]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _memory_tiers_lock = threading.Lock()
+
+    def __init__(
+        self,
+        filename="cache_db_0.12",
+        abs_path=None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sweep_interval: int = DEFAULT_CACHE_SWEEP_INTERVAL,
+        memory_size: int = DEFAULT_CACHE_MEMORY_SIZE,
+        backend: Union[str, CacheBackend] = "duckdb",
+        url: Optional[str] = None,
+    ):
+        self.filepath: Optional[str] = None
+        self._location: Optional[str] = None
+        if isinstance(backend, CacheBackend):
+            self.backend = backend
+        elif backend == "redis":
+            self.backend = RedisCacheBackend.from_url(
+                url, prefix=f"pandasai:{filename}:"
+            )
+            self._location = f"redis:{url or ''}:{filename}"
+        elif backend in self.file_backends:
+            backend_class = self.file_backends[backend]
+            self.filepath = os.path.join(
+                self._get_cache_dir(abs_path), f"{filename}{backend_class.extension}"
+            )
+            self.backend = backend_class(self.filepath)
+            self._location = os.path.abspath(self.filepath)
+        else:
+            raise InvalidConfigError(
+                f"Unsupported cache backend: {backend}. Supported backends are: "
+                f"{[*self.file_backends, 'redis']} or a CacheBackend instance."
+            )
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._sets_since_sweep = 0
+        self._stats = {
+            "memory_hits": 0,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        self._lock = threading.Lock()
+        self._memory = self._get_memory_tier(memory_size) if memory_size > 0 else None
+
+    def _get_memory_tier(self, memory_size: int) -> MemoryCache:
+        """Return the in-memory tier of the backend, shared by the process."""
+        with self._memory_tiers_lock:
+            if self._location is None:
+                tiers = self._backend_memory_tiers
+                key = self.backend
+            else:
+                tiers = self._memory_tiers
+                key = self._location
+            memory = tiers.get(key)
+            if memory is None:
+                memory = tiers[key] = MemoryCache(memory_size)
+            else:
+                memory.max_size = memory_size
+            return memory
+
+    @staticmethod
+    def _get_cache_dir(abs_path: Optional[str]) -> str:
         # Define cache directory and create directory if it does not exist
         if abs_path:
             cache_dir = abs_path
@@ -27,27 +196,78 @@ class Cache:
                 cache_dir = os.path.join(os.getcwd(), "cache")
 
         os.makedirs(cache_dir, mode=DEFAULT_FILE_PERMISSIONS, exist_ok=True)
+        return cache_dir
 
-        self.filepath = os.path.join(cache_dir, f"{filename}.db")
-        self.connection = duckdb.connect(self.filepath)
-        self.connection.execute(
-            "CREATE TABLE IF NOT EXISTS cache (key STRING, value STRING)"
+    @classmethod
+    def from_config(cls, config: Any) -> "Cache":
+        """Create the cache with the limits and the backend of the configuration."""
+        return cls(
+            ttl=config.cache_ttl,
+            max_entries=config.cache_max_entries,
+            max_bytes=config.cache_max_bytes,
+            memory_size=config.cache_memory_size,
+            backend=config.cache_backend,
+            url=config.cache_url,
         )
 
     def versioned_key(self, key: str) -> str:
         return f"{CACHE_TOKEN}-{key}"
 
-    def set(self, key: str, value: str) -> None:
+    def hashed_key(self, key: str) -> str:
+        """Return the fixed-length primary key of an entry."""
+        return hashlib.sha256(self.versioned_key(key).encode("utf-8")).hexdigest()
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
         """Set a key value pair in the cache.
 
         Args:
             key (str): key to store the value.
             value (str): value to store in the cache.
+            ttl (float, optional): time to live of the entry, in seconds.
+                Defaults to the TTL of the cache.
+        """
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, str], ttl: Optional[float] = None) -> None:
+        """Set several key value pairs in the cache, in a single batch when the
+        backend supports it.
+
+        Args:
+            items (Dict[str, str]): values to store in the cache, by key.
+            ttl (float, optional): time to live of the entries, in seconds.
+                Defaults to the TTL of the cache.
         """
-        self.connection.execute(
-            "INSERT INTO cache VALUES (?, ?)", [self.versioned_key(key), value]
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        self.backend.set_many(
+            [
+                (self.hashed_key(key), value, now, expires_at)
+                for key, value in items.items()
+            ]
         )
 
+        with self._lock:
+            self._sets_since_sweep += len(items)
+            sweep = self._sets_since_sweep >= self.sweep_interval
+        if sweep:
+            self.sweep()
+
+    def append(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Append a value to the value of a key, atomically when the backend
+        supports it, e.g. to add an item to a list shared by processes.
+
+        Args:
+            key (str): key of the value to append to.
+            value (str): value to append, set as is if the key isn't set.
+            ttl (float, optional): time to live of the entry, in seconds.
+                Defaults to the TTL of the cache.
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+        self.backend.append(self.hashed_key(key), value, now, expires_at)
+
     def get(self, key: str) -> str:
         """Get a value from the cache.
 
@@ -57,10 +277,102 @@ class Cache:
         Returns:
             str: value from the cache.
         """
-        result = self.connection.execute(
-            "SELECT value FROM cache WHERE key=?", [self.versioned_key(key)]
-        )
-        return row[0] if (row := result.fetchone()) else None
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Get several values from the cache, in a single batch when the backend
+        supports it.
+
+        Args:
+            keys (List[str]): keys to get the values from the cache.
+
+        Returns:
+            List[Optional[str]]: values from the cache, None for missing keys.
+        """
+        key_hashes = [self.hashed_key(key) for key in keys]
+        rows = self.backend.get_many(key_hashes)
+
+        now = time.time()
+        values = []
+        for key_hash, row in zip(key_hashes, rows):
+            if row is not None and row[1] is not None and row[1] <= now:
+                self.backend.delete(key_hash)
+                self._increment("expirations")
+                row = None
+
+            if row is None:
+                self._increment("misses")
+                values.append(None)
+                continue
+
+            if self.max_entries is not None or self.max_bytes is not None:
+                # The access time is only needed to evict the least recently used
+                self.backend.touch(key_hash, now)
+            self._increment("hits")
+            values.append(row[0])
+
+        return values
+
+    def get_validated(self, key: str) -> Optional[str]:
+        """Get code that has already been validated and cleaned, from memory.
+
+        Args:
+            key (str): key to get the code from the cache.
+
+        Returns:
+            Optional[str]: validated and cleaned code, or None if it's not in
+                the in-memory tier.
+        """
+        if self._memory is None:
+            return None
+
+        code = self._memory.get(self.hashed_key(key))
+        if code is not None:
+            self._increment("memory_hits")
+        return code
+
+    def set_validated(self, key: str, code: str, ttl: Optional[float] = None) -> None:
+        """Keep validated and cleaned code in the in-memory tier.
+
+        Args:
+            key (str): key to store the code.
+            code (str): validated and cleaned code.
+            ttl (float, optional): time to live of the entry, in seconds.
+                Defaults to the TTL of the cache.
+        """
+        if self._memory is None:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._memory.set(self.hashed_key(key), code, expires_at)
+
+    def _increment(self, stat: str, count: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += count
+
+    def sweep(self) -> None:
+        """
+        Remove the expired entries, then evict the least recently used ones
+        until the cache fits its limits.
+        """
+        with self._lock:
+            self._sets_since_sweep = 0
+
+        self._increment("expirations", self.backend.delete_expired(time.time()))
+        evicted = self.backend.evict(self.max_entries, self.max_bytes)
+        self._increment("evictions", evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the statistics of the cache: the hits of the in-memory tier,
+        the hits, misses, evictions and expirations of the database since it's
+        been opened, and its current number of entries and size in bytes.
+        """
+        entries, size = self.backend.count()
+        with self._lock:
+            stats = dict(self._stats)
+        return {**stats, "entries": entries, "bytes": size}
 
     def delete(self, key: str) -> None:
         """Delete a key value pair from the cache.
@@ -68,23 +380,141 @@ class Cache:
         Args:
             key (str): key to delete the value from the cache.
         """
-        self.connection.execute(
-            "DELETE FROM cache WHERE key=?", [self.versioned_key(key)]
-        )
+        key_hash = self.hashed_key(key)
+        if self._memory is not None:
+            self._memory.delete(key_hash)
+        self.backend.delete(key_hash)
 
     def close(self) -> None:
         """Close the cache."""
-        self.connection.close()
+        self.backend.close()
 
     def clear(self) -> None:
         """Clean the cache."""
-        self.connection.execute("DELETE FROM cache")
+        if self._memory is not None:
+            self._memory.clear()
+        self.backend.clear()
 
     def destroy(self) -> None:
         """Destroy the cache."""
-        self.connection.close()
-        for cache_file in glob.glob(f"{self.filepath}.*"):
-            os.remove(cache_file)
+        if self._memory is not None:
+            self._memory.clear()
+        self.backend.destroy()
+
+    @staticmethod
+    def _get_file_format(path: str, file_format: Optional[str]) -> str:
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lower()
+            file_format = {".jsonl": "jsonl", ".parquet": "parquet"}.get(extension)
+        if file_format not in ("jsonl", "parquet"):
+            raise ValueError(
+                f"Unsupported cache file format for {path}. "
+                "Use a .jsonl or .parquet file, or set the format."
+            )
+        return file_format
+
+    def export_entries(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        batch_size: int = DEFAULT_CACHE_BATCH_SIZE,
+    ) -> int:
+        """Export the entries of the cache that haven't expired to a file.
+
+        Entries are exported by key hash, so they can only be imported in a
+        cache using the same `CACHE_TOKEN`.
+
+        Args:
+            path (str): path of the file to write.
+            file_format (str, optional): "jsonl" or "parquet". Defaults to the
+                format of the extension of the file.
+            batch_size (int): number of entries read from the backend at once.
+
+        Returns:
+            int: number of exported entries.
+        """
+        file_format = self._get_file_format(path, file_format)
+        now = time.time()
+        exported = 0
+
+        if file_format == "jsonl":
+            with open(path, "w", encoding="utf-8") as file:
+                for entries in self.backend.iter_entries(batch_size):
+                    for key_hash, value, _, expires_at in entries:
+                        if expires_at is not None and expires_at <= now:
+                            continue
+                        entry = {
+                            "key_hash": key_hash,
+                            "value": value,
+                            "expires_at": expires_at,
+                        }
+                        file.write(json.dumps(entry) + "\n")
+                        exported += 1
+            return exported
+
+        with pq.ParquetWriter(path, _ENTRIES_SCHEMA) as writer:
+            for entries in self.backend.iter_entries(batch_size):
+                rows = [
+                    {"key_hash": key_hash, "value": value, "expires_at": expires_at}
+                    for key_hash, value, _, expires_at in entries
+                    if expires_at is None or expires_at > now
+                ]
+                writer.write_table(pa.Table.from_pylist(rows, _ENTRIES_SCHEMA))
+                exported += len(rows)
+        return exported
+
+    def import_entries(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        batch_size: int = DEFAULT_CACHE_BATCH_SIZE,
+    ) -> int:
+        """Import the entries exported by `export_entries`.
+
+        The entries are written in batches, in a single transaction when the
+        backend supports it. Entries with the same key are replaced, and
+        expired entries are skipped.
+
+        Args:
+            path (str): path of the file to read.
+            file_format (str, optional): "jsonl" or "parquet". Defaults to the
+                format of the extension of the file.
+            batch_size (int): number of entries written to the backend at once.
+
+        Returns:
+            int: number of imported entries.
+        """
+        file_format = self._get_file_format(path, file_format)
+        if file_format == "jsonl":
+            with open(path, encoding="utf-8") as file:
+                rows = (json.loads(line) for line in file if line.strip())
+                return self._import_rows(rows, batch_size)
+
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+        rows = (row for batch in batches for row in batch.to_pylist())
+        return self._import_rows(rows, batch_size)
+
+    def _import_rows(self, rows: Iterable[dict], batch_size: int) -> int:
+        now = time.time()
+        imported = 0
+        batch = []
+        with self.backend.transaction():
+            for row in rows:
+                expires_at = row.get("expires_at")
+                if expires_at is not None and expires_at <= now:
+                    continue
+                batch.append((row["key_hash"], row["value"], now, expires_at))
+                if len(batch) >= batch_size:
+                    self.backend.set_many(batch)
+                    imported += len(batch)
+                    batch = []
+            self.backend.set_many(batch)
+            imported += len(batch)
+
+        if self._memory is not None:
+            # The imported entries replace the validated code of their keys
+            self._memory.clear()
+        return imported
 
     def get_cache_key(self, context: Any) -> str:
         """
@@ -95,8 +525,9 @@ class Cache:
         """
         cache_key = context.memory.get_conversation()
 
-        # Make the cache key unique for each combination of dfs
+        # Make the cache key unique for each combination of dfs and versions
+        # of their data, so cached code isn't reused after they change
         for df in context.dfs:
-            cache_key += df.schema.name
+            cache_key += df.schema.name + df.get_data_fingerprint()
 
         return cache_key
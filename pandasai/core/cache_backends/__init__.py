@@ -0,0 +1,16 @@
+"""
+Storages of the entries of the cache
+"""
+
+from .base import CacheBackend
+from .duckdb_backend import DuckDBCacheBackend
+from .redis_backend import RedisCacheBackend, RedisConnectionPool
+from .sqlite_backend import SQLiteCacheBackend
+
+__all__ = [
+    "CacheBackend",
+    "DuckDBCacheBackend",
+    "RedisCacheBackend",
+    "RedisConnectionPool",
+    "SQLiteCacheBackend",
+]
@@ -0,0 +1,313 @@
+import glob
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+Entry = Tuple[str, str, float, Optional[float]]
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the storages of the cache entries.
+
+    Entries are stored by the hash of their key, with their value, the time of
+    their last access and their expiry time. The cache checks the expiry times
+    and decides when to evict entries, the backends store them.
+    """
+
+    @abstractmethod
+    def get(self, key_hash: str) -> Optional[Tuple[str, Optional[float]]]:
+        """Return the value and the expiry time of an entry, if it exists."""
+        raise NotImplementedError("get method must be implemented by subclass.")
+
+    @abstractmethod
+    def set(
+        self,
+        key_hash: str,
+        value: str,
+        accessed_at: float,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Insert an entry, or replace the entry with the same key hash."""
+        raise NotImplementedError("set method must be implemented by subclass.")
+
+    def get_many(
+        self, key_hashes: List[str]
+    ) -> List[Optional[Tuple[str, Optional[float]]]]:
+        """Return the values and the expiry times of several entries."""
+        return [self.get(key_hash) for key_hash in key_hashes]
+
+    def set_many(self, entries: List[Entry]) -> None:
+        """Set several entries, given as (key hash, value, accessed_at, expires_at)."""
+        for entry in entries:
+            self.set(*entry)
+
+    def append(
+        self,
+        key_hash: str,
+        value: str,
+        accessed_at: float,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """
+        Append a value to an entry, creating the entry if it doesn't exist.
+        Backends append atomically when they can, so the values appended by
+        concurrent processes aren't lost. By default, the entry is read and
+        written back.
+        """
+        row = self.get(key_hash)
+        self.set(key_hash, (row[0] if row else "") + value, accessed_at, expires_at)
+
+    @abstractmethod
+    def touch(self, key_hash: str, accessed_at: float) -> None:
+        """Update the time of the last access of an entry."""
+        raise NotImplementedError("touch method must be implemented by subclass.")
+
+    @abstractmethod
+    def delete(self, key_hash: str) -> None:
+        """Delete an entry."""
+        raise NotImplementedError("delete method must be implemented by subclass.")
+
+    @abstractmethod
+    def delete_expired(self, now: float) -> int:
+        """Delete the entries expired at `now` and return their number."""
+        raise NotImplementedError(
+            "delete_expired method must be implemented by subclass."
+        )
+
+    @abstractmethod
+    def evict(self, max_entries: Optional[int], max_bytes: Optional[int]) -> int:
+        """
+        Delete the least recently used entries until the entries fit the
+        limits, and return the number of deleted entries.
+        """
+        raise NotImplementedError("evict method must be implemented by subclass.")
+
+    @abstractmethod
+    def count(self) -> Tuple[int, int]:
+        """Return the number of entries and the total size of their values."""
+        raise NotImplementedError("count method must be implemented by subclass.")
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete all the entries."""
+        raise NotImplementedError("clear method must be implemented by subclass.")
+
+    @abstractmethod
+    def iter_entries(self, batch_size: int) -> Iterator[List[Entry]]:
+        """
+        Yield all the entries in batches, as (key hash, value, accessed_at,
+        expires_at) tuples.
+        """
+        raise NotImplementedError(
+            "iter_entries method must be implemented by subclass."
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group the writes in a single transaction, when the backend supports
+        transactions.
+        """
+        yield
+
+    def close(self) -> None:
+        """Release the resources of the backend."""
+
+    def destroy(self) -> None:
+        """Close the backend and delete its storage."""
+        self.close()
+
+
+class SQLCacheBackend(CacheBackend):
+    """
+    Backend storing the entries in the indexed `cache_entries` table of an
+    SQL database file.
+
+    Args:
+        filepath (str): path of the database file.
+    """
+
+    extension = ".db"
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        # Held for the whole transactions, so other threads don't write in them
+        self._lock = threading.RLock()
+        self._transaction_depth = 0
+
+    @abstractmethod
+    def _fetchall(self, query: str, params: Optional[list] = None) -> List[Any]:
+        """Run a query and return its rows."""
+
+    @abstractmethod
+    def _executemany(self, query: str, rows: List[tuple]) -> None:
+        """Run a statement for each of the rows."""
+
+    @abstractmethod
+    def _execute_count(self, query: str, params: Optional[list] = None) -> int:
+        """Run a statement and return the number of rows it changed."""
+
+    def _create_table(self) -> None:
+        self._fetchall(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key_hash VARCHAR(64) PRIMARY KEY,
+                value TEXT,
+                size BIGINT,
+                accessed_at DOUBLE,
+                expires_at DOUBLE
+            )
+            """
+        )
+
+    def get(self, key_hash: str) -> Optional[Tuple[str, Optional[float]]]:
+        rows = self._fetchall(
+            "SELECT value, expires_at FROM cache_entries WHERE key_hash=?", [key_hash]
+        )
+        return tuple(rows[0]) if rows else None
+
+    def set(
+        self,
+        key_hash: str,
+        value: str,
+        accessed_at: float,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        self._fetchall(
+            "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+            [key_hash, value, len(value.encode("utf-8")), accessed_at, expires_at],
+        )
+
+    def set_many(self, entries: List[Entry]) -> None:
+        if not entries:
+            return
+
+        with self.transaction():
+            self._executemany(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        key_hash,
+                        value,
+                        len(value.encode("utf-8")),
+                        accessed_at,
+                        expires_at,
+                    )
+                    for key_hash, value, accessed_at, expires_at in entries
+                ],
+            )
+
+    def append(
+        self,
+        key_hash: str,
+        value: str,
+        accessed_at: float,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        self._fetchall(
+            """
+            INSERT INTO cache_entries VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key_hash) DO UPDATE SET
+                value = cache_entries.value || excluded.value,
+                size = cache_entries.size + excluded.size,
+                accessed_at = excluded.accessed_at,
+                expires_at = excluded.expires_at
+            """,
+            [key_hash, value, len(value.encode("utf-8")), accessed_at, expires_at],
+        )
+
+    def iter_entries(self, batch_size: int) -> Iterator[List[Entry]]:
+        last_key_hash = ""
+        while True:
+            rows = self._fetchall(
+                """
+                SELECT key_hash, value, accessed_at, expires_at FROM cache_entries
+                WHERE key_hash > ? ORDER BY key_hash LIMIT ?
+                """,
+                [last_key_hash, batch_size],
+            )
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+            last_key_hash = rows[-1][0]
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._transaction_depth += 1
+            try:
+                if self._transaction_depth == 1:
+                    self._fetchall("BEGIN TRANSACTION")
+                try:
+                    yield
+                except BaseException:
+                    if self._transaction_depth == 1:
+                        self._fetchall("ROLLBACK")
+                    raise
+                if self._transaction_depth == 1:
+                    self._fetchall("COMMIT")
+            finally:
+                self._transaction_depth -= 1
+
+    def touch(self, key_hash: str, accessed_at: float) -> None:
+        self._fetchall(
+            "UPDATE cache_entries SET accessed_at=? WHERE key_hash=?",
+            [accessed_at, key_hash],
+        )
+
+    def delete(self, key_hash: str) -> None:
+        self._fetchall("DELETE FROM cache_entries WHERE key_hash=?", [key_hash])
+
+    def delete_expired(self, now: float) -> int:
+        return self._execute_count(
+            "DELETE FROM cache_entries WHERE expires_at <= ?", [now]
+        )
+
+    def evict(self, max_entries: Optional[int], max_bytes: Optional[int]) -> int:
+        evicted = 0
+        if max_entries is not None:
+            evicted += self._execute_count(
+                """
+                DELETE FROM cache_entries WHERE key_hash NOT IN (
+                    SELECT key_hash FROM cache_entries
+                    ORDER BY accessed_at DESC, key_hash
+                    LIMIT ?
+                )
+                """,
+                [max_entries],
+            )
+
+        if max_bytes is not None:
+            evicted += self._execute_count(
+                """
+                DELETE FROM cache_entries WHERE key_hash IN (
+                    SELECT key_hash FROM (
+                        SELECT key_hash, SUM(size) OVER (
+                            ORDER BY accessed_at DESC, key_hash
+                            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                        ) AS total_size
+                        FROM cache_entries
+                    ) WHERE total_size > ?
+                )
+                """,
+                [max_bytes],
+            )
+
+        return evicted
+
+    def count(self) -> Tuple[int, int]:
+        ((entries, size),) = self._fetchall(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        )
+        return entries, int(size)
+
+    def clear(self) -> None:
+        self._fetchall("DELETE FROM cache_entries")
+
+    def destroy(self) -> None:
+        self.close()
+        for cache_file in glob.glob(f"{self.filepath}*"):
+            os.remove(cache_file)
@@ -0,0 +1,92 @@
+from typing import Any, List, Optional
+
+import duckdb
+
+from .base import SQLCacheBackend
+
+
+class DuckDBCacheBackend(SQLCacheBackend):
+    """
+    Backend storing the entries in a DuckDB database file.
+
+    DuckDB locks the file for the process opening it, so the cache can't be
+    shared by several processes. Use `SQLiteCacheBackend` instead.
+
+    Args:
+        filepath (str): path of the database file.
+    """
+
+    extension = ".db"
+
+    def __init__(self, filepath: str):
+        super().__init__(filepath)
+        self.connection = duckdb.connect(filepath)
+        self._create_table()
+        self._migrate_legacy_table()
+        self._migrate_entries_table()
+
+    # The connection is shared by the threads of the process, e.g. the agents
+    # of `Agent.chat_many`, and its results are not thread-safe
+    def _fetchall(self, query: str, params: Optional[list] = None) -> List[Any]:
+        with self._lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def _executemany(self, query: str, rows: List[tuple]) -> None:
+        with self._lock:
+            self.connection.executemany(query, rows)
+
+    def _execute_count(self, query: str, params: Optional[list] = None) -> int:
+        with self._lock:
+            (count,) = self.connection.execute(query, params).fetchone()
+        return count
+
+    def _migrate_legacy_table(self) -> None:
+        """
+        Move the entries of the legacy `cache` table, keyed by the full key and
+        possibly duplicated, to the hashed and indexed `cache_entries` table.
+        The last value set for a key wins.
+        """
+        legacy_table = self.connection.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_name = 'cache'"
+        ).fetchone()
+        if not legacy_table:
+            return
+
+        self.connection.begin()
+        try:
+            self.connection.execute(
+                """
+                INSERT OR REPLACE INTO cache_entries (key_hash, value)
+                SELECT sha256(key), arg_max(value, rowid) FROM cache
+                WHERE key IS NOT NULL GROUP BY key
+                """
+            )
+            self.connection.execute("DROP TABLE cache")
+            self.connection.commit()
+        except duckdb.Error:
+            self.connection.rollback()
+            raise
+
+    def _migrate_entries_table(self) -> None:
+        """
+        Add the eviction columns to entries tables created without them, and
+        fill the sizes of the entries missing them. Entries without access time
+        are the first to be evicted.
+        """
+        for column, column_type in [
+            ("size", "BIGINT"),
+            ("accessed_at", "DOUBLE"),
+            ("expires_at", "DOUBLE"),
+        ]:
+            self.connection.execute(
+                f"ALTER TABLE cache_entries ADD COLUMN IF NOT EXISTS {column} {column_type}"
+            )
+
+        self.connection.execute(
+            "UPDATE cache_entries SET size = strlen(value), accessed_at = 0 "
+            "WHERE size IS NULL"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
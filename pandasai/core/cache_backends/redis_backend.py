@@ -0,0 +1,342 @@
+import queue
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlparse
+
+from pandasai.constants import (
+    DEFAULT_REDIS_MAX_CONNECTIONS,
+    DEFAULT_REDIS_TIMEOUT,
+    DEFAULT_REDIS_URL,
+)
+from pandasai.exceptions import CacheBackendError
+
+from .base import CacheBackend, Entry
+
+
+class RedisConnection:
+    """
+    Connection to a server speaking the Redis protocol (RESP), sending
+    pipelines of commands in a single write.
+
+    Args:
+        host (str): host of the server.
+        port (int): port of the server.
+        timeout (float): socket timeout, in seconds.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+
+    @staticmethod
+    def _encode(command: Sequence[Any]) -> bytes:
+        parts = [f"*{len(command)}\r\n".encode()]
+        for argument in command:
+            if not isinstance(argument, bytes):
+                argument = str(argument).encode("utf-8")
+            parts.append(f"${len(argument)}\r\n".encode())
+            parts.append(argument)
+            parts.append(b"\r\n")
+        return b"".join(parts)
+
+    def send(self, commands: List[Sequence[Any]]) -> None:
+        self._socket.sendall(b"".join(self._encode(command) for command in commands))
+
+    def read_reply(self) -> Any:
+        """Read a reply, returning the errors of the server instead of raising."""
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the cache server.")
+
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode("utf-8")
+        if prefix == b"-":
+            return CacheBackendError(payload.decode("utf-8"))
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Invalid reply from the cache server: {line!r}")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._socket.close()
+
+
+class RedisConnectionPool:
+    """
+    Thread-safe pool of connections to a Redis server. Connections are opened
+    on demand, up to `max_connections`, and reused by the next commands.
+
+    Args:
+        host (str): host of the server.
+        port (int): port of the server.
+        db (int): index of the database.
+        password (str, optional): password of the server.
+        username (str, optional): username of the server, with ACLs.
+        max_connections (int): maximum number of open connections.
+        timeout (float): socket timeout, in seconds.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        username: Optional[str] = None,
+        max_connections: int = DEFAULT_REDIS_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_REDIS_TIMEOUT,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.username = username
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[RedisConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisConnectionPool":
+        """Create a pool from a `redis://[[username]:password@]host[:port][/db]` URL."""
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme}")
+
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            **kwargs,
+        )
+
+    def _connect(self) -> RedisConnection:
+        connection = RedisConnection(self.host, self.port, self.timeout)
+        commands = []
+        if self.password:
+            auth = [self.username, self.password] if self.username else [self.password]
+            commands.append(["AUTH", *auth])
+        if self.db:
+            commands.append(["SELECT", self.db])
+
+        if commands:
+            connection.send(commands)
+            for _ in commands:
+                reply = connection.read_reply()
+                if isinstance(reply, CacheBackendError):
+                    connection.close()
+                    raise reply
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[RedisConnection]:
+        """Borrow a connection, waiting for one when they are all in use."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise CacheBackendError("No connection available to the cache server.")
+
+        try:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+
+            try:
+                yield connection
+            except BaseException:
+                # The connection may be in the middle of a reply
+                connection.close()
+                raise
+            self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    def execute(self, commands: List[Sequence[Any]]) -> List[Any]:
+        """
+        Send the commands in a single pipeline and return their replies.
+
+        Raises:
+            CacheBackendError: if the server replies to a command with an error.
+        """
+        if not commands:
+            return []
+
+        try:
+            with self.connection() as connection:
+                connection.send(commands)
+                replies = [connection.read_reply() for _ in commands]
+        except OSError as e:
+            raise CacheBackendError(
+                f"Failed to reach the cache server at {self.host}:{self.port}: {e}"
+            ) from e
+
+        for reply in replies:
+            if isinstance(reply, CacheBackendError):
+                raise reply
+        return replies
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend storing the entries in a key-value server speaking the Redis
+    protocol, so the cache can be shared by processes on several hosts.
+
+    Batches of entries are read and written in a single pipeline. Expired
+    entries are removed by the server, and the size of the cache is bounded
+    by its `maxmemory` and `maxmemory-policy` (e.g. `allkeys-lru`) settings
+    rather than by `max_entries` and `max_bytes`.
+
+    Args:
+        pool (RedisConnectionPool): pool of connections to the server.
+        prefix (str): prefix of the keys of the entries.
+    """
+
+    def __init__(self, pool: RedisConnectionPool, prefix: str = "pandasai:"):
+        self.pool = pool
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(
+        cls, url: Optional[str] = None, prefix: str = "pandasai:", **kwargs
+    ) -> "RedisCacheBackend":
+        return cls(
+            RedisConnectionPool.from_url(url or DEFAULT_REDIS_URL, **kwargs), prefix
+        )
+
+    def _key(self, key_hash: str) -> str:
+        return f"{self.prefix}{key_hash}"
+
+    def get(self, key_hash: str) -> Optional[Tuple[str, Optional[float]]]:
+        return self.get_many([key_hash])[0]
+
+    def get_many(
+        self, key_hashes: List[str]
+    ) -> List[Optional[Tuple[str, Optional[float]]]]:
+        replies = self.pool.execute(
+            [["GET", self._key(key_hash)] for key_hash in key_hashes]
+        )
+        return [
+            (reply.decode("utf-8"), None) if reply is not None else None
+            for reply in replies
+        ]
+
+    def set(
+        self,
+        key_hash: str,
+        value: str,
+        accessed_at: float,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        self.set_many([(key_hash, value, accessed_at, expires_at)])
+
+    def set_many(self, entries: List[Entry]) -> None:
+        commands = []
+        for key_hash, value, _, expires_at in entries:
+            command = ["SET", self._key(key_hash), value]
+            if expires_at is not None:
+                command += ["PXAT", int(expires_at * 1000)]
+            commands.append(command)
+        self.pool.execute(commands)
+
+    def append(
+        self,
+        key_hash: str,
+        value: str,
+        accessed_at: float,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        commands = [["APPEND", self._key(key_hash), value]]
+        if expires_at is not None:
+            commands.append(["PEXPIREAT", self._key(key_hash), int(expires_at * 1000)])
+        self.pool.execute(commands)
+
+    def touch(self, key_hash: str, accessed_at: float) -> None:
+        # The server tracks the accesses for its own LRU eviction
+        pass
+
+    def delete(self, key_hash: str) -> None:
+        self.pool.execute([["DEL", self._key(key_hash)]])
+
+    def delete_expired(self, now: float) -> int:
+        return 0
+
+    def evict(self, max_entries: Optional[int], max_bytes: Optional[int]) -> int:
+        return 0
+
+    def _scan_keys(self) -> Iterator[List[bytes]]:
+        cursor = b"0"
+        while True:
+            ((cursor, keys),) = self.pool.execute(
+                [["SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", 1000]]
+            )
+            if keys:
+                yield keys
+            if cursor == b"0":
+                return
+
+    def iter_entries(self, batch_size: int) -> Iterator[List[Entry]]:
+        prefix_length = len(self.prefix)
+        for keys in self._scan_keys():
+            for start in range(0, len(keys), batch_size):
+                batch = keys[start : start + batch_size]
+                now = time.time()
+                replies = self.pool.execute(
+                    [["GET", key] for key in batch] + [["PTTL", key] for key in batch]
+                )
+                values, ttls = replies[: len(batch)], replies[len(batch) :]
+                entries = [
+                    (
+                        key.decode("utf-8")[prefix_length:],
+                        value.decode("utf-8"),
+                        now,
+                        now + ttl / 1000 if ttl >= 0 else None,
+                    )
+                    for key, value, ttl in zip(batch, values, ttls)
+                    # Expired since the scan
+                    if value is not None
+                ]
+                if entries:
+                    yield entries
+
+    def count(self) -> Tuple[int, int]:
+        entries = size = 0
+        for keys in self._scan_keys():
+            sizes = self.pool.execute([["STRLEN", key] for key in keys])
+            entries += len(keys)
+            size += sum(sizes)
+        return entries, size
+
+    def clear(self) -> None:
+        for keys in self._scan_keys():
+            self.pool.execute([["DEL", *keys]])
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def destroy(self) -> None:
+        self.clear()
+        self.close()
@@ -0,0 +1,46 @@
+import sqlite3
+from typing import Any, List, Optional
+
+from pandasai.constants import DEFAULT_CACHE_LOCK_TIMEOUT
+
+from .base import SQLCacheBackend
+
+
+class SQLiteCacheBackend(SQLCacheBackend):
+    """
+    Backend storing the entries in a SQLite database file in WAL mode, so
+    several processes can read and write the cache at the same time: readers
+    don't block the writer, and writers wait for each other.
+
+    Args:
+        filepath (str): path of the database file.
+        timeout (float): number of seconds to wait for the lock of another
+            writer before failing.
+    """
+
+    extension = ".sqlite"
+
+    def __init__(self, filepath: str, timeout: float = DEFAULT_CACHE_LOCK_TIMEOUT):
+        super().__init__(filepath)
+        # Autocommit, each statement is its own transaction
+        self.connection = sqlite3.connect(
+            filepath, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._fetchall("PRAGMA journal_mode=WAL")
+        self._fetchall("PRAGMA synchronous=NORMAL")
+        self._create_table()
+
+    def _fetchall(self, query: str, params: Optional[list] = None) -> List[Any]:
+        with self._lock:
+            return self.connection.execute(query, params or []).fetchall()
+
+    def _executemany(self, query: str, rows: List[tuple]) -> None:
+        with self._lock:
+            self.connection.executemany(query, rows)
+
+    def _execute_count(self, query: str, params: Optional[list] = None) -> int:
+        with self._lock:
+            return self.connection.execute(query, params or []).rowcount
+
+    def close(self) -> None:
+        self.connection.close()
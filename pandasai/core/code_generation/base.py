@@ -1,7 +1,10 @@
 import traceback
+from typing import List
 
 from pandasai.agent.state import AgentState
 from pandasai.core.prompts.base import BasePrompt
+from pandasai.core.tracing import start_span
+from pandasai.helpers.async_utils import run_in_thread
 
 from .code_cleaning import CodeCleaner
 from .code_validation import CodeRequirementValidator
@@ -28,31 +31,111 @@ class CodeGenerator:
             Exception: If any step fails during the process.
         """
         try:
+            with start_span("prompt_rendering"):
+                prompt.to_string()
             self._context.logger.log(f"Using Prompt: {prompt}")
 
             # Generate the code
-            code = self._context.config.llm.generate_code(prompt, self._context)
+            with start_span("llm_call"):
+                code = self._context.config.llm.generate_code(prompt, self._context)
             self._context.last_code_generated = code
             self._context.logger.log(f"Code Generated:\n{code}")
 
             return self.validate_and_clean_code(code)
 
         except Exception as e:
-            error_message = f"An error occurred during code generation: {e}"
-            stack_trace = traceback.format_exc()
+            self._log_error(e)
+            raise e
+
+    async def agenerate_code(self, prompt: BasePrompt) -> str:
+        """
+        Asynchronous version of `generate_code`. The prompt is rendered and
+        the code validated in threads, as both can query the data sources.
+
+        Args:
+            prompt (BasePrompt): The prompt to guide code generation.
+
+        Returns:
+            str: The final cleaned and validated code.
+        """
+        try:
+            with start_span("prompt_rendering"):
+                await run_in_thread(prompt.to_string)
+            self._context.logger.log(f"Using Prompt: {prompt}")
+
+            with start_span("llm_call"):
+                code = await self._context.config.llm.agenerate_code(
+                    prompt, self._context
+                )
+            self._context.last_code_generated = code
+            self._context.logger.log(f"Code Generated:\n{code}")
+
+            return await run_in_thread(self.validate_and_clean_code, code)
+
+        except Exception as e:
+            self._log_error(e)
+            raise e
+
+    def generate_code_candidates(self, prompt: BasePrompt, n: int) -> List[str]:
+        """
+        Generates `n` candidate codes using the LLM, and validates and cleans
+        them. The invalid and duplicated candidates are dropped.
+
+        Args:
+            prompt (BasePrompt): The prompt to guide code generation.
+            n (int): The number of candidates to generate.
+
+        Returns:
+            List[str]: The cleaned and validated candidates, at least one.
+
+        Raises:
+            Exception: If no candidate is valid.
+        """
+        try:
+            with start_span("prompt_rendering"):
+                prompt.to_string()
+            self._context.logger.log(f"Using Prompt: {prompt}")
+
+            with start_span("llm_call", candidates=n):
+                codes = self._context.config.llm.generate_code_candidates(
+                    prompt, self._context, n
+                )
+            self._context.last_code_generated = codes[0]
 
-            self._context.logger.log(error_message)
-            self._context.logger.log(f"Stack Trace:\n{stack_trace}")
+            candidates = []
+            error = None
+            for index, code in enumerate(codes, start=1):
+                self._context.logger.log(f"Code Generated (candidate {index}):\n{code}")
+                try:
+                    candidates.append(self.validate_and_clean_code(code))
+                except Exception as e:
+                    self._context.logger.log(f"Candidate {index} is invalid: {e}")
+                    error = e
 
+            if not candidates:
+                raise error
+            return list(dict.fromkeys(candidates))
+
+        except Exception as e:
+            self._log_error(e)
             raise e
 
+    def _log_error(self, error: Exception) -> None:
+        error_message = f"An error occurred during code generation: {error}"
+        stack_trace = traceback.format_exc()
+
+        self._context.logger.log(error_message)
+        self._context.logger.log(f"Stack Trace:\n{stack_trace}")
+
     def validate_and_clean_code(self, code: str) -> str:
         # Validate code requirements
         self._context.logger.log("Validating code requirements...")
-        if not self._code_validator.validate(code):
-            raise ValueError("Code validation failed due to unmet requirements.")
+        with start_span("code_validation"):
+            if not self._code_validator.validate(code):
+                raise ValueError("Code validation failed due to unmet requirements.")
         self._context.logger.log("Code validation successful.")
 
         # Clean the code
         self._context.logger.log("Cleaning the generated code...")
-        return self._code_cleaner.clean_code(code)
+        with start_span("code_cleaning"):
+            return self._code_cleaner.clean_code(code)
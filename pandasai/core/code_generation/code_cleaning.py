@@ -5,7 +5,7 @@ from pathlib import Path
 import astor
 
 from pandasai.agent.state import AgentState
-from pandasai.constants import DEFAULT_CHART_DIRECTORY
+from pandasai.constants import DEFAULT_CHART_PATH
 from pandasai.core.code_execution.code_executor import CodeExecutor
 from pandasai.query_builders.sql_parser import SQLParser
 
@@ -63,37 +63,34 @@ class CodeCleaner:
     def _validate_and_make_table_name_case_sensitive(self, node: ast.AST) -> ast.AST:
         """
         Validate table names and convert them to case-sensitive names in the SQL query.
+
+        The whole node is walked, so the queries of the calls nested in loops,
+        conditions, function bodies or larger expressions are validated too.
         """
-        if isinstance(node, ast.Assign):
+        for child in ast.walk(node):
             if (
-                isinstance(node.value, ast.Constant)
-                and isinstance(node.value.value, str)
-                and isinstance(node.targets[0], ast.Name)
-                and node.targets[0].id in ["sql_query", "query"]
+                isinstance(child, ast.Assign)
+                and isinstance(child.value, ast.Constant)
+                and isinstance(child.value.value, str)
+                and isinstance(child.targets[0], ast.Name)
+                and child.targets[0].id in ["sql_query", "query"]
             ):
-                sql_query = self._clean_sql_query(node.value.value)
-                node.value.value = sql_query
+                child.value.value = self._clean_sql_query(child.value.value)
             elif (
-                isinstance(node.value, ast.Call)
-                and isinstance(node.value.func, ast.Name)
-                and node.value.func.id == "execute_sql_query"
-                and len(node.value.args) == 1
-                and isinstance(node.value.args[0], ast.Constant)
-                and isinstance(node.value.args[0].value, str)
-            ):
-                sql_query = self._clean_sql_query(node.value.args[0].value)
-                node.value.args[0].value = sql_query
-
-        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
-            if (
-                isinstance(node.value.func, ast.Name)
-                and node.value.func.id == "execute_sql_query"
-                and len(node.value.args) == 1
-                and isinstance(node.value.args[0], ast.Constant)
-                and isinstance(node.value.args[0].value, str)
+                isinstance(child, ast.Call)
+                and isinstance(child.func, ast.Name)
+                and child.func.id == "execute_sql_query"
             ):
-                sql_query = self._clean_sql_query(node.value.args[0].value)
-                node.value.args[0].value = sql_query
+                arguments = child.args[:1] + [
+                    keyword.value
+                    for keyword in child.keywords
+                    if keyword.arg == "sql_query"
+                ]
+                for argument in arguments:
+                    if isinstance(argument, ast.Constant) and isinstance(
+                        argument.value, str
+                    ):
+                        argument.value = self._clean_sql_query(argument.value)
 
         return node
 
@@ -217,7 +214,7 @@ class CodeCleaner:
         """
         Replace output file names with "temp_chart.png".
         """
-        chart_path = Path(DEFAULT_CHART_DIRECTORY) / "temp_chart.png"
+        chart_path = Path(DEFAULT_CHART_PATH)
         return re.sub(
             r"""(['"])([^'"]*\.png)\1""",
             lambda m: f"{m.group(1)}{chart_path}{m.group(1)}",
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from pandasai.core.prompts.compact_correct_error_prompt import (
+    CompactCorrectErrorPrompt,
+)
 from pandasai.core.prompts.correct_execute_sql_query_usage_error_prompt import (
     CorrectExecuteSQLQueryUsageErrorPrompt,
 )
@@ -43,6 +46,23 @@ def get_correct_output_type_error_prompt(
     )
 
 
+def get_compact_correct_error_prompt(
+    context: AgentState,
+    code: str,
+    traceback_error: str,
+    exception_type: str,
+    tables: Optional[str] = None,
+) -> BasePrompt:
+    return CompactCorrectErrorPrompt(
+        context=context,
+        code=code,
+        error=traceback_error,
+        exception_type=exception_type,
+        output_type=context.output_type,
+        tables=tables,
+    )
+
+
 __all__ = [
     "BasePrompt",
     "CorrectErrorPrompt",
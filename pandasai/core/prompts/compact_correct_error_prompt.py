@@ -0,0 +1,34 @@
+from .base import BasePrompt
+
+
+class CompactCorrectErrorPrompt(BasePrompt):
+    """
+    Prompt to fix the code after an error, reusing the tables rendered in the
+    prompt of the first attempt and sending only the last question, the
+    failing code and the trimmed traceback.
+    """
+
+    template_path = "compact_correct_error_prompt.tmpl"
+
+    def to_json(self):
+        context = self.props["context"]
+        code = self.props["code"]
+        error = self.props["error"]
+        memory = context.memory
+
+        # prepare datasets
+        datasets = [dataset.to_json() for dataset in context.dfs]
+
+        return {
+            "datasets": datasets,
+            "conversation": memory.to_json()[-1:],
+            "system_prompt": memory.agent_description,
+            "error": {
+                "code": code,
+                "error_trace": str(error),
+                "exception_type": self.props["exception_type"],
+            },
+            "config": {
+                "output_type": self.props["output_type"],
+            },
+        }
@@ -1,3 +1,6 @@
+import re
+from typing import Optional
+
 from .base import BasePrompt
 
 
@@ -6,6 +9,12 @@ class GeneratePythonCodeWithSQLPrompt(BasePrompt):
 
     template_path = "generate_python_code_with_sql.tmpl"
 
+    def get_tables(self) -> Optional[str]:
+        """Return the rendered tables of the prompt, to reuse them in the
+        prompts correcting the code."""
+        match = re.search(r"<tables>.*?</tables>", self.to_string(), re.DOTALL)
+        return match.group(0) if match else None
+
     def to_json(self):
         context = self.props["context"]
         output_type = self.props["output_type"]
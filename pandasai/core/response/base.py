@@ -1,6 +1,7 @@
 import json
-from typing import Any
+from typing import Any, List, Optional
 
+from pandasai.core.tracing import Span
 from pandasai.helpers.json_encoder import CustomJsonEncoder
 
 
@@ -32,6 +33,11 @@ class BaseResponse:
         self.type = type
         self.last_code_executed = last_code_executed
         self.error = error
+        # Set by the agent when the SQL queries results of the code have been
+        # truncated or sampled, so the response is incomplete or approximate
+        self.warnings: List[str] = []
+        # Timed stages of the answer, set by the agent
+        self.trace: Optional[Span] = None
 
     def __str__(self) -> str:
         """Return the string representation of the response."""
@@ -42,8 +48,8 @@ class BaseResponse:
         return f"{self.__class__.__name__}(type={self.type!r}, value={self.value!r})"
 
     def to_dict(self) -> dict:
-        """Return a dictionary representation."""
-        return self.__dict__
+        """Return a dictionary representation, without the trace."""
+        return {key: value for key, value in self.__dict__.items() if key != "trace"}
 
     def to_json(self) -> str:
         """Return a JSON representation."""
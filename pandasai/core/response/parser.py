@@ -3,6 +3,7 @@ import re
 import numpy as np
 import pandas as pd
 
+from pandasai.core.tracing import start_span
 from pandasai.exceptions import InvalidOutputValueMismatch
 
 from .base import BaseResponse
@@ -14,8 +15,9 @@ from .string import StringResponse
 
 class ResponseParser:
     def parse(self, result: dict, last_code_executed: str = None) -> BaseResponse:
-        self._validate_response(result)
-        return self._generate_response(result, last_code_executed)
+        with start_span("response_parsing"):
+            self._validate_response(result)
+            return self._generate_response(result, last_code_executed)
 
     def _generate_response(self, result: dict, last_code_executed: str = None):
         if result["type"] == "number":
@@ -0,0 +1,163 @@
+import base64
+import hashlib
+import io
+import json
+import mimetypes
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pandasai.core.cache import Cache
+from pandasai.core.response import (
+    BaseResponse,
+    ChartResponse,
+    DataFrameResponse,
+    NumberResponse,
+    StringResponse,
+)
+
+
+class ResultCache:
+    """
+    Cache of the responses of executed code, so the same code on the same data
+    is answered without executing it again.
+
+    Entries are keyed by the hash of the code and of a fingerprint of the data
+    of the datasets, so they are invalidated when the data changes. DataFrames
+    are stored as parquet and charts as image bytes.
+
+    Args:
+        cache (Cache): cache storing the serialized responses.
+    """
+
+    def __init__(self, cache: Cache):
+        self.cache = cache
+
+    @classmethod
+    def from_config(cls, config: Any) -> "ResultCache":
+        """Create the result cache with the limits of the configuration."""
+        return cls(
+            Cache(
+                filename="result_cache_0.1",
+                ttl=config.result_cache_ttl,
+                max_entries=config.cache_max_entries,
+                max_bytes=config.cache_max_bytes,
+                memory_size=0,
+                backend=config.cache_backend,
+                url=config.cache_url,
+            )
+        )
+
+    @staticmethod
+    def get_data_fingerprint(
+        dfs: List[pd.DataFrame], allow_unversioned: bool = False
+    ) -> Optional[str]:
+        """
+        Return a fingerprint changing with the schema and the data of the
+        datasets, or None if the data can't be hashed. The data of virtual
+        datasets can't be hashed without loading it, so it's only versioned by
+        the data version of their loader.
+
+        Args:
+            dfs (List[pd.DataFrame]): the datasets of the agent.
+            allow_unversioned (bool): whether to fingerprint virtual datasets
+                whose data version is unknown, e.g. SQL datasets without
+                `sql_data_version_query`, by their schema only. Their cached
+                results can then be stale, so it should only be allowed when
+                the results expire.
+        """
+        from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
+
+        fingerprints = []
+        for df in dfs:
+            if isinstance(df, VirtualDataFrame):
+                if not allow_unversioned and df._get_data_version() is None:
+                    return None
+            fingerprint = df.get_data_fingerprint()
+            if not isinstance(df, VirtualDataFrame):
+                try:
+                    data_hash = pd.util.hash_pandas_object(df, index=True).sum()
+                except TypeError:
+                    return None
+                fingerprint = f"{fingerprint}|{df.shape}|{data_hash}"
+            fingerprints.append(fingerprint)
+
+        return "\n".join(fingerprints)
+
+    @staticmethod
+    def get_cache_key(code: str, data_fingerprint: str) -> str:
+        return hashlib.sha256(f"{code}\n{data_fingerprint}".encode("utf-8")).hexdigest()
+
+    def get(self, code: str, data_fingerprint: str) -> Optional[BaseResponse]:
+        """Return the cached response of the code on the data, if any."""
+        payload = self.cache.get(self.get_cache_key(code, data_fingerprint))
+        if payload is None:
+            return None
+
+        return self.deserialize(payload)
+
+    def set(self, code: str, data_fingerprint: str, response: BaseResponse) -> bool:
+        """
+        Cache the response of the code on the data.
+
+        Returns:
+            bool: True if the response has been cached, False if it can't be
+                serialized.
+        """
+        payload = self.serialize(response)
+        if payload is None:
+            return False
+
+        self.cache.set(self.get_cache_key(code, data_fingerprint), payload)
+        return True
+
+    @staticmethod
+    def serialize(response: BaseResponse) -> Optional[str]:
+        """Serialize a response, or return None if it's not supported."""
+        value = response.value
+        try:
+            if isinstance(response, DataFrameResponse):
+                if isinstance(value, pd.Series):
+                    value = value.to_frame()
+                buffer = io.BytesIO()
+                value.to_parquet(buffer)
+                value = base64.b64encode(buffer.getvalue()).decode("ascii")
+            elif isinstance(response, ChartResponse):
+                if not value.startswith("data:image"):
+                    mime_type = mimetypes.guess_type(value)[0] or "image/png"
+                    with open(value, "rb") as image_file:
+                        image = base64.b64encode(image_file.read()).decode("ascii")
+                    value = f"data:{mime_type};base64,{image}"
+            elif isinstance(response, NumberResponse):
+                value = value.item() if isinstance(value, np.generic) else value
+            elif not isinstance(response, StringResponse):
+                return None
+
+            return json.dumps(
+                {
+                    "type": response.type,
+                    "value": value,
+                    "last_code_executed": response.last_code_executed,
+                    "warnings": response.warnings,
+                }
+            )
+        except (OSError, TypeError, ValueError, ImportError):
+            return None
+
+    @staticmethod
+    def deserialize(payload: str) -> BaseResponse:
+        """Restore a response serialized by `serialize`."""
+        result = json.loads(payload)
+        value, code = result["value"], result["last_code_executed"]
+        if result["type"] == "dataframe":
+            value = pd.read_parquet(io.BytesIO(base64.b64decode(value)))
+            response = DataFrameResponse(value, code)
+        elif result["type"] == "chart":
+            response = ChartResponse(value, code)
+        elif result["type"] == "number":
+            response = NumberResponse(value, code)
+        else:
+            response = StringResponse(value, code)
+        response.warnings = result.get("warnings", [])
+        return response
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pandasai.constants import DEFAULT_SEMANTIC_CACHE_THRESHOLD
+from pandasai.core.cache import Cache
+
+EmbeddingFunction = Callable[[List[str]], List[List[float]]]
+
+
+class HashingEmbedding:
+    """
+    Embedding function running locally without any model: the words of the
+    texts, except the stop words, and the pairs of consecutive words are hashed
+    into a fixed number of dimensions.
+
+    It matches questions using the same words with other filler words. The
+    pairs of words keep questions with the same words in another order apart,
+    e.g. "ratio of revenue to cost" and "ratio of cost to revenue". Use an
+    embedding model to also match synonyms.
+
+    Args:
+        dimensions (int): number of dimensions of the embeddings.
+    """
+
+    STOP_WORDS = frozenset(
+        "a all an and are by can do does each for from give how i in is me of on "
+        "per please show tell the to what which with you".split()
+    )
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> List[float]:
+        embedding = np.zeros(self.dimensions)
+        words = [
+            word
+            for word in re.findall(r"\w+", text.lower())
+            if word not in self.STOP_WORDS
+        ]
+        bigrams = [f"{first} {second}" for first, second in zip(words, words[1:])]
+        for feature in words + bigrams:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            embedding[index] += 1 if digest[4] & 1 else -1
+        return embedding.tolist()
+
+
+class SemanticCache:
+    """
+    Cache of the code generated for questions, matching questions phrased
+    differently. The questions are embedded with a pluggable embedding function
+    and looked up in a local vector index of the cached questions asked in the
+    same context, i.e. on the same data and after the same conversation.
+
+    Each question is stored as an entry of the code cache with its embedding
+    and its code, so it's shared like the cached code, and the hashes of the
+    questions of each context are appended to another entry. The index of a
+    context is loaded in memory on its first lookup.
+
+    Args:
+        cache (Cache): code cache storing the index.
+        embedding_function (EmbeddingFunction, optional): function embedding a
+            list of texts. Defaults to `HashingEmbedding`.
+        threshold (float): minimum cosine similarity of a cached question to
+            reuse its code.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        embedding_function: Optional[EmbeddingFunction] = None,
+        threshold: float = DEFAULT_SEMANTIC_CACHE_THRESHOLD,
+    ):
+        self.cache = cache
+        self.embedding_function = embedding_function or HashingEmbedding()
+        self.threshold = threshold
+        self._indexes: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cache: Cache, config: Any) -> "SemanticCache":
+        """Create the semantic cache of a code cache with the configuration."""
+        return cls(
+            cache,
+            embedding_function=config.embedding_function,
+            threshold=config.semantic_cache_threshold,
+        )
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        (embedding,) = self.embedding_function([question])
+        embedding = np.asarray(embedding, dtype=float)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else None
+
+    def _load_question_hashes(self, context_hash: str) -> List[str]:
+        """Return the hashes of the cached questions of a context."""
+        question_hashes = self.cache.get(f"semantic-questions-{context_hash}")
+        # Concurrent writers can append the same question twice
+        return list(dict.fromkeys(question_hashes.split())) if question_hashes else []
+
+    @staticmethod
+    def _get_entry_key(context_hash: str, question_hash: str) -> str:
+        return f"semantic-entry-{context_hash}-{question_hash}"
+
+    def _get_index(self, context_hash: str) -> Tuple[np.ndarray, List[str]]:
+        with self._lock:
+            index = self._indexes.get(context_hash)
+        if index is not None:
+            return index
+
+        question_hashes = self._load_question_hashes(context_hash)
+        values = (
+            self.cache.get_many(
+                [
+                    self._get_entry_key(context_hash, question_hash)
+                    for question_hash in question_hashes
+                ]
+            )
+            if question_hashes
+            else []
+        )
+        # Entries can expire or be evicted independently of the list
+        entries = [json.loads(value) for value in values if value is not None]
+        embeddings = np.array([entry[0] for entry in entries], dtype=float)
+        index = (embeddings, [entry[1] for entry in entries])
+        with self._lock:
+            self._indexes[context_hash] = index
+        return index
+
+    def get(self, question: str, context: str) -> Optional[str]:
+        """Return the code of the most similar cached question, if any is
+        similar enough.
+
+        Args:
+            question (str): question to look up.
+            context (str): context of the question, e.g. the previous
+                conversation and the fingerprints of the datasets.
+
+        Returns:
+            Optional[str]: cached code, which still has to be validated.
+        """
+        context_hash = self._hash(context)
+        embeddings, codes = self._get_index(context_hash)
+        if not codes:
+            return None
+
+        embedding = self._embed(question)
+        if embedding is None or embedding.shape[0] != embeddings.shape[1]:
+            return None
+
+        similarities = embeddings @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return codes[best]
+
+    def set(self, question: str, context: str, code: str) -> None:
+        """Add the code generated for a question to the index.
+
+        Args:
+            question (str): question the code answers.
+            context (str): context of the question.
+            code (str): code answering the question.
+        """
+        embedding = self._embed(question)
+        if embedding is None:
+            return
+
+        context_hash = self._hash(context)
+        question_hash = self._hash(question)
+        self.cache.set(
+            self._get_entry_key(context_hash, question_hash),
+            json.dumps((embedding.tolist(), code)),
+        )
+        if question_hash not in self._load_question_hashes(context_hash):
+            # Appended atomically, so concurrent processes don't overwrite the
+            # questions of each other
+            self.cache.append(
+                f"semantic-questions-{context_hash}", f"{question_hash}\n"
+            )
+        with self._lock:
+            # Reloaded from the cache on the next lookup
+            self._indexes.pop(context_hash, None)
+
+    @staticmethod
+    def get_context(context: Any) -> str:
+        """
+        Return the context of the last question of the conversation: the
+        previous conversation and the fingerprints of the datasets.
+        """
+        return "\n".join(
+            [context.memory.get_previous_conversation()]
+            + [df.schema.name + df.get_data_fingerprint() for df in context.dfs]
+        )
+
+    @staticmethod
+    def _hash(value: str) -> str:
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
@@ -0,0 +1,151 @@
+"""
+Lightweight tracing of the stages of the answer to a question.
+
+The stages are recorded as nested spans with their durations. Spans are only
+recorded inside a trace started with `start_trace`, so the instrumented code
+does nothing when it's called outside of an agent.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pandasai.helpers.json_encoder import CustomJsonEncoder
+
+logger = logging.getLogger(__name__)
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """
+    Timed stage of the answer to a question, with its nested stages.
+
+    Attributes:
+        name (str): the name of the stage, e.g. "llm_call".
+        attributes (Dict[str, Any]): details of the stage, e.g. the number of
+            rows returned by an SQL query.
+        start_time (float): the time the stage started at, in seconds since
+            the epoch.
+        error (str, optional): the error raised by the stage, if any.
+        children (List[Span]): the nested stages, in their starting order.
+    """
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        # Stages can run concurrently in threads, e.g. the code candidates
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        """The duration of the stage in seconds, so far if it's running."""
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_child(self, span: "Span") -> None:
+        with self._lock:
+            self.children.append(span)
+
+    def finish(self) -> None:
+        if self._end is None:
+            self._end = time.perf_counter()
+
+    def find(self, name: str) -> List["Span"]:
+        """Return the nested spans with the given name, depth first."""
+        spans = []
+        for child in self.children:
+            if child.name == name:
+                spans.append(child)
+            spans.extend(child.find(name))
+        return spans
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a dictionary representation of the span and its children."""
+        return {
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def to_json(self) -> str:
+        """Return a JSON representation of the span and its children."""
+        return json.dumps(self.to_dict(), cls=CustomJsonEncoder)
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, duration={self.duration:.3f})"
+
+
+@contextmanager
+def _record(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.finish()
+        _current_span.reset(token)
+
+
+@contextmanager
+def start_trace(
+    name: str,
+    exporter: Optional[Callable[[Span], None]] = None,
+    **attributes: Any,
+) -> Iterator[Span]:
+    """
+    Start a trace, whose root span is the current span of the block.
+
+    Args:
+        name (str): the name of the root span.
+        exporter (Callable, optional): function called with the root span once
+            the trace is finished, even if the block raised. Its errors are
+            logged and ignored.
+        **attributes: attributes of the root span.
+    """
+    span = Span(name, attributes)
+    try:
+        with _record(span):
+            yield span
+    finally:
+        if exporter is not None:
+            try:
+                exporter(span)
+            except Exception:
+                logger.exception("Failed to export the trace.")
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record a stage nested in the current span. Outside of a trace, nothing is
+    recorded and None is returned.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = Span(name, attributes)
+    parent.add_child(span)
+    with _record(span):
+        yield span
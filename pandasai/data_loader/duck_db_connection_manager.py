@@ -1,42 +1,653 @@
+import hashlib
+import logging
+import re
+import threading
 import weakref
+from types import SimpleNamespace
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
 
 import duckdb
+import pandas as pd
+import pyarrow as pa
 
+from pandasai.config import Config, ConfigManager
 from pandasai.query_builders.sql_parser import SQLParser
 
+logger = logging.getLogger(__name__)
+
 
 class DuckDBConnectionManager:
+    """
+    Process-wide manager of an in-memory DuckDB database.
+
+    Each thread gets its own cursor on the shared database, so queries can run
+    concurrently. Tables registered from any thread are visible to all of them.
+
+    Tables can be registered in a namespace, a DuckDB schema of the shared
+    database. Queries run in a namespace resolve table names inside of it, so
+    tables with the same name in different namespaces don't interfere.
+
+    Optionally, a DuckDB database file is attached as a persistent store, in
+    which datasets are imported once as native tables and exposed in the
+    namespaces like registered DataFrames.
+    """
+
+    # DuckDB falls back to the "main" schema for names not found in the search
+    # path, so it's kept empty to prevent namespaces from seeing other tables
+    DEFAULT_NAMESPACE = "pandasai"
+    _NAMESPACE_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+    STORE_CATALOG = "pandasai_store"
+    _STORE_VERSIONS_TABLE = f"{STORE_CATALOG}.main.__pandasai_table_versions"
+
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(DuckDBConnectionManager, cls).__new__(cls)
-            cls._instance._init_connection()
-            weakref.finalize(cls._instance, cls._close_connection)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(DuckDBConnectionManager, cls).__new__(cls)
+                    instance._init_connection()
+                    weakref.finalize(instance, instance.connection.close)
+                    cls._instance = instance
         return cls._instance
 
     def _init_connection(self):
         """Initialize a DuckDB connection."""
-        self.connection = duckdb.connect()
-        self._registered_tables = set()
+        self._settings = self.get_settings(ConfigManager.get())
+        self.connection = duckdb.connect(config=self._settings)
+        # Registered tables by namespace and registered name, as (dataframe,
+        # data version). Tables imported in the store have no dataframe.
+        self._registered_tables: Dict[str, Dict[str, Tuple[Any, Hashable]]] = {}
+        # Relations exposed by the views of the registered tables, by namespace
+        # and table name
+        self._namespace_views: Dict[str, Dict[str, str]] = {}
+        self._released_namespaces: List[str] = []
+        # Version of the registered tables of each namespace, so the cursors
+        # only sync the namespace they query when its tables change
+        self._namespace_versions: Dict[str, int] = {}
+        self._registry_version = 0
+        # Number of dropped namespaces, whose tables the cursors unregister
+        self._dropped_namespaces = 0
+        self._registry_lock = threading.Lock()
+        self._thread_local = threading.local()
+        self._cursors = weakref.WeakSet()
+        self._attach_store(ConfigManager.get())
+
+    def _attach_store(self, config: Config):
+        """
+        Attach the persistent store, if a database file is configured.
+
+        DuckDB lets a single process open the file to write, or several
+        processes open it read-only. When another process holds the lock of
+        the file, the store is attached read-only, or not at all if the other
+        process writes in it, and the datasets are loaded from their files.
+        """
+        self._store_attached = False
+        self._store_writable = False
+        if not config.duckdb_database_path:
+            return
+
+        path = config.duckdb_database_path.replace("'", "''")
+        read_only = config.duckdb_read_only
+        while True:
+            options = " (READ_ONLY)" if read_only else ""
+            try:
+                self.connection.execute(
+                    f"ATTACH '{path}' AS {self.STORE_CATALOG}{options}"
+                )
+                break
+            except duckdb.IOException as e:
+                if "lock" not in str(e).lower():
+                    raise
+                if read_only:
+                    logger.warning(
+                        "The DuckDB store %s is locked by another process writing "
+                        "in it, the datasets are loaded from their files.",
+                        config.duckdb_database_path,
+                    )
+                    return
+                logger.warning(
+                    "The DuckDB store %s is locked by another process, "
+                    "attaching it read-only.",
+                    config.duckdb_database_path,
+                )
+                read_only = True
+
+        if not read_only:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._STORE_VERSIONS_TABLE} "
+                "(name VARCHAR PRIMARY KEY, version VARCHAR NOT NULL)"
+            )
+
+        self._store_attached = True
+        self._store_writable = not read_only
+
+    @staticmethod
+    def get_settings(config: Config) -> Dict[str, Any]:
+        """Return the DuckDB settings set in the configuration."""
+        settings = {
+            "threads": config.duckdb_threads,
+            "memory_limit": config.duckdb_memory_limit,
+            "temp_directory": config.duckdb_temp_directory,
+            "preserve_insertion_order": config.duckdb_preserve_insertion_order,
+        }
+        return {name: value for name, value in settings.items() if value is not None}
+
+    @classmethod
+    def apply_config(cls, config: Config):
+        """Apply the DuckDB settings of the configuration to the open database."""
+        if cls._instance is not None:
+            cls._instance.configure(**cls.get_settings(config))
+
+    def configure(self, **settings):
+        """
+        Change the settings of the database at runtime. Settings that are no
+        longer given are reset to the DuckDB defaults.
+
+        Args:
+            **settings: DuckDB settings, e.g. threads, memory_limit,
+                temp_directory or preserve_insertion_order.
+        """
+        invalid_names = [name for name in settings if not name.isidentifier()]
+        if invalid_names:
+            raise ValueError(f"Invalid DuckDB settings: {invalid_names}")
+
+        cursor = self._get_cursor()
+        with self._registry_lock:
+            for name in self._settings.keys() - settings.keys():
+                cursor.execute(f"RESET GLOBAL {name}")
+            for name, value in settings.items():
+                if self._settings.get(name) != value:
+                    cursor.execute(f"SET GLOBAL {name} = ?", [value])
+            self._settings = dict(settings)
+
+    @staticmethod
+    def get_data_version(df) -> Hashable:
+        """
+        Return a cheap version of the data of a DataFrame. DuckDB reads the
+        registered DataFrame in place, so only changes of its structure require
+        registering it again.
+        """
+        return len(df), tuple(df.columns)
+
+    def _init_cursor_state(self, state):
+        """Open a cursor and initialize the state of its registered tables."""
+        state.cursor = self.connection.cursor()
+        with self._registry_lock:
+            self._cursors.add(state.cursor)
+        state.registered_tables = {}
+        state.namespace_versions = {}
+        state.dropped_namespaces = 0
+        state.search_path = None
+
+    def _get_cursor(self) -> duckdb.DuckDBPyConnection:
+        """Return the cursor of the current thread, creating it on first use."""
+        local = self._thread_local
+        if getattr(local, "cursor", None) is None:
+            self._init_cursor_state(local)
+        return local.cursor
+
+    @classmethod
+    def _get_namespace(cls, namespace: Optional[str]) -> str:
+        if namespace is None:
+            return cls.DEFAULT_NAMESPACE
+        if not cls._NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(
+                f"Invalid namespace '{namespace}': it must start with a letter or "
+                "an underscore and contain only letters, digits and underscores."
+            )
+        return namespace
+
+    @staticmethod
+    def _get_registered_name(name: str, namespace: str) -> str:
+        """Name under which the DataFrame of a table is registered in DuckDB."""
+        return f"__{namespace}__{name}"
+
+    @staticmethod
+    def _get_view_name(name: str, namespace: str) -> str:
+        escaped_name = name.replace('"', '""')
+        return f'"{namespace}"."{escaped_name}"'
 
     @classmethod
-    def _close_connection(cls):
-        """Closes the DuckDB connection when the instance is deleted."""
-        if cls._instance and hasattr(cls._instance, "connection"):
-            cls._instance.connection.close()
-            cls._instance = None
-
-    def register(self, name: str, df):
-        """Registers a DataFrame as a DuckDB table."""
-        self.connection.register(name, df)
-        self._registered_tables.add(name)
-
-    def sql(self, query: str):
-        """Executes an SQL query and returns the result as a Pandas DataFrame."""
+    def _get_stored_table_name(cls, name: str) -> str:
+        escaped_name = name.replace('"', '""')
+        return f'{cls.STORE_CATALOG}.main."{escaped_name}"'
+
+    @staticmethod
+    def _get_stored_version(version: Hashable) -> str:
+        """Return a representation of a data version that is stable across processes."""
+        return hashlib.sha256(repr(version).encode("utf-8")).hexdigest()
+
+    def _create_view(
+        self,
+        cursor: duckdb.DuckDBPyConnection,
+        name: str,
+        namespace: str,
+        relation: Optional[str] = None,
+    ):
+        """
+        Expose a registered DataFrame, or a table of the store, as a view of its
+        namespace's schema.
+
+        Registered DataFrames are only visible to the cursor they are registered
+        in and always take precedence over the search path. The view is instead
+        part of the shared database, so it's created once for all the threads and
+        resolves to the DataFrame registered in the cursor running the query.
+        """
+        if relation is None:
+            relation = f'"{self._get_registered_name(name, namespace)}"'
+
+        views = self._namespace_views.setdefault(namespace, {})
+        if views.get(name) == relation:
+            return
+
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{namespace}"')
+        cursor.execute(
+            f"CREATE OR REPLACE VIEW {self._get_view_name(name, namespace)} "
+            f"AS SELECT * FROM {relation}"
+        )
+        views[name] = relation
+
+    def _set_search_path(self, state, namespace: str):
+        """Resolve the table names of the next queries inside the namespace."""
+        if state.search_path != namespace:
+            if namespace not in self._namespace_views:
+                with self._registry_lock:
+                    state.cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{namespace}"')
+                    self._namespace_views.setdefault(namespace, {})
+            state.cursor.execute(f"SET search_path = '{namespace}'")
+            state.search_path = namespace
+
+    def _bump_namespace_version(self, namespace: str):
+        """Record a change of the registered tables of a namespace."""
+        self._registry_version += 1
+        self._namespace_versions[namespace] = self._registry_version
+
+    def _sync_registered_tables(self, local, namespace: str):
+        """
+        Align the tables registered in a cursor with the registry, for the
+        namespace queried by the cursor.
+        """
+        cursor = local.cursor
+        if local.dropped_namespaces != self._dropped_namespaces:
+            with self._registry_lock:
+                namespaces = set(self._registered_tables)
+                dropped_namespaces = self._dropped_namespaces
+            for dropped in set(local.registered_tables) - namespaces:
+                for name in local.registered_tables.pop(dropped):
+                    cursor.unregister(name)
+                local.namespace_versions.pop(dropped, None)
+            local.dropped_namespaces = dropped_namespaces
+
+        version = self._namespace_versions.get(namespace)
+        if local.namespace_versions.get(namespace) == version:
+            return
+
+        with self._registry_lock:
+            registered_tables = dict(self._registered_tables.get(namespace, {}))
+            version = self._namespace_versions.get(namespace)
+
+        local_tables = local.registered_tables.setdefault(namespace, {})
+        for name in list(local_tables):
+            if registered_tables.get(name, (None,))[0] is None:
+                cursor.unregister(name)
+                del local_tables[name]
+
+        for name, table in registered_tables.items():
+            if table[0] is not None and local_tables.get(name) is not table:
+                cursor.register(name, table[0])
+                local_tables[name] = table
+
+        local.namespace_versions[namespace] = version
+
+    def is_registered(
+        self,
+        name: str,
+        df=None,
+        version: Optional[Hashable] = None,
+        namespace: Optional[str] = None,
+    ) -> bool:
+        """
+        Check whether a table is registered with the given data.
+
+        Args:
+            name (str): Name of the table.
+            df (optional): DataFrame expected to be registered. If omitted, only
+                the version is compared.
+            version (Hashable, optional): Version of the data. Defaults to the
+                version of `df`.
+            namespace (str, optional): Namespace of the table.
+
+        Returns:
+            bool: True if the same data is already registered under this name.
+        """
+        if version is None:
+            if df is None:
+                return False
+            version = self.get_data_version(df)
+
+        namespace = self._get_namespace(namespace)
+        table = self._registered_tables.get(namespace, {}).get(
+            self._get_registered_name(name, namespace)
+        )
+        if table is None:
+            return False
+
+        registered_df, registered_version = table
+        return registered_version == version and (df is None or registered_df is df)
+
+    def register(
+        self,
+        name: str,
+        df,
+        version: Optional[Hashable] = None,
+        namespace: Optional[str] = None,
+    ) -> bool:
+        """
+        Registers a DataFrame as a DuckDB table, unless the same data is
+        already registered under this name.
+
+        Args:
+            name (str): Name of the table.
+            df: DataFrame to register.
+            version (Hashable, optional): Version of the data, used to detect
+                changes. Defaults to the shape and columns of the DataFrame.
+            namespace (str, optional): Namespace to register the table in.
+                Defaults to the global namespace.
+
+        Returns:
+            bool: True if the DataFrame has been registered, False if it was
+                already registered.
+        """
+        namespace = self._get_namespace(namespace)
+        table_name = self._get_registered_name(name, namespace)
+        if version is None:
+            version = self.get_data_version(df)
+
+        self._drop_released_namespaces()
+        cursor = self._get_cursor()
+        with self._registry_lock:
+            tables = self._registered_tables.setdefault(namespace, {})
+            table = tables.get(table_name)
+            if table is not None and table[0] is df and table[1] == version:
+                return False
+
+            table = (df, version)
+            tables[table_name] = table
+            self._bump_namespace_version(namespace)
+
+            cursor.register(table_name, df)
+            self._thread_local.registered_tables.setdefault(namespace, {})[
+                table_name
+            ] = table
+            self._create_view(cursor, name, namespace)
+
+        return True
+
+    def is_stored(self, name: str, version: Hashable) -> bool:
+        """Check whether a table is imported in the store with the given version."""
+        if not self._store_attached:
+            return False
+
+        try:
+            row = (
+                self._get_cursor()
+                .execute(
+                    f"SELECT version FROM {self._STORE_VERSIONS_TABLE} WHERE name = ?",
+                    [name],
+                )
+                .fetchone()
+            )
+        except duckdb.Error:
+            # The store is read-only and no table has been imported in it yet
+            return False
+
+        return row is not None and row[0] == self._get_stored_version(version)
+
+    def read_stored(self, name: str, version: Hashable) -> Optional[pd.DataFrame]:
+        """
+        Returns the data of a table of the store, if it's been imported with
+        the given version, so the dataset doesn't have to be loaded.
+
+        Args:
+            name (str): Name of the table.
+            version (Hashable): Version of the data.
+        """
+        if not self.is_stored(name, version):
+            return None
+
+        return (
+            self._get_cursor()
+            .sql(f"SELECT * FROM {self._get_stored_table_name(name)}")
+            .df()
+        )
+
+    def import_table(
+        self,
+        name: str,
+        df,
+        version: Hashable,
+        namespace: Optional[str] = None,
+    ) -> bool:
+        """
+        Imports a DataFrame as a native table of the store, so later processes
+        can query it without loading the dataset, and registers it.
+
+        Args:
+            name (str): Name of the table.
+            df: DataFrame to import.
+            version (Hashable): Version of the data, used to detect changes.
+            namespace (str, optional): Namespace to register the table in.
+
+        Returns:
+            bool: True if the table has been imported, False if the store is
+                not attached or is read-only.
+        """
+        if not self.store_table(name, df, version):
+            return False
+
+        return self.register_stored(name, version, namespace=namespace)
+
+    def store_table(self, name: str, df, version: Hashable) -> bool:
+        """
+        Imports a DataFrame as a native table of the store, without
+        registering it.
+
+        Args:
+            name (str): Name of the table.
+            df: DataFrame to import.
+            version (Hashable): Version of the data, used to detect changes.
+
+        Returns:
+            bool: True if the table has been imported, False if the store is
+                not attached or is read-only.
+        """
+        if not self._store_writable:
+            return False
+
+        import_name = f"__import__{name}"
+        cursor = self._get_cursor()
+        with self._registry_lock:
+            cursor.register(import_name, df)
+            try:
+                cursor.begin()
+                cursor.execute(
+                    f"CREATE OR REPLACE TABLE {self._get_stored_table_name(name)} "
+                    f'AS SELECT * FROM "{import_name}"'
+                )
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO {self._STORE_VERSIONS_TABLE} VALUES (?, ?)",
+                    [name, self._get_stored_version(version)],
+                )
+                cursor.commit()
+            except duckdb.Error:
+                cursor.rollback()
+                raise
+            finally:
+                cursor.unregister(import_name)
+
+        return True
+
+    def register_stored(
+        self, name: str, version: Hashable, namespace: Optional[str] = None
+    ) -> bool:
+        """
+        Registers a table of the store, if it's been imported with the given
+        version.
+
+        Args:
+            name (str): Name of the table.
+            version (Hashable): Version of the data.
+            namespace (str, optional): Namespace to register the table in.
+
+        Returns:
+            bool: True if the table has been registered from the store.
+        """
+        if not self.is_stored(name, version):
+            return False
+
+        namespace = self._get_namespace(namespace)
+        table_name = self._get_registered_name(name, namespace)
+        cursor = self._get_cursor()
+        with self._registry_lock:
+            self._registered_tables.setdefault(namespace, {})[table_name] = (
+                None,
+                version,
+            )
+            self._bump_namespace_version(namespace)
+            self._create_view(
+                cursor, name, namespace, relation=self._get_stored_table_name(name)
+            )
+
+        return True
+
+    def unregister(self, name: str, namespace: Optional[str] = None):
+        """Unregisters a table, in all the threads."""
+        namespace = self._get_namespace(namespace)
+        table_name = self._get_registered_name(name, namespace)
+        cursor = self._get_cursor()
+        with self._registry_lock:
+            if self._registered_tables.get(namespace, {}).pop(table_name, None) is None:
+                return
+            self._bump_namespace_version(namespace)
+
+            self._namespace_views.get(namespace, {}).pop(name, None)
+            cursor.execute(
+                f"DROP VIEW IF EXISTS {self._get_view_name(name, namespace)}"
+            )
+
+        local_tables = self._thread_local.registered_tables.get(namespace, {})
+        if local_tables.pop(table_name, None) is not None:
+            cursor.unregister(table_name)
+
+    def drop_namespace(self, namespace: str):
+        """Unregisters all the tables of a namespace and drops its schema."""
+        namespace = self._get_namespace(namespace)
+        for name in list(self._namespace_views.get(namespace, ())):
+            self.unregister(name, namespace=namespace)
+
+        with self._registry_lock:
+            if self._registered_tables.pop(namespace, None) is not None:
+                self._namespace_versions.pop(namespace, None)
+                self._dropped_namespaces += 1
+            if self._namespace_views.pop(namespace, None) is not None:
+                self._get_cursor().execute(
+                    f'DROP SCHEMA IF EXISTS "{namespace}" CASCADE'
+                )
+
+    def release_namespace(self, namespace: str):
+        """
+        Schedule a namespace to be dropped before the next registration or
+        query. Unlike drop_namespace, it's safe to call from finalizers.
+        """
+        self._released_namespaces.append(namespace)
+
+    def _drop_released_namespaces(self):
+        while self._released_namespaces:
+            try:
+                namespace = self._released_namespaces.pop()
+            except IndexError:
+                break
+            self.drop_namespace(namespace)
+
+    def cleanup(self):
+        """Unregisters all the tables, in all the namespaces."""
+        for namespace in list(self._namespace_views):
+            self.drop_namespace(namespace)
+
+    def sql(self, query: str, namespace: Optional[str] = None):
+        """
+        Executes an SQL query and returns the DuckDB relation of its result.
+
+        Args:
+            query (str): The SQL query to execute.
+            namespace (str, optional): Namespace in which the table names of
+                the query are resolved. Defaults to the global namespace.
+        """
+        namespace = self._get_namespace(namespace)
+        query = SQLParser.transpile_sql_dialect(query, to_dialect="duckdb")
+        self._drop_released_namespaces()
+        cursor = self._get_cursor()
+        self._sync_registered_tables(self._thread_local, namespace)
+        self._set_search_path(self._thread_local, namespace)
+        return cursor.sql(query)
+
+    def fetch_record_batches(
+        self, query: str, batch_size: int, namespace: Optional[str] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Executes an SQL query and streams its result as Arrow record batches.
+
+        The query runs on a dedicated cursor, so other queries can be executed
+        while the batches are consumed.
+
+        Args:
+            query (str): The SQL query to execute.
+            batch_size (int): Maximum number of rows of each batch.
+            namespace (str, optional): Namespace in which the table names of
+                the query are resolved. Defaults to the global namespace.
+        """
+        namespace = self._get_namespace(namespace)
         query = SQLParser.transpile_sql_dialect(query, to_dialect="duckdb")
-        return self.connection.sql(query)
+        self._drop_released_namespaces()
+
+        state = SimpleNamespace()
+        self._init_cursor_state(state)
+        try:
+            self._sync_registered_tables(state, namespace)
+            self._set_search_path(state, namespace)
+            relation = state.cursor.sql(query)
+            if hasattr(relation, "to_arrow_reader"):
+                reader = relation.to_arrow_reader(batch_size)
+            else:
+                reader = relation.fetch_record_batch(batch_size)
+        except Exception:
+            state.cursor.close()
+            raise
+
+        return self._iter_record_batches(state.cursor, reader)
+
+    @staticmethod
+    def _iter_record_batches(
+        cursor: duckdb.DuckDBPyConnection, reader: pa.RecordBatchReader
+    ) -> Iterator[pa.RecordBatch]:
+        try:
+            yield from reader
+        finally:
+            cursor.close()
 
     def close(self):
-        """Manually close the connection if needed."""
-        self._close_connection()
+        """
+        Manually close the connection if needed, with the cursors of all the
+        threads. The next instance opens a new database.
+        """
+        with self._instance_lock:
+            if DuckDBConnectionManager._instance is self:
+                DuckDBConnectionManager._instance = None
+
+        with self._registry_lock:
+            cursors = list(self._cursors)
+        for cursor in cursors:
+            cursor.close()
+        self.connection.close()
@@ -1,5 +1,6 @@
 import os
 from abc import ABC, abstractmethod
+from typing import Hashable, Optional
 
 import pandas as pd
 import yaml
@@ -87,6 +88,20 @@ class DatasetLoader(ABC):
         """
         raise MethodNotImplementedError("Loader not instantiated")
 
+    def get_data_version(self) -> Optional[Hashable]:
+        """
+        Return a version of the data of the dataset, changing whenever its data
+        changes. Returns None when the version can't be determined.
+        """
+        return None
+
+    def get_row_count_statistic(self) -> Optional[int]:
+        """
+        Return a cached estimate of the number of rows of the dataset, used to
+        plan queries. Returns None when no statistic is available.
+        """
+        return None
+
     def _apply_transformations(self, df: pd.DataFrame) -> pd.DataFrame:
         if not self.schema.transformations:
             return df
@@ -1,4 +1,5 @@
 import os
+from typing import Hashable, Optional
 
 import duckdb
 import pandas as pd
@@ -30,21 +31,82 @@ class LocalDatasetLoader(DatasetLoader):
     def query_builder(self) -> LocalQueryBuilder:
         return self._query_builder
 
-    def register_table(self):
-        df = self.load()
+    def register_table(self, namespace: Optional[str] = None):
+        """
+        Register the dataset as a DuckDB table in the `namespace`, by default
+        the global one, unless its current data is already registered.
+        """
         db_manager = DuckDBConnectionManager()
-        db_manager.register(self.schema.name, df)
+        version = self.get_data_version()
+        if version is not None and db_manager.is_registered(
+            self.schema.name, version=version, namespace=namespace
+        ):
+            return
+
+        if version is not None and db_manager.register_stored(
+            self.schema.name, version, namespace=namespace
+        ):
+            return
+
+        # Loading the dataset imports it in the store, when it's writable
+        df = self.load()
+        if version is not None and db_manager.register_stored(
+            self.schema.name, version, namespace=namespace
+        ):
+            return
 
-    def load(self) -> DataFrame:
-        df: pd.DataFrame = self._load_from_local_source()
-        df = self._filter_columns(df)
-        df = self._apply_transformations(df)
+        if version is not None and db_manager.import_table(
+            self.schema.name, df, version, namespace=namespace
+        ):
+            return
+
+        db_manager.register(self.schema.name, df, version=version, namespace=namespace)
+
+    def get_data_version(self) -> Optional[Hashable]:
+        """
+        Return a version of the dataset changing with its schema and source file,
+        or None if the file can't be inspected.
+        """
+        file_manager = ConfigManager.get().file_manager
+        filepath = os.path.join(self.dataset_path, self.schema.source.path)
+        try:
+            stat = os.stat(file_manager.abs_path(filepath))
+        except (OSError, TypeError, ValueError):
+            return None
+
+        return self.schema.model_dump_json(), stat.st_size, stat.st_mtime_ns
 
-        return DataFrame(
+    def load(self) -> DataFrame:
+        """
+        Load the dataset. With a persistent store, the dataset is read from
+        it once imported, instead of reading and transforming its file again,
+        and it's imported in it otherwise. The agents then query the native
+        table of the store rather than the returned DataFrame, as long as the
+        shape of the DataFrame doesn't change.
+        """
+        db_manager = DuckDBConnectionManager()
+        version = self.get_data_version()
+        df = (
+            db_manager.read_stored(self.schema.name, version)
+            if version is not None
+            else None
+        )
+        stored = df is not None
+        if df is None:
+            df = self._load_from_local_source()
+            df = self._filter_columns(df)
+            df = self._apply_transformations(df)
+            if version is not None:
+                stored = db_manager.store_table(self.schema.name, df, version)
+
+        df = DataFrame(
             df,
             schema=self.schema,
             path=self.dataset_path,
         )
+        if stored:
+            df._stored_version = (version, db_manager.get_data_version(df))
+        return df
 
     def _load_from_local_source(self) -> pd.DataFrame:
         source_type = self.schema.source.type
@@ -1,26 +1,68 @@
+import contextvars
 import importlib
-from typing import Optional
+import time
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, Optional, Tuple
 
 import pandas as pd
+from sqlglot import exp
 
 from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
 from pandasai.exceptions import InvalidDataSourceType, MaliciousQueryError
 from pandasai.helpers.sql_sanitizer import is_sql_query_safe
 from pandasai.query_builders import SqlQueryBuilder
 
+from ..config import ConfigManager
 from ..constants import (
+    DEFAULT_ROW_COUNT_STATISTICS_TTL,
     SUPPORTED_SOURCE_CONNECTORS,
 )
 from ..query_builders.sql_parser import SQLParser
 from .loader import DatasetLoader
 from .semantic_layer_schema import SemanticLayerSchema
 
+# Data versions by source and version query, set while they're memoized
+_data_versions: "contextvars.ContextVar[Optional[Dict[tuple, Hashable]]]" = (
+    contextvars.ContextVar("data_versions", default=None)
+)
+
+
+@contextmanager
+def memoize_data_versions() -> Iterator[None]:
+    """
+    Run the data version query of each SQL dataset at most once in the block,
+    e.g. while answering a question, whose caches all fingerprint the data.
+    Nested blocks reuse the versions of the outer one.
+    """
+    if _data_versions.get() is not None:
+        yield
+        return
+
+    token = _data_versions.set({})
+    try:
+        yield
+    finally:
+        _data_versions.reset(token)
+
 
 class SQLDatasetLoader(DatasetLoader):
     """
     Loader for SQL-based datasets.
     """
 
+    # Row counts shared by all the loaders of a dataset, keyed by schema fingerprint
+    _row_count_statistics: Dict[str, Tuple[float, int]] = {}
+
+    # Queries reading the number of rows of a table estimated by the database
+    # in its catalog, without scanning the table
+    _ROW_COUNT_ESTIMATE_QUERIES = {
+        "postgres": "SELECT reltuples FROM pg_class WHERE oid = to_regclass({table})",
+        "mysql": (
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = {schema} AND TABLE_NAME = {name}"
+        ),
+    }
+
     def __init__(self, schema: SemanticLayerSchema, dataset_path: str):
         super().__init__(schema, dataset_path)
         self._query_builder: SqlQueryBuilder = SqlQueryBuilder(schema)
@@ -36,11 +78,21 @@ class SQLDatasetLoader(DatasetLoader):
             path=self.dataset_path,
         )
 
-    def execute_query(self, query: str, params: Optional[list] = None) -> pd.DataFrame:
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        namespace: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Execute the query on the data source. The DuckDB `namespace` is only
+        used by views over local datasets.
+        """
         source_type = self.schema.source.type
         connection_info = self.schema.source.connection
 
         load_function = self._get_loader_function(source_type)
+        query = SQLParser.optimize_query(query)
         query = SQLParser.transpile_sql_dialect(query, to_dialect=source_type)
 
         if not is_sql_query_safe(query, source_type):
@@ -82,3 +134,83 @@ class SQLDatasetLoader(DatasetLoader):
         query = self.query_builder.get_row_count()
         result = self.execute_query(query)
         return result.iloc[0, 0]
+
+    def get_data_version(self) -> Optional[Hashable]:
+        """
+        Return the result of the configured `sql_data_version_query` on the
+        table of the dataset, or None if no query is configured or it fails.
+        """
+        version_query = ConfigManager.get().sql_data_version_query
+        if not version_query:
+            return None
+
+        query = version_query.replace(
+            "{table}", self.query_builder._get_table_expression()
+        )
+        data_versions = _data_versions.get()
+        key = (self.schema.source.model_dump_json(), query)
+        if data_versions is not None and key in data_versions:
+            return data_versions[key]
+
+        try:
+            result = self.execute_query(query)
+            version = tuple(result.itertuples(index=False, name=None))
+        except Exception:
+            version = None
+
+        if data_versions is not None:
+            data_versions[key] = version
+        return version
+
+    def get_row_count_estimate(self) -> Optional[int]:
+        """
+        Return the number of rows of the table estimated by the database in
+        its catalog, e.g. `pg_class.reltuples` in PostgreSQL, or None if the
+        database doesn't provide an estimate. Unlike `get_row_count`, the
+        table isn't scanned.
+        """
+        source = self.schema.source
+        template = self._ROW_COUNT_ESTIMATE_QUERIES.get(source.type)
+        if template is None or not source.table:
+            return None
+
+        table = source.table.lower()
+        schema, _, name = table.rpartition(".")
+        schema = schema or (source.connection.database if source.connection else None)
+        query = template.format(
+            table=exp.Literal.string(table).sql(),
+            schema=exp.Literal.string(schema).sql() if schema else "NULL",
+            name=exp.Literal.string(name).sql(),
+        )
+        if not is_sql_query_safe(query, source.type):
+            return None
+
+        load_function = self._get_loader_function(source.type)
+        result = load_function(source.connection, query, None)
+        if result.empty or pd.isna(result.iloc[0, 0]):
+            return None
+
+        # PostgreSQL returns -1 for the tables that have never been analyzed
+        estimate = int(result.iloc[0, 0])
+        return estimate if estimate >= 0 else None
+
+    def get_row_count_statistic(self) -> Optional[int]:
+        """
+        Return the row count of the dataset estimated by its database, cached
+        for all its loaders. Counting the rows would scan the whole table, so
+        None is returned for the databases without estimates.
+        """
+        key = self.query_builder.get_schema_fingerprint()
+        cached = SQLDatasetLoader._row_count_statistics.get(key)
+        if cached and time.time() - cached[0] < DEFAULT_ROW_COUNT_STATISTICS_TTL:
+            return cached[1]
+
+        try:
+            row_count = self.get_row_count_estimate()
+        except Exception:
+            return None
+        if row_count is None:
+            return None
+
+        SQLDatasetLoader._row_count_statistics[key] = (time.time(), row_count)
+        return row_count
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Hashable, Optional
 
 import duckdb
 import pandas as pd
@@ -64,6 +64,17 @@ class ViewDatasetLoader(SQLDatasetLoader):
 
         return dependency_dict
 
+    def get_data_version(self) -> Optional[Hashable]:
+        """Return the versions of the datasets of the view, if all are known."""
+        versions = []
+        for name, loader in sorted(self.schema_dependencies_dict.items()):
+            version = loader.get_data_version()
+            if version is None:
+                return None
+            versions.append((name, version))
+
+        return tuple(versions)
+
     def load(self) -> VirtualDataFrame:
         return VirtualDataFrame(
             schema=self.schema,
@@ -71,25 +82,37 @@ class ViewDatasetLoader(SQLDatasetLoader):
             path=self.dataset_path,
         )
 
-    def execute_local_query(self, query) -> pd.DataFrame:
+    def execute_local_query(
+        self, query, namespace: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Execute the query on the local datasets of the view, registered in the
+        DuckDB `namespace`, by default the global one.
+        """
         try:
             db_manager = DuckDBConnectionManager()
 
             for loader in list(self.schema_dependencies_dict.values()):
                 if isinstance(loader, LocalDatasetLoader):
-                    loader.register_table()
+                    loader.register_table(namespace=namespace)
 
-            return db_manager.sql(query).df()
+            return db_manager.sql(query, namespace=namespace).df()
         except duckdb.Error as e:
             raise RuntimeError(f"SQL execution failed: {e}") from e
 
-    def execute_query(self, query: str, params: Optional[list] = None) -> pd.DataFrame:
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[list] = None,
+        namespace: Optional[str] = None,
+    ) -> pd.DataFrame:
         source_type = self.source.type
         connection_info = self.source.connection
 
         if source_type in LOCAL_SOURCE_TYPES:
-            return self.execute_local_query(query)
+            return self.execute_local_query(query, namespace=namespace)
         load_function = self._get_loader_function(source_type)
+        query = SQLParser.optimize_query(query)
         query = SQLParser.transpile_sql_dialect(query, to_dialect=source_type)
 
         if not is_sql_query_safe(query, dialect=source_type):
@@ -3,7 +3,7 @@ from __future__ import annotations
 import hashlib
 import os
 from io import BytesIO
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Hashable, Optional, Tuple, Union
 from zipfile import ZipFile
 
 import pandas as pd
@@ -11,6 +11,7 @@ from pandas._typing import Axes, Dtype
 
 import pandasai as pai
 from pandasai.config import Config, ConfigManager
+from pandasai.constants import LOCAL_SOURCE_TYPES
 from pandasai.core.response import BaseResponse
 from pandasai.data_loader.semantic_layer_schema import (
     Column,
@@ -46,6 +47,10 @@ class DataFrame(pd.DataFrame):
         "schema",
     ]
 
+    # Version of the dataset in the persistent store and of the DataFrame when
+    # it was loaded, if the dataset is stored
+    _stored_version: Optional[Tuple[Hashable, Hashable]] = None
+
     def __init__(
         self,
         data=None,
@@ -95,6 +100,35 @@ class DataFrame(pd.DataFrame):
     def type(self) -> str:
         return "pd.DataFrame"
 
+    def get_data_fingerprint(self) -> str:
+        """
+        Return a fingerprint of the dataset changing with its schema, its
+        columns and the version of its data, when the loader of the dataset can
+        determine it, e.g. the size and modification time of a local file.
+        """
+        schema_hash = hashlib.md5(self.schema.model_dump_json().encode()).hexdigest()
+        data_version = self._get_data_version()
+        version_hash = (
+            hashlib.md5(repr(data_version).encode()).hexdigest()
+            if data_version is not None
+            else ""
+        )
+        return f"{schema_hash}:{self.column_hash}:{version_hash}"
+
+    def _get_data_version(self) -> Optional[Hashable]:
+        if not self.path or not self.schema.source:
+            return None
+        if self.schema.source.type not in LOCAL_SOURCE_TYPES:
+            return None
+
+        from pandasai.data_loader.local_loader import LocalDatasetLoader
+
+        try:
+            loader = LocalDatasetLoader(self.schema, self.path)
+        except ValueError:
+            return None
+        return loader.get_data_version()
+
     def chat(self, prompt: str, sandbox: Optional[Sandbox] = None) -> BaseResponse:
         """
         Interact with the DataFrame using natural language.
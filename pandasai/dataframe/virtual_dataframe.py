@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Hashable, Optional
 
 import pandas as pd
 
@@ -47,5 +47,16 @@ class VirtualDataFrame(DataFrame):
     def query_builder(self):
         return self._loader.query_builder
 
-    def execute_sql_query(self, query: str) -> pd.DataFrame:
-        return self._loader.execute_query(query)
+    def _get_data_version(self) -> Optional[Hashable]:
+        return self._loader.get_data_version()
+
+    def execute_sql_query(
+        self, query: str, namespace: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Execute the query on the data source. Views over local datasets
+        register and query their tables in the DuckDB `namespace`, if given.
+        """
+        if namespace is None:
+            return self._loader.execute_query(query)
+        return self._loader.execute_query(query, namespace=namespace)
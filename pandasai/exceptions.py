@@ -290,3 +290,21 @@ class UnsupportedTransformation(Exception):
     """Raised when a transformation is not supported."""
 
     pass
+
+
+class CacheBackendError(Exception):
+    """Raised when a cache backend fails or replies with an error."""
+
+    pass
+
+
+class WorkerPoolError(Exception):
+    """Raised when the workers of a pool fail to start or to answer a question."""
+
+    pass
+
+
+class WorkerPoolBusyError(WorkerPoolError):
+    """Raised when the queue of a worker pool is full or the pool is draining."""
+
+    pass
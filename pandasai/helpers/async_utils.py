@@ -0,0 +1,20 @@
+"""Helpers to call blocking code from coroutines."""
+
+import asyncio
+import contextvars
+import functools
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+async def run_in_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function in the default executor of the running event loop,
+    so it doesn't block the other coroutines. Equivalent to `asyncio.to_thread`,
+    which is not available in Python 3.8.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(None, call)
@@ -0,0 +1,69 @@
+import traceback
+from typing import List, Optional
+
+# File name of the frames of the code run with `exec`
+GENERATED_CODE_FILENAME = "<string>"
+
+
+def format_code_error(error: BaseException, code: Optional[str] = None) -> str:
+    """
+    Format the traceback of an error raised by generated code, keeping only the
+    frames of the generated code, the messages of the exceptions raised through
+    it and the message of the root cause.
+
+    The internal frames of the library, pandas or the database drivers don't
+    help to fix the code, and can make up most of the traceback.
+
+    Args:
+        error (BaseException): the error, e.g. a `CodeExecutionError`.
+        code (str, optional): the code that failed, to show the failing lines.
+
+    Returns:
+        str: the trimmed traceback.
+    """
+    chain: List[BaseException] = []
+    exc: Optional[BaseException] = error
+    while exc is not None and exc not in chain:
+        chain.append(exc)
+        exc = exc.__cause__ or (None if exc.__suppress_context__ else exc.__context__)
+
+    # Like Python, show the root cause first
+    chain.reverse()
+    code_lines = code.splitlines() if code else []
+
+    frames = {
+        exc: [
+            frame
+            for frame in traceback.extract_tb(exc.__traceback__)
+            if frame.filename == GENERATED_CODE_FILENAME
+        ]
+        for exc in chain
+    }
+    messages = {
+        exc: [
+            line.rstrip("\n")
+            for line in traceback.format_exception_only(type(exc), exc)
+        ]
+        for exc in chain
+    }
+    # The exceptions raised through the code explain the error, the ones
+    # wrapping them add nothing but repeated messages. The root cause is
+    # always kept, e.g. the error of the database behind a wrapping error.
+    relevant = [exc for exc in chain if frames[exc]]
+    root = chain[0]
+    if all(messages[exc] != messages[root] for exc in relevant):
+        relevant.insert(0, root)
+
+    parts = []
+    for exc in relevant:
+        lines = []
+        if frames[exc]:
+            lines.append("Traceback (most recent call last):")
+            for frame in frames[exc]:
+                lines.append(f"  Line {frame.lineno}, in {frame.name}")
+                if frame.lineno and 0 < frame.lineno <= len(code_lines):
+                    lines.append(f"    {code_lines[frame.lineno - 1].strip()}")
+        lines.extend(messages[exc])
+        parts.append("\n".join(lines))
+
+    return "\n\n".join(parts)
@@ -42,7 +42,7 @@ class CustomJsonEncoder(JSONEncoder):
         if isinstance(obj, pd.DataFrame):
             return obj.to_dict(orient="split")
 
-        if numpy_converted := convert_numpy_types(obj):
+        if (numpy_converted := convert_numpy_types(obj)) is not None:
             return numpy_converted
 
         return super().default(obj)
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import ast
+import contextvars
 import re
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from pandasai.core.prompts.base import BasePrompt
 from pandasai.core.prompts.generate_system_message import GenerateSystemMessagePrompt
+from pandasai.helpers.async_utils import run_in_thread
 from pandasai.helpers.memory import Memory
 
 from ..exceptions import (
@@ -158,6 +161,47 @@ class LLM:
         """
         raise MethodNotImplementedError("Call method has not been implemented")
 
+    async def acall(self, instruction: BasePrompt, context: AgentState = None) -> str:
+        """
+        Execute the LLM with given prompt asynchronously.
+
+        By default, `call` is run in a thread so it doesn't block the event
+        loop. LLMs with an asynchronous client should override it.
+
+        Args:
+            instruction (BasePrompt): A prompt object with instruction for LLM.
+            context (AgentState, optional): AgentState. Defaults to None.
+        """
+        return await run_in_thread(self.call, instruction, context)
+
+    def call_many(
+        self, instruction: BasePrompt, context: AgentState = None, n: int = 1
+    ) -> List[str]:
+        """
+        Execute the LLM with given prompt and return `n` responses.
+
+        By default, `call` is run `n` times in parallel threads. LLMs able to
+        return several completions of a single request should override it.
+
+        Args:
+            instruction (BasePrompt): A prompt object with instruction for LLM.
+            context (AgentState, optional): AgentState. Defaults to None.
+            n (int): number of responses.
+        """
+        if n <= 1:
+            return [self.call(instruction, context)]
+
+        # Render the prompt once, before the threads use it
+        instruction.to_string()
+        with ThreadPoolExecutor(max_workers=n) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self.call, instruction, context
+                )
+                for _ in range(n)
+            ]
+            return [future.result() for future in futures]
+
     def generate_code(self, instruction: BasePrompt, context: AgentState) -> str:
         """
         Generate the code based on the instruction and the given prompt.
@@ -171,3 +215,47 @@ class LLM:
         """
         response = self.call(instruction, context)
         return self._extract_code(response)
+
+    async def agenerate_code(self, instruction: BasePrompt, context: AgentState) -> str:
+        """
+        Generate the code based on the instruction and the given prompt
+        asynchronously.
+
+        Args:
+            instruction (BasePrompt): Prompt with instruction for LLM.
+
+        Returns:
+            str: A string of Python code.
+
+        """
+        response = await self.acall(instruction, context)
+        return self._extract_code(response)
+
+    def generate_code_candidates(
+        self, instruction: BasePrompt, context: AgentState, n: int
+    ) -> List[str]:
+        """
+        Generate `n` candidate codes based on the instruction and the given
+        prompt. The responses without code are skipped.
+
+        Args:
+            instruction (BasePrompt): Prompt with instruction for LLM.
+            n (int): number of candidates.
+
+        Raises:
+            NoCodeFoundError: No code found in any of the responses
+
+        Returns:
+            List[str]: The Python codes of the candidates.
+        """
+        codes = []
+        error = None
+        for response in self.call_many(instruction, context, n):
+            try:
+                codes.append(self._extract_code(response))
+            except NoCodeFoundError as e:
+                error = e
+
+        if not codes:
+            raise error
+        return codes
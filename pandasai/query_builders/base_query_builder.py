@@ -65,6 +65,11 @@ class BaseQueryBuilder:
     def _get_table_expression(self) -> str:
         return normalize_identifiers(self.schema.name).sql(pretty=True)
 
+    def get_schema_fingerprint(self) -> str:
+        """Return a string that changes whenever the compiled query could change."""
+        # Transformations are applied on the loaded data, not in the query
+        return self.schema.model_dump_json(exclude={"transformations"})
+
     @staticmethod
     def check_compatible_sources(sources: List[Source]) -> bool:
         base_source = sources[0]
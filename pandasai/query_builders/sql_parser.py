@@ -1,40 +1,69 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
 import sqlglot
 from sqlglot import ParseError, exp, parse_one
-from sqlglot.optimizer.qualify_columns import quote_identifiers
+from sqlglot.optimizer.merge_subqueries import merge_subqueries
+from sqlglot.optimizer.pushdown_predicates import pushdown_predicates
+from sqlglot.optimizer.pushdown_projections import pushdown_projections
+from sqlglot.optimizer.qualify_columns import qualify_columns, quote_identifiers
+from sqlglot.optimizer.qualify_tables import qualify_tables
+from sqlglot.optimizer.simplify import simplify
 
 from pandasai.exceptions import MaliciousQueryError
 
 
 class SQLParser:
     @staticmethod
-    def replace_table_and_column_names(query, table_mapping):
+    def parse_table_mapping(
+        table_mapping: Dict[str, Union[str, exp.Expression]],
+    ) -> Dict[str, exp.Expression]:
         """
-        Transform a SQL query by replacing table names with either new table names or subqueries.
+        Parse the values of a table mapping into sqlglot expressions.
+
+        The result can be reused across calls to `replace_table_and_column_names`
+        to avoid re-parsing the same subqueries for every query.
 
         Args:
-            query (str): Original SQL query
-            table_mapping (dict): Dictionary mapping original table names to either:
-                           - actual table names (str)
-                           - subqueries (str)
+            table_mapping (dict): Dictionary mapping original table names to either
+                actual table names (str), subqueries (str) or parsed expressions
         """
-        # Pre-parse all subqueries in mapping to avoid repeated parsing
         parsed_mapping = {}
         for key, value in table_mapping.items():
+            if isinstance(value, exp.Expression):
+                parsed_mapping[key] = value
+                continue
             try:
                 parsed_mapping[key] = parse_one(value)
             except ParseError:
                 raise ValueError(f"{value} is not a valid SQL expression")
+        return parsed_mapping
+
+    @staticmethod
+    def replace_table_and_column_names(
+        query: str, table_mapping: Dict[str, Union[str, exp.Expression]]
+    ) -> str:
+        """
+        Transform a SQL query by replacing table names with either new table names or subqueries.
+
+        Args:
+            query (str): Original SQL query
+            table_mapping (dict): Dictionary mapping original table names to either:
+                           - actual table names (str)
+                           - subqueries (str)
+                           - already parsed expressions (see `parse_table_mapping`)
+        """
+        # Pre-parse all subqueries in mapping to avoid repeated parsing
+        parsed_mapping = SQLParser.parse_table_mapping(table_mapping)
 
         def transform_node(node):
             # Handle Table nodes
             if isinstance(node, exp.Table):
                 original_name = node.name
 
-                if original_name in table_mapping:
+                if original_name in parsed_mapping:
                     alias = node.alias or original_name
-                    mapped_value = parsed_mapping[original_name]
+                    # Copy the mapped node so the parsed mapping can be reused
+                    mapped_value = parsed_mapping[original_name].copy()
                     if isinstance(mapped_value, exp.Alias):
                         return exp.Subquery(
                             this=mapped_value.this.this,
@@ -56,6 +85,170 @@ class SQLParser:
         # Convert back to SQL string
         return transformed.sql(pretty=True)
 
+    @staticmethod
+    def optimize_query(query: str) -> str:
+        """
+        Simplify a query before sending it to the data source by pushing outer
+        filters into subqueries, removing unused columns and merging subqueries.
+
+        This mostly targets the nested subqueries generated for views, which
+        many engines can't optimize on their own. The output column names of
+        the query are preserved, and the original query is returned whenever
+        the query can't be optimized, or when a subquery depends on the whole
+        set of its rows (LIMIT, OFFSET, DISTINCT, window functions and
+        aggregates), since moving filters inside would change its result.
+
+        Args:
+            query (str): SQL query to optimize
+
+        Returns:
+            str: The optimized SQL query
+        """
+        try:
+            parsed = parse_one(query)
+        except ParseError:
+            return query
+
+        # Only queries over subqueries (e.g. views) can benefit from the rewrite
+        if not isinstance(parsed, exp.Query) or not parsed.find(exp.Subquery):
+            return query
+
+        if SQLParser._has_set_dependent_subquery(parsed):
+            return query
+
+        try:
+            optimized = qualify_tables(parsed.copy())
+            optimized = qualify_columns(optimized, schema=None)
+            optimized = pushdown_projections(optimized)
+            optimized = pushdown_predicates(optimized)
+            optimized = merge_subqueries(optimized)
+            optimized = simplify(optimized)
+        except Exception:
+            # The optimization is best effort, the query is still valid as is
+            return query
+
+        SQLParser._restore_output_names(parsed, optimized)
+        return optimized.sql(pretty=True)
+
+    @staticmethod
+    def _has_set_dependent_subquery(parsed: exp.Expression) -> bool:
+        """
+        Whether a nested SELECT computes its rows from the whole set of rows
+        it reads, e.g. the top 10 rows, in which case an outer filter can't be
+        applied before it.
+        """
+        for select in parsed.find_all(exp.Select):
+            if select is parsed:
+                continue
+            if any(
+                select.args.get(clause)
+                for clause in ("limit", "offset", "distinct", "group", "having")
+            ):
+                return True
+            if select.find(exp.Window, exp.AggFunc):
+                return True
+        return False
+
+    @staticmethod
+    def _restore_output_names(original: exp.Expression, optimized: exp.Expression):
+        """
+        Restore the output names of the original projections, with their
+        quoting, e.g. so "Region" isn't folded to region by the database, and
+        remove the aliases added by the optimizer to unnamed projections.
+        """
+        if not isinstance(original, exp.Select) or not isinstance(
+            optimized, exp.Select
+        ):
+            return
+
+        if any(isinstance(projection, exp.Star) for projection in original.selects):
+            return
+
+        for projection, optimized_projection in zip(
+            original.selects, optimized.selects
+        ):
+            unaliased = (
+                optimized_projection.this
+                if isinstance(optimized_projection, exp.Alias)
+                else optimized_projection
+            )
+            if isinstance(projection, exp.Alias):
+                name = projection.args.get("alias")
+            elif isinstance(projection, exp.Column):
+                name = projection.this
+            else:
+                name = None
+
+            if not projection.output_name:
+                optimized_projection.replace(unaliased)
+            elif isinstance(name, exp.Identifier):
+                optimized_projection.replace(exp.alias_(unaliased.copy(), name.copy()))
+
+    @staticmethod
+    def limit_query(query: str, limit: int) -> str:
+        """
+        Make sure a query doesn't return more than `limit` rows, keeping any
+        smaller limit already defined in the query.
+
+        Args:
+            query (str): SQL query to limit
+            limit (int): Maximum number of rows returned by the query
+
+        Returns:
+            str: The limited SQL query
+        """
+        try:
+            parsed = parse_one(query)
+        except ParseError:
+            return query
+
+        if not isinstance(parsed, exp.Query):
+            return query
+
+        current_limit = parsed.args.get("limit")
+        if current_limit is not None:
+            value = current_limit.expression
+            if (
+                isinstance(value, exp.Literal)
+                and value.is_int
+                and value.to_py() <= limit
+            ):
+                return query
+
+        return parsed.limit(limit).sql(pretty=True)
+
+    @staticmethod
+    def sample_query(query: str, rows: int) -> str:
+        """
+        Read at most `rows` randomly sampled rows from the table the query
+        selects from. Joined tables are not sampled, so joins stay complete.
+        Only plain row queries are sampled: the result of aggregates, e.g.
+        sums or counts, would silently change when computed on a sample.
+
+        Args:
+            query (str): SQL query to sample
+            rows (int): Number of rows to sample
+
+        Returns:
+            str: The sampled SQL query, or the original one if it can't be sampled
+        """
+        try:
+            parsed = parse_one(query)
+        except ParseError:
+            return query
+
+        from_ = parsed.args.get("from") if isinstance(parsed, exp.Select) else None
+        if from_ is None or not isinstance(from_.this, exp.Table):
+            return query
+
+        if any(parsed.args.get(clause) for clause in ("group", "having", "distinct")):
+            return query
+        if parsed.find(exp.AggFunc, exp.Window):
+            return query
+
+        from_.this.set("sample", exp.TableSample(size=exp.Literal.number(rows)))
+        return parsed.sql(pretty=True)
+
     @staticmethod
     def transpile_sql_dialect(query, to_dialect, from_dialect=None):
         query = (
@@ -1,5 +1,5 @@
 import re
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from sqlglot import exp, expressions, parse_one, select
 from sqlglot.expressions import Subquery
@@ -19,6 +19,7 @@ class ViewQueryBuilder(BaseQueryBuilder):
     ):
         super().__init__(schema)
         self.schema_dependencies_dict = schema_dependencies_dict
+        self._compiled_table_expression: Optional[Tuple[str, exp.Subquery, str]] = None
 
     @staticmethod
     def normalize_view_column_name(name: str) -> str:
@@ -62,7 +63,7 @@ class ViewQueryBuilder(BaseQueryBuilder):
 
     def build_query(self) -> str:
         """Build the SQL query with proper group by column aliasing."""
-        query = select(*self._get_columns()).from_(self._get_table_expression())
+        query = select(*self._get_columns()).from_(self._get_table_expression_ast())
 
         if self.schema.group_by:
             query = query.group_by(
@@ -79,7 +80,7 @@ class ViewQueryBuilder(BaseQueryBuilder):
 
     def get_head_query(self, n=5):
         """Get the head query with proper group by column aliasing."""
-        query = select(*self._get_columns()).from_(self._get_table_expression())
+        query = select(*self._get_columns()).from_(self._get_table_expression_ast())
 
         if self.schema.group_by:
             query = query.group_by(
@@ -94,23 +95,71 @@ class ViewQueryBuilder(BaseQueryBuilder):
         sub_query = parse_one(loader.query_builder.build_query())
         return exp.Subquery(this=sub_query, alias=loader.schema.name)
 
+    def get_schema_fingerprint(self) -> str:
+        dependencies_fingerprint = "|".join(
+            loader.query_builder.get_schema_fingerprint()
+            for loader in self.schema_dependencies_dict.values()
+        )
+        return f"{super().get_schema_fingerprint()}|{dependencies_fingerprint}"
+
+    def _get_compiled_table_expression(self) -> Tuple[exp.Subquery, str]:
+        """
+        Return the compiled join tree of the view, both as AST and as SQL.
+
+        The join tree is only rebuilt when the view schema or one of its
+        dependencies' schemas changes.
+        """
+        fingerprint = self.get_schema_fingerprint()
+        if (
+            self._compiled_table_expression is None
+            or self._compiled_table_expression[0] != fingerprint
+        ):
+            table_expression = self._compile_table_expression()
+            self._compiled_table_expression = (
+                fingerprint,
+                table_expression,
+                table_expression.sql(pretty=True),
+            )
+
+        _, table_expression, table_expression_sql = self._compiled_table_expression
+        return table_expression, table_expression_sql
+
+    def _get_table_expression_ast(self) -> exp.Subquery:
+        table_expression, _ = self._get_compiled_table_expression()
+        return table_expression.copy()
+
     def _get_table_expression(self) -> str:
-        relations = self.schema.relations
-        columns = self.schema.columns
+        _, table_expression_sql = self._get_compiled_table_expression()
+        return table_expression_sql
+
+    def _get_dependency_row_counts(self) -> Optional[Dict[str, int]]:
+        """
+        Return the row count statistics of the dependencies, or None if any of
+        them is unknown.
+        """
+        row_counts = {}
+        for dataset, loader in self.schema_dependencies_dict.items():
+            row_count = loader.get_row_count_statistic()
+            if not isinstance(row_count, int):
+                return None
+            row_counts[dataset] = row_count
+        return row_counts
+
+    def _get_join_order(self) -> Tuple[str, List[Tuple[str, List[str]]]]:
+        """
+        Return the dataset to select from and the datasets to join with their
+        join conditions, in the order the joins should be emitted.
+        """
+        statistics_join_order = self._get_statistics_join_order()
+        if statistics_join_order:
+            return statistics_join_order
+
+        relations = self.schema.relations or []
         first_dataset = (
             relations[0].from_.split(".")[0]
             if relations
-            else columns[0].name.split(".")[0]
+            else self.schema.columns[0].name.split(".")[0]
         )
-        first_loader = self.schema_dependencies_dict[first_dataset]
-        first_query = self._get_sub_query_from_loader(first_loader)
-
-        columns = [
-            f"{self.normalize_view_column_name(col.name)} AS {self.normalize_view_column_alias(col.name)}"
-            for col in self.schema.columns
-        ]
-
-        query = select(*columns).from_(first_query)
 
         # Group relations by target dataset to combine multiple join conditions
         join_conditions = {}
@@ -122,8 +171,86 @@ class ViewQueryBuilder(BaseQueryBuilder):
                 f"{sanitize_view_column_name(relation.from_)} = {sanitize_view_column_name(relation.to)}"
             )
 
+        return first_dataset, list(join_conditions.items())
+
+    def _get_statistics_join_order(
+        self,
+    ) -> Optional[Tuple[str, List[Tuple[str, List[str]]]]]:
+        """
+        Order the joins using the row count statistics of the dependencies:
+        start from the smallest dataset and always join the smallest dataset
+        connected to the ones already joined, so the largest tables come last.
+
+        Returns None when the statistics are not available or the relations
+        can't be ordered without introducing cross joins.
+        """
+        relations = self.schema.relations or []
+        if not relations:
+            return None
+
+        relation_datasets = [
+            (relation.from_.split(".")[0], relation.to.split(".")[0], relation)
+            for relation in relations
+        ]
+        if any(from_ == to for from_, to, _ in relation_datasets):
+            return None
+
+        row_counts = self._get_dependency_row_counts()
+        if row_counts is None:
+            return None
+
+        # Keep the declaration order to break ties deterministically
+        datasets = list(
+            dict.fromkeys(
+                dataset for from_, to, _ in relation_datasets for dataset in (from_, to)
+            )
+        )
+
+        def size(dataset: str) -> Tuple[int, int]:
+            return row_counts[dataset], datasets.index(dataset)
+
+        first_dataset = min(datasets, key=size)
+        joined = {first_dataset}
+        joins = []
+        while len(joined) < len(datasets):
+            candidates = [
+                dataset
+                for dataset in datasets
+                if dataset not in joined
+                and any(
+                    {from_, to} == {dataset, other}
+                    for from_, to, _ in relation_datasets
+                    for other in joined
+                )
+            ]
+            if not candidates:
+                return None
+
+            next_dataset = min(candidates, key=size)
+            conditions = [
+                f"{sanitize_view_column_name(relation.from_)} = {sanitize_view_column_name(relation.to)}"
+                for from_, to, relation in relation_datasets
+                if {from_, to} - joined == {next_dataset}
+            ]
+            joins.append((next_dataset, conditions))
+            joined.add(next_dataset)
+
+        return first_dataset, joins
+
+    def _compile_table_expression(self) -> exp.Subquery:
+        first_dataset, joins = self._get_join_order()
+        first_loader = self.schema_dependencies_dict[first_dataset]
+        first_query = self._get_sub_query_from_loader(first_loader)
+
+        columns = [
+            f"{self.normalize_view_column_name(col.name)} AS {self.normalize_view_column_alias(col.name)}"
+            for col in self.schema.columns
+        ]
+
+        query = select(*columns).from_(first_query)
+
         # Create joins with combined conditions
-        for to_datasets, conditions in join_conditions.items():
+        for to_datasets, conditions in joins:
             loader = self.schema_dependencies_dict[to_datasets]
             subquery = self._get_sub_query_from_loader(loader)
             query = query.join(
@@ -132,4 +259,4 @@ class ViewQueryBuilder(BaseQueryBuilder):
                 append=True,
             )
         alias = normalize_identifiers(self.schema.name).sql()
-        return exp.Subquery(this=query, alias=alias).sql(pretty=True)
+        return exp.Subquery(this=query, alias=alias)
@@ -0,0 +1,4 @@
+from .api import create_server, serve
+from .pool import WorkerPool, response_to_dict
+
+__all__ = ["WorkerPool", "create_server", "response_to_dict", "serve"]
@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from pandasai.constants import DEFAULT_SERVER_HOST, DEFAULT_SERVER_PORT
+from pandasai.exceptions import WorkerPoolBusyError, WorkerPoolError
+
+from .pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+
+class ChatRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the API of the server:
+
+    - `POST /chat` with a JSON body `{"query": ..., "datasets": [...],
+      "output_type": ...}` answers a question in a new conversation and
+      returns `{"response": {...}}`.
+    - `GET /health` returns the state of the worker pool.
+    """
+
+    server_version = "PandaAI"
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        stats = self.server.pool.stats()
+        status = "ok" if stats["accepting"] else "draining"
+        self._send_json(200, {"status": status, **stats})
+
+    def do_POST(self) -> None:
+        if self.path != "/chat":
+            self._send_json(404, {"error": f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            query = body["query"]
+            datasets = body.get("datasets")
+            if not isinstance(query, str) or not (
+                datasets is None or isinstance(datasets, list)
+            ):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self._send_json(
+                400,
+                {"error": 'Expected a JSON body like {"query": "...", "datasets": []}'},
+            )
+            return
+
+        try:
+            future = self.server.pool.submit(query, datasets, body.get("output_type"))
+            response = future.result(self.server.request_timeout)
+        except WorkerPoolBusyError as e:
+            self._send_json(503, {"error": str(e)})
+        except FutureTimeoutError:
+            self._send_json(504, {"error": "The question timed out."})
+        except WorkerPoolError as e:
+            self._send_json(500, {"error": str(e)})
+        else:
+            self._send_json(200, {"response": response})
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def address_string(self) -> str:
+        # The address of the clients of a Unix socket is empty
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+# The requests are answered in threads joined when the server is closed, so
+# the questions pending when it stops get their responses
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = False
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = False
+
+
+def create_server(
+    pool: WorkerPool,
+    host: str = DEFAULT_SERVER_HOST,
+    port: int = DEFAULT_SERVER_PORT,
+    socket_path: Optional[str] = None,
+    request_timeout: Optional[float] = None,
+) -> socketserver.BaseServer:
+    """
+    Create the HTTP server of the API of a worker pool, listening on a TCP
+    address or on a Unix socket.
+
+    Args:
+        pool (WorkerPool): the started pool answering the questions.
+        host (str): the host to listen on.
+        port (int): the port to listen on, 0 to pick a free one.
+        socket_path (str, optional): the path of a Unix socket to listen on
+            instead of the TCP address.
+        request_timeout (float, optional): maximum number of seconds to wait
+            for a response.
+    """
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixServer(socket_path, ChatRequestHandler)
+    else:
+        server = _TCPServer((host, port), ChatRequestHandler)
+
+    server.pool = pool
+    server.request_timeout = request_timeout
+    return server
+
+
+def serve(
+    pool: WorkerPool,
+    host: str = DEFAULT_SERVER_HOST,
+    port: int = DEFAULT_SERVER_PORT,
+    socket_path: Optional[str] = None,
+    request_timeout: Optional[float] = None,
+    drain_timeout: Optional[float] = None,
+) -> None:
+    """
+    Start the worker pool and serve its API until SIGINT or SIGTERM, then drain
+    the pool: the pending questions are answered before the workers stop.
+    """
+    with pool:
+        server = create_server(pool, host, port, socket_path, request_timeout)
+
+        def stop(signum, frame):
+            # shutdown waits for serve_forever, which runs in this thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, stop)
+            signal.signal(signal.SIGTERM, stop)
+
+        try:
+            server.serve_forever()
+        finally:
+            pool.close(drain_timeout)
+            server.server_close()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.remove(socket_path)
@@ -0,0 +1,422 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+import uuid
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from pandasai.constants import (
+    DEFAULT_SERVER_QUEUE_SIZE,
+    DEFAULT_SERVER_START_TIMEOUT,
+    DEFAULT_SERVER_WORKER_CONCURRENCY,
+    DEFAULT_SERVER_WORKERS,
+)
+from pandasai.core.response.base import BaseResponse
+from pandasai.exceptions import WorkerPoolBusyError, WorkerPoolError
+from pandasai.helpers.json_encoder import CustomJsonEncoder
+
+logger = logging.getLogger(__name__)
+
+# Number of seconds between two checks that the workers are still alive
+_HEALTH_CHECK_INTERVAL = 0.2
+
+
+def response_to_dict(response: BaseResponse) -> Dict[str, Any]:
+    """Return a JSON serializable representation of a response."""
+    value = response.value
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+
+    return json.loads(
+        json.dumps(
+            {
+                "type": response.type,
+                "value": value,
+                "last_code_executed": response.last_code_executed,
+                "error": response.error,
+                "trace": response.trace.to_dict() if response.trace else None,
+            },
+            cls=CustomJsonEncoder,
+        )
+    )
+
+
+class WorkerPool:
+    """
+    Pool of long-lived worker processes answering questions on preloaded
+    datasets.
+
+    Each worker loads the datasets and configures the LLM once, then answers
+    up to `max_concurrency` questions at the same time, each in a new
+    conversation. Questions are queued until a worker is free, and rejected
+    once `max_queue_size` questions are pending.
+
+    Args:
+        datasets (List[str]): paths of the datasets loaded by the workers
+            (format: organization/dataset).
+        workers (int): number of worker processes.
+        max_concurrency (int): number of questions answered at the same time
+            by each worker.
+        max_queue_size (int): maximum number of pending questions, answered
+            or waiting for a worker.
+        initializer (Callable, optional): function called in each worker before
+            loading the datasets, e.g. to configure the LLM with
+            `pai.config.set`. It must be picklable with the "spawn" start method.
+        initargs (tuple): arguments of the initializer.
+        start_method (str): multiprocessing start method of the workers.
+    """
+
+    def __init__(
+        self,
+        datasets: List[str],
+        workers: int = DEFAULT_SERVER_WORKERS,
+        max_concurrency: int = DEFAULT_SERVER_WORKER_CONCURRENCY,
+        max_queue_size: int = DEFAULT_SERVER_QUEUE_SIZE,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple = (),
+        start_method: str = "spawn",
+    ):
+        if not datasets:
+            raise ValueError("At least one dataset must be provided.")
+        if workers < 1 or max_concurrency < 1 or max_queue_size < 1:
+            raise ValueError(
+                "workers, max_concurrency and max_queue_size must be positive integers."
+            )
+
+        self.datasets = list(datasets)
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+
+        context = multiprocessing.get_context(start_method)
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes = [
+            context.Process(
+                target=_run_worker,
+                args=(
+                    self.datasets,
+                    max_concurrency,
+                    initializer,
+                    initargs,
+                    self._tasks,
+                    self._results,
+                ),
+                daemon=True,
+            )
+            for _ in range(workers)
+        ]
+
+        self._futures: Dict[str, Future] = {}
+        # Worker process of each started question, to fail it if the worker dies
+        self._started: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._accepting = False
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect_results, daemon=True)
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+    def start(self, timeout: float = DEFAULT_SERVER_START_TIMEOUT) -> None:
+        """
+        Start the workers and wait until they have loaded the datasets.
+
+        Raises:
+            WorkerPoolError: if a worker fails to start.
+        """
+        for process in self._processes:
+            process.start()
+
+        try:
+            for _ in self._processes:
+                _, status, detail = self._results.get(timeout=timeout)
+                if status != "ready":
+                    raise WorkerPoolError(f"A worker failed to start:\n{detail}")
+        except queue.Empty:
+            self._terminate()
+            raise WorkerPoolError(
+                f"The workers didn't start within {timeout} seconds."
+            ) from None
+        except WorkerPoolError:
+            self._terminate()
+            raise
+
+        self._accepting = True
+        self._collector.start()
+
+    def submit(
+        self,
+        query: str,
+        datasets: Optional[Sequence[str]] = None,
+        output_type: Optional[str] = None,
+    ) -> Future:
+        """
+        Queue a question and return a future of its response, as returned by
+        `response_to_dict`.
+
+        Args:
+            query (str): the question, asked in a new conversation.
+            datasets (Sequence[str], optional): the datasets to query, among
+                the datasets of the pool. Defaults to all of them.
+            output_type (str, optional): the output type of the response.
+
+        Raises:
+            WorkerPoolBusyError: if the queue is full or the pool is draining.
+        """
+        future = Future()
+        # Queued questions can't be cancelled
+        future.set_running_or_notify_cancel()
+        task_id = uuid.uuid4().hex
+        with self._lock:
+            if not self._accepting:
+                raise WorkerPoolBusyError("The worker pool is not accepting questions.")
+            if len(self._futures) >= self.max_queue_size:
+                raise WorkerPoolBusyError(
+                    f"The queue of the worker pool is full ({self.max_queue_size} "
+                    "pending questions)."
+                )
+            self._futures[task_id] = future
+
+        self._tasks.put((task_id, query, list(datasets or []), output_type))
+        return future
+
+    def chat(
+        self,
+        query: str,
+        datasets: Optional[Sequence[str]] = None,
+        output_type: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Ask a question and wait for its response."""
+        return self.submit(query, datasets, output_type).result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state of the pool."""
+        with self._lock:
+            pending = len(self._futures)
+            running = len(self._started)
+        return {
+            "accepting": self._accepting,
+            "workers": sum(process.is_alive() for process in self._processes),
+            "pending": pending,
+            "running": running,
+        }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Drain the pool: stop accepting questions, wait for the pending ones to
+        be answered, then stop the workers.
+
+        Args:
+            timeout (float, optional): maximum number of seconds to wait for
+                the pending questions. The workers are terminated after it.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._accepting = False
+            pending = list(self._futures.values())
+
+        _, not_done = wait_futures(pending, timeout=timeout)
+
+        for _ in range(self.workers * self.max_concurrency):
+            self._tasks.put(None)
+        for process in self._processes:
+            if process.pid is not None:
+                process.join(timeout=0 if not_done else timeout)
+        self._terminate()
+
+        self._fail_pending(lambda _: True, "The worker pool has been closed.")
+        if self._collector.is_alive():
+            self._results.put(None)
+            self._collector.join()
+
+    def _terminate(self) -> None:
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    def _collect_results(self) -> None:
+        """Resolve the futures with the results sent back by the workers."""
+        while True:
+            try:
+                message = self._results.get(timeout=_HEALTH_CHECK_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if message is None:
+                return
+
+            task_id, status, detail = message
+            if status == "started":
+                with self._lock:
+                    if task_id in self._futures:
+                        self._started[task_id] = detail
+                continue
+
+            with self._lock:
+                future = self._futures.pop(task_id, None)
+                self._started.pop(task_id, None)
+            if future is None:
+                continue
+            if status == "done":
+                future.set_result(detail)
+            else:
+                future.set_exception(WorkerPoolError(detail))
+
+    def _check_workers(self) -> None:
+        """Fail the questions of the workers that died unexpectedly."""
+        if self._closed:
+            return
+
+        dead = {process.pid for process in self._processes if not process.is_alive()}
+        if not dead:
+            return
+
+        if len(dead) == len(self._processes):
+            self._accepting = False
+            self._fail_pending(lambda _: True, "All the workers have exited.")
+            return
+
+        with self._lock:
+            started = dict(self._started)
+        self._fail_pending(
+            lambda task_id: started.get(task_id) in dead,
+            "The worker answering the question has exited.",
+        )
+
+    def _fail_pending(self, predicate: Callable[[str], bool], message: str) -> None:
+        with self._lock:
+            task_ids = [task_id for task_id in self._futures if predicate(task_id)]
+            futures = [self._futures.pop(task_id) for task_id in task_ids]
+            for task_id in task_ids:
+                self._started.pop(task_id, None)
+
+        for future in futures:
+            logger.warning(message)
+            future.set_exception(WorkerPoolError(message))
+
+
+class _Worker:
+    """Datasets and agents of a worker process."""
+
+    def __init__(self, datasets: List[str]):
+        from pandasai import load
+
+        self.dfs = {path: load(path) for path in datasets}
+        self._agents = {}
+        self._lock = threading.Lock()
+
+        # Configure the LLM, the caches and the logger of the agent of all the
+        # datasets once, if they can be queried together
+        try:
+            self.get_agent(datasets)
+        except ValueError:
+            pass
+
+    def get_agent(self, datasets: Sequence[str]):
+        from pandasai.agent import Agent
+
+        key = tuple(sorted(set(datasets)))
+        with self._lock:
+            if key not in self._agents:
+                missing = [path for path in key if path not in self.dfs]
+                if missing:
+                    raise ValueError(
+                        f"The datasets {', '.join(missing)} are not loaded by the server."
+                    )
+                self._agents[key] = Agent([self.dfs[path] for path in key])
+            return self._agents[key]
+
+    def chat(
+        self, query: str, datasets: Sequence[str], output_type: Optional[str]
+    ) -> Dict[str, Any]:
+        agent = self.get_agent(datasets or list(self.dfs))
+        return response_to_dict(agent.chat_in_new_conversation(query, output_type))
+
+
+def _share_cache() -> None:
+    """Use a cache backend shared by the processes instead of DuckDB, whose
+    database can only be opened by one process at a time, e.g. by the process
+    starting the pool or another worker. The threads of a worker can share
+    any backend."""
+    from pandasai.config import ConfigManager
+
+    config = ConfigManager.get()
+    if config.enable_cache and config.cache_backend == "duckdb":
+        logger.warning(
+            "The DuckDB cache can't be shared by several processes, "
+            "using the SQLite cache backend instead."
+        )
+        config.cache_backend = "sqlite"
+
+
+def _share_store() -> None:
+    """Attach the persistent DuckDB store read-only, as DuckDB lets several
+    processes read its file but a single one write it. The datasets are
+    imported in the store beforehand, e.g. by another process."""
+    from pandasai.config import ConfigManager
+
+    config = ConfigManager.get()
+    if config.duckdb_database_path:
+        config.duckdb_read_only = True
+
+
+def _run_worker(
+    datasets: List[str],
+    max_concurrency: int,
+    initializer: Optional[Callable[..., None]],
+    initargs: Tuple,
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+) -> None:
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+        _share_cache()
+        _share_store()
+        worker = _Worker(datasets)
+    except Exception:
+        results.put((None, "failed", traceback.format_exc()))
+        return
+
+    results.put((None, "ready", os.getpid()))
+
+    threads = [
+        threading.Thread(target=_serve_tasks, args=(worker, tasks, results))
+        for _ in range(max_concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _serve_tasks(
+    worker: _Worker, tasks: multiprocessing.Queue, results: multiprocessing.Queue
+) -> None:
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+
+        task_id, query, datasets, output_type = task
+        results.put((task_id, "started", os.getpid()))
+        try:
+            results.put((task_id, "done", worker.chat(query, datasets, output_type)))
+        except Exception as e:
+            results.put((task_id, "failed", f"{type(e).__name__}: {e}"))
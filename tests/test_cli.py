@@ -242,3 +242,101 @@ def test_push_command_error(mock_dataset_loader):
 
     assert result.exit_code == 0  # CLI handles the error gracefully
     assert "Error pushing dataset: Test error" in result.output
+
+
+@pytest.fixture
+def mock_cache():
+    with patch("pandasai.cli.main.Cache") as mock:
+        yield mock.from_config.return_value
+
+
+def test_cache_export_command(mock_cache):
+    """Test cache export command"""
+    runner = CliRunner()
+    mock_cache.export_entries.return_value = 3
+
+    result = runner.invoke(cli, ["cache", "export", "cache.parquet"])
+
+    assert result.exit_code == 0
+    mock_cache.export_entries.assert_called_once_with("cache.parquet", None)
+    mock_cache.close.assert_called_once()
+    assert "✨ Exported 3 cache entries to: cache.parquet" in result.output
+
+
+def test_cache_import_command(mock_cache):
+    """Test cache import command"""
+    runner = CliRunner()
+    mock_cache.import_entries.return_value = 3
+
+    result = runner.invoke(cli, ["cache", "import", "cache.txt", "--format", "jsonl"])
+
+    assert result.exit_code == 0
+    mock_cache.import_entries.assert_called_once_with("cache.txt", "jsonl")
+    mock_cache.close.assert_called_once()
+    assert "✨ Imported 3 cache entries from: cache.txt" in result.output
+
+
+def test_cache_import_command_error(mock_cache):
+    """Test cache import command with error"""
+    runner = CliRunner()
+    mock_cache.import_entries.side_effect = FileNotFoundError("Test error")
+
+    result = runner.invoke(cli, ["cache", "import", "missing.jsonl"])
+
+    assert result.exit_code == 0  # CLI handles the error gracefully
+    assert "Error importing cache: Test error" in result.output
+    mock_cache.close.assert_called_once()
+
+
+@patch("pandasai.Agent")
+def test_cache_warm_up_command(mock_agent, mock_dataset_loader, tmp_path):
+    """Test cache warm-up command"""
+    runner = CliRunner()
+    questions_file = tmp_path / "questions.txt"
+    questions_file.write_text("Total sales?\n\nSales by region\n")
+    mock_agent.return_value.warm_up.return_value = {"cached": 1, "failed": 1}
+
+    result = runner.invoke(
+        cli,
+        [
+            "cache",
+            "warm-up",
+            str(questions_file),
+            "--dataset",
+            "test-org/sales",
+            "--dataset",
+            "test-org/regions",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert mock_dataset_loader.create_loader_from_path.call_count == 2
+    mock_agent.return_value.warm_up.assert_called_once_with(
+        ["Total sales?", "Sales by region"]
+    )
+    assert "✨ Cached 1 questions, 1 failed" in result.output
+
+
+@patch("pandasai.server.serve")
+@patch("pandasai.server.WorkerPool")
+def test_serve_command(mock_pool, mock_serve):
+    """Test serve command"""
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ["serve", "--dataset", "test-org/sales", "--workers", "3", "--port", "9000"],
+    )
+
+    assert result.exit_code == 0
+    mock_pool.assert_called_once_with(
+        ["test-org/sales"], workers=3, max_concurrency=4, max_queue_size=256
+    )
+    mock_serve.assert_called_once_with(
+        mock_pool.return_value,
+        host="127.0.0.1",
+        port=9000,
+        socket_path=None,
+        request_timeout=None,
+    )
+    assert "Starting 3 workers, serving on: http://127.0.0.1:9000" in result.output
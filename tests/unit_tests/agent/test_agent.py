@@ -1,4 +1,12 @@
+import asyncio
+import json
+import logging
 import os
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from unittest.mock import ANY, MagicMock, Mock, mock_open, patch
 
@@ -8,13 +16,47 @@ import pytest
 from pandasai import DatasetLoader, VirtualDataFrame
 from pandasai.agent.base import Agent
 from pandasai.config import Config, ConfigManager
+from pandasai.constants import DEFAULT_CHART_DIRECTORY, DEFAULT_CHART_PATH
+from pandasai.core.response import NumberResponse
 from pandasai.core.response.error import ErrorResponse
+from pandasai.core.semantic_cache import SemanticCache
+from pandasai.data_loader.duck_db_connection_manager import DuckDBConnectionManager
 from pandasai.data_loader.semantic_layer_schema import SemanticLayerSchema
 from pandasai.dataframe.base import DataFrame
-from pandasai.exceptions import CodeExecutionError, InvalidLLMOutputType
+from pandasai.exceptions import (
+    CodeExecutionError,
+    InvalidConfigError,
+    InvalidLLMOutputType,
+)
 from pandasai.llm.fake import FakeLLM
 
 
+class AsyncFakeLLM(FakeLLM):
+    """Fake LLM with a native asynchronous call, tracking concurrent calls"""
+
+    def __init__(self, output: str):
+        super().__init__(output)
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def acall(self, instruction, context=None) -> str:
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return self._output
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    """Wait until the condition is true, e.g. once a thread finished"""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "Timed out waiting for the condition"
+        time.sleep(0.01)
+
+
 class TestAgent:
     "Unit tests for Agent class"
 
@@ -96,6 +138,62 @@ print('Cached result: US has the highest GDP.')"""
         assert response == cached_code
         assert mock_generate_code.validate_and_clean_code.called_with(cached_code)
 
+    def test_generate_code_with_memory_cache_hit(self, agent: Agent, sample_df):
+        cached_code = f"""df = execute_sql_query('SELECT A FROM {sample_df.schema.name}')
+result = {{"type": "dataframe", "value": df}}"""
+        agent._state.config.enable_cache = True
+        # The in-memory tier is shared with the agents of the previous tests
+        agent._state.cache.clear()
+        agent._state.cache.get = MagicMock(return_value=cached_code)
+        agent._code_generator = MagicMock()
+        agent._code_generator.validate_and_clean_code.return_value = cached_code
+
+        for _ in range(3):
+            agent.start_new_conversation()
+            response = agent.generate_code("Which country has the highest GDP?")
+            assert response == cached_code
+
+        # Only the first hit reads the database and validates the code
+        agent._state.cache.get.assert_called_once()
+        agent._code_generator.validate_and_clean_code.assert_called_once_with(
+            cached_code
+        )
+        assert agent._state.cache.stats()["memory_hits"] == 2
+
+    def test_generate_code_with_semantic_cache_hit(self, agent: Agent, sample_df):
+        cached_code = f"""df = execute_sql_query('SELECT SUM(gdp) FROM {sample_df.schema.name}')
+result = {{"type": "dataframe", "value": df}}"""
+        agent._state.config.enable_semantic_cache = True
+        agent._state.semantic_cache = SemanticCache(agent._state.cache)
+        agent._code_generator = MagicMock()
+        agent._code_generator.validate_and_clean_code.return_value = cached_code
+
+        agent.start_new_conversation()
+        agent._state.memory.add("What is the total GDP by country?", is_user=True)
+        agent._state.semantic_cache.set(
+            "What is the total GDP by country?",
+            SemanticCache.get_context(agent._state),
+            cached_code,
+        )
+
+        agent.start_new_conversation()
+        response = agent.generate_code("Total GDP per country")
+
+        # The code is validated again, without generating new code
+        assert response == cached_code
+        agent._code_generator.validate_and_clean_code.assert_called_once_with(
+            cached_code
+        )
+        agent._code_generator.generate_code.assert_not_called()
+
+        # Code failing the validation is generated again
+        agent._code_generator.validate_and_clean_code.side_effect = ValueError()
+        agent._code_generator.generate_code.return_value = "new code"
+        agent.start_new_conversation()
+        assert agent.generate_code("Total GDP per country") == "new code"
+
+        agent._state.cache.clear()
+
     @patch("pandasai.agent.base.CodeGenerator")
     def test_generate_code_with_cache_miss(self, mock_generate_code, agent: Agent):
         # Set up the cache to return no cached response
@@ -461,6 +559,207 @@ print('Cached result: US has the highest GDP.')"""
             # Verify execute_query was called appropriately
             assert mock_query.call_count == 2  # Once for head(), once for the SQL query
 
+    def test_parse_correct_table_name_reuses_table_mapping(self, agent):
+        query_builder = MagicMock()
+        query_builder.get_schema_fingerprint.return_value = "v1"
+        query_builder._get_table_expression.return_value = "(SELECT * FROM users) AS t"
+        df = MagicMock(query_builder=query_builder)
+        df.schema.name = "t"
+
+        first = agent._parse_correct_table_name("SELECT * FROM t", [df])
+        second = agent._parse_correct_table_name("SELECT * FROM t", [df])
+
+        assert first == second
+        assert query_builder._get_table_expression.call_count == 1
+
+        # A schema change invalidates the cached mapping
+        query_builder.get_schema_fingerprint.return_value = "v2"
+        query_builder._get_table_expression.return_value = "(SELECT * FROM people) AS t"
+        assert '"people"' in agent._parse_correct_table_name("SELECT * FROM t", [df])
+        assert query_builder._get_table_expression.call_count == 2
+
+    def test_execute_sql_query_truncates_large_results(self, agent, sample_df):
+        agent._state.config.max_sql_result_rows = 2
+        agent._state.logger.log = MagicMock()
+
+        with pytest.warns(UserWarning, match="truncated to 2 rows"):
+            result = agent._execute_sql_query(
+                f'SELECT * FROM "{sample_df.schema.name}"'
+            )
+
+        assert len(result) == 2
+        assert agent._state.logger.log.call_args[1]["level"] == logging.WARNING
+
+    def test_execute_sql_query_small_results_not_truncated(self, agent, sample_df):
+        agent._state.config.max_sql_result_rows = 3
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = agent._execute_sql_query(
+                f'SELECT * FROM "{sample_df.schema.name}"'
+            )
+
+        assert len(result) == 3
+
+    def test_execute_sql_query_approximate_mode_samples_table(self, agent, sample_df):
+        agent._state.config.max_sql_result_rows = 2
+        agent._state.config.approximate_sql_results = True
+        agent._execute_local_sql_query = MagicMock(
+            return_value=pd.DataFrame({"A": [1]})
+        )
+
+        agent._execute_sql_query(f'SELECT * FROM "{sample_df.schema.name}"')
+
+        query = agent._execute_local_sql_query.call_args[0][0]
+        assert "TABLESAMPLE (2 ROWS)" in query
+        assert "LIMIT 3" in query
+
+    def test_execute_sql_query_approximate_mode_keeps_aggregates(
+        self, agent, sample_df
+    ):
+        agent._state.config.max_sql_result_rows = 2
+        agent._state.config.approximate_sql_results = True
+
+        result = agent._execute_sql_query(
+            f'SELECT COUNT(*) AS total FROM "{sample_df.schema.name}"'
+        )
+
+        assert result["total"][0] == len(sample_df)
+
+    def test_chat_response_warns_of_truncated_results(self, sample_df):
+        table = sample_df.schema.name
+        llm = FakeLLM()
+        llm.response = (
+            "result = {'type': 'dataframe', 'value': "
+            f"execute_sql_query('SELECT * FROM {table}')}}"
+        )
+        agent = Agent(
+            sample_df,
+            {"llm": llm, "enable_cache": False, "max_sql_result_rows": 2},
+        )
+
+        with pytest.warns(UserWarning, match="truncated"):
+            response = agent.chat("Show the data")
+
+        assert len(response.value) == 2
+        assert len(response.warnings) == 1
+        assert "truncated to 2 rows" in response.warnings[0]
+
+    def test_chat_response_warns_of_sampled_results(self, sample_df):
+        table = sample_df.schema.name
+        llm = FakeLLM()
+        llm.response = (
+            "result = {'type': 'dataframe', 'value': "
+            f"execute_sql_query('SELECT * FROM {table}')}}"
+        )
+        agent = Agent(
+            sample_df,
+            {
+                "llm": llm,
+                "enable_cache": False,
+                "max_sql_result_rows": 2,
+                "approximate_sql_results": True,
+            },
+        )
+
+        response = agent.chat("Show the data")
+
+        assert len(response.value) == 2
+        assert len(response.warnings) == 1
+        assert "random sample of 2 rows" in response.warnings[0]
+
+    def test_execute_local_sql_query_concurrently(self, config):
+        agents = [
+            Agent(DataFrame({f"column_{index}": range(index + 1)}), config)
+            for index in range(16)
+        ]
+
+        def run(index):
+            agent = agents[index % len(agents)]
+            table_name = agent._state.dfs[0].schema.name
+            result = agent._execute_sql_query(
+                f'SELECT COUNT(*) AS total FROM "{table_name}"'
+            )
+            return result["total"][0]
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(run, range(320)))
+
+        assert results == [index % len(agents) + 1 for index in range(320)]
+
+    def test_agents_query_their_own_tables(self, config):
+        schema = DataFrame({"value": [0]}).schema
+        agents = [
+            Agent(DataFrame({"value": range(index + 1)}, schema=schema), config)
+            for index in range(4)
+        ]
+        assert len({agent._state.dfs[0].schema.name for agent in agents}) == 1
+
+        def run(index):
+            agent = agents[index % len(agents)]
+            result = agent._execute_sql_query(
+                f'SELECT COUNT(*) AS total FROM "{schema.name}"'
+            )
+            return result["total"][0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(run, range(80)))
+
+        assert results == [index % len(agents) + 1 for index in range(80)]
+
+    def test_agents_share_explicit_namespace(self, sample_df, config):
+        first = Agent(sample_df, config, namespace="shared_tenant")
+        second = Agent(sample_df, config, namespace="shared_tenant")
+        first._execute_local_sql_query("SELECT 1")
+
+        assert DuckDBConnectionManager().is_registered(
+            sample_df.schema.name, sample_df, namespace=second._namespace
+        )
+        DuckDBConnectionManager().drop_namespace("shared_tenant")
+
+    def test_execute_sql_query_arrow_result(self, config):
+        df = DataFrame({"name": ["a", "b", None], "value": [1, 2, 3]})
+        agent = Agent(df, config)
+
+        result = agent._execute_sql_query(
+            f'SELECT * FROM "{df.schema.name}"', dtype_backend="pyarrow"
+        )
+
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in result.dtypes)
+        assert result["name"].isna().tolist() == [False, False, True]
+
+    def test_execute_sql_query_in_chunks(self, config):
+        df = DataFrame({"value": range(10)})
+        agent = Agent(df, config)
+        query = f'SELECT value FROM "{df.schema.name}" ORDER BY value'
+
+        chunks = agent._execute_sql_query(query, chunksize=4)
+
+        # Other queries can run while the chunks are consumed
+        first_chunk = next(chunks)
+        assert len(agent._execute_sql_query(query)) == 10
+        chunks = [first_chunk, *chunks]
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert pd.concat(chunks)["value"].tolist() == list(range(10))
+
+    def test_execute_sql_query_in_chunks_truncated(self, config):
+        df = DataFrame({"value": range(10)})
+        agent = Agent(df, config)
+        agent._state.config.max_sql_result_rows = 6
+
+        with pytest.warns(UserWarning, match="truncated to 6 rows"):
+            chunks = list(
+                agent._execute_sql_query(
+                    f'SELECT value FROM "{df.schema.name}"', chunksize=4
+                )
+            )
+
+        assert [len(chunk) for chunk in chunks] == [4, 2]
+
+    def test_execute_sql_query_invalid_dtype_backend(self, agent):
+        with pytest.raises(ValueError, match="Invalid dtype_backend"):
+            agent._execute_sql_query("SELECT 1", dtype_backend="arrow")
+
     def test_execute_sql_query_error_no_dataframe(self, agent):
         query = "SELECT count(*) as total from countries;"
         agent._state.dfs = None
@@ -490,6 +789,468 @@ print('Cached result: US has the highest GDP.')"""
         agent.execute_with_retries.assert_called_once_with("result = df['age'].mean()")
         agent._state.cache.set.assert_called_once()
 
+    def test_process_query_with_result_cache(self, agent):
+        code = "result = {'type': 'number', 'value': 30.5}"
+        agent.generate_code = Mock(return_value=code)
+        agent.execute_with_retries = Mock(return_value=NumberResponse(30.5, code))
+        agent._state.config.enable_result_cache = True
+
+        try:
+            first_result = agent._process_query("What is the average age?")
+            second_result = agent._process_query("What is the average age?")
+
+            # The second query is answered without executing the code
+            agent.execute_with_retries.assert_called_once_with(code)
+            assert second_result.value == first_result.value == 30.5
+
+            # A change of the data invalidates the result
+            agent._state.dfs[0].iloc[0, 0] += 1
+            agent._process_query("What is the average age?")
+            assert agent.execute_with_retries.call_count == 2
+        finally:
+            agent._state.result_cache.cache.destroy()
+
+    def test_achat_shares_the_event_loop(self, sample_df):
+        llm = AsyncFakeLLM(
+            "result = {'type': 'number', 'value': len(execute_sql_query('SELECT 1'))}"
+        )
+        agents = [Agent(sample_df, {"llm": llm, "enable_cache": False}) for _ in "ab"]
+        threads = []
+
+        def execute_code(code):
+            threads.append(threading.current_thread())
+            return {"type": "number", "value": 1}
+
+        for agent in agents:
+            agent.execute_code = execute_code
+
+        async def chat():
+            return await asyncio.gather(
+                *(agent.achat("How many rows?") for agent in agents)
+            )
+
+        results = asyncio.run(chat())
+
+        assert [result.value for result in results] == [1, 1]
+        # The LLM calls overlapped and the code ran outside of the event loop
+        assert llm.max_running == 2
+        assert threading.main_thread() not in threads
+        assert all(agent._state.memory.count() == 1 for agent in agents)
+
+    def test_achat_runs_blocking_steps_outside_of_the_event_loop(self, sample_df):
+        llm = AsyncFakeLLM(
+            "result = {'type': 'number', 'value': len(execute_sql_query('SELECT 1'))}"
+        )
+        agent = Agent(sample_df, {"llm": llm})
+        agent.execute_code = Mock(return_value={"type": "number", "value": 1})
+        threads = {}
+
+        def record_thread(name):
+            func = getattr(agent, name, None) or getattr(agent._code_generator, name)
+
+            def wrapper(*args, **kwargs):
+                threads.setdefault(name, []).append(threading.current_thread())
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        for name in ("_start_query", "_get_cached_code", "_parse_response"):
+            setattr(agent, name, record_thread(name))
+        agent._code_generator.validate_and_clean_code = record_thread(
+            "validate_and_clean_code"
+        )
+
+        try:
+            result = asyncio.run(agent.achat("How many rows?"))
+        finally:
+            agent._state.cache.destroy()
+
+        assert result.value == 1
+        assert set(threads) == {
+            "_start_query",
+            "_get_cached_code",
+            "_parse_response",
+            "validate_and_clean_code",
+        }
+        assert all(
+            threading.main_thread() not in called_from
+            for called_from in threads.values()
+        )
+
+    def test_afollow_up_retries_after_error(self, agent):
+        agent._state.config.llm = AsyncFakeLLM(
+            "result = {'type': 'number', 'value': execute_sql_query('SELECT 1')}"
+        )
+        agent._state.config.enable_cache = False
+        agent.execute_code = Mock(
+            side_effect=[
+                CodeExecutionError("Execution failed"),
+                {"type": "number", "value": 1},
+            ]
+        )
+
+        result = asyncio.run(agent.afollow_up("How many rows?"))
+
+        assert result.value == 1
+        assert agent.execute_code.call_count == 2
+        assert agent._state.config.llm.calls == 2
+
+    def test_chat_many(self, sample_df):
+        table = sample_df.schema.name
+
+        class BatchFakeLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                question = context.memory.get_last_message()
+                if "unknown" in question:
+                    raise ValueError("Unknown question")
+                column = question.split()[-1]
+                return (
+                    "result = {'type': 'number', 'value': execute_sql_query("
+                    f"'SELECT COUNT(DISTINCT {column}) AS n FROM {table}')['n'][0]}}"
+                )
+
+        agent = Agent(sample_df, {"llm": BatchFakeLLM(), "enable_cache": False})
+        queries = ["Count A", "Count unknown", "Count B", "Count A"]
+
+        with patch.object(
+            DataFrame,
+            "serialize_dataframe",
+            autospec=True,
+            side_effect=DataFrame.serialize_dataframe,
+        ) as mock_serialize:
+            results = agent.chat_many(queries, max_concurrency=1)
+
+        assert [result.query for result in results] == queries
+        assert [result.ok for result in results] == [True, False, True, True]
+        assert results[0].response.value == 3
+        assert results[1].response is None
+        assert "Unknown question" in results[1].error
+        assert all(result.duration > 0 for result in results)
+        # The table is serialized once for the whole batch
+        assert mock_serialize.call_count == 1
+        # Each question is answered in its own conversation
+        assert agent._state.memory.count() == 0
+
+    def test_chat_in_new_conversation(self, sample_df):
+        table = sample_df.schema.name
+
+        class ConversationFakeLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                column = context.memory.get_last_message().split()[-1]
+                return (
+                    "result = {'type': 'number', 'value': execute_sql_query("
+                    f"'SELECT COUNT(DISTINCT {column}) AS n FROM {table}')['n'][0]}}"
+                )
+
+        agent = Agent(sample_df, {"llm": ConversationFakeLLM(), "enable_cache": False})
+        agent.chat("Count A")
+
+        with patch.object(
+            DataFrame,
+            "serialize_dataframe",
+            autospec=True,
+            side_effect=DataFrame.serialize_dataframe,
+        ) as mock_serialize:
+            responses = [
+                agent.chat_in_new_conversation(f"Count {column}")
+                for column in ("A", "B", "A")
+            ]
+
+        assert [response.value for response in responses] == [3, 3, 3]
+        # The table is serialized once for all the conversations
+        assert mock_serialize.call_count == 1
+        # The conversation of the agent is left untouched
+        assert agent._state.memory.count() == 1
+
+    def test_chat_many_with_cache(self, sample_df):
+        table = sample_df.schema.name
+
+        class BatchFakeLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                index = context.memory.get_last_message().split()[-1]
+                return (
+                    "result = {'type': 'number', 'value': execute_sql_query("
+                    f"'SELECT COUNT(*) + {index} AS n FROM {table}')['n'][0]}}"
+                )
+
+        agent = Agent(sample_df, {"llm": BatchFakeLLM(), "save_logs": False})
+        queries = [f"Batch question {uuid.uuid4().hex[:8]} {i}" for i in range(40)]
+
+        # Once to cache the code, then from the cache
+        for _ in range(2):
+            results = agent.chat_many(queries, max_concurrency=8)
+
+            assert all(result.ok for result in results)
+            assert [result.response.value for result in results] == [
+                len(sample_df) + i for i in range(40)
+            ]
+
+    def test_chat_many_saves_each_chart(self, sample_df):
+        os.makedirs(DEFAULT_CHART_DIRECTORY, exist_ok=True)
+
+        table = sample_df.schema.name
+
+        class ChartFakeLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                index = context.memory.get_last_message().split()[-1]
+                return f"""df = execute_sql_query('SELECT {index} AS i FROM {table}')
+with open('{DEFAULT_CHART_PATH}', 'w') as chart:
+    chart.write(str(df['i'][0]))
+result = {{'type': 'plot', 'value': '{DEFAULT_CHART_PATH}'}}"""
+
+        agent = Agent(sample_df, {"llm": ChartFakeLLM(), "enable_cache": False})
+
+        results = agent.chat_many([f"Plot {i}" for i in range(8)], max_concurrency=8)
+
+        for index, result in enumerate(results):
+            with open(result.response.value) as chart:
+                assert chart.read() == str(index)
+            os.remove(result.response.value)
+
+    def test_chat_many_concurrently(self, agent):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def process_query(self, query, output_type=None):
+            with lock:
+                running.append(query)
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(query)
+            if query == "error":
+                return ErrorResponse(error="Execution failed")
+            return NumberResponse(len(query), "code")
+
+        queries = ["a", "bb", "error", "dddd", "eeeee", "ffffff"]
+        with patch.object(Agent, "_process_query", process_query):
+            results = agent.chat_many(queries, max_concurrency=3)
+
+        assert max(max_running) == 3
+        assert [result.query for result in results] == queries
+        assert results[1].response.value == 2
+        assert results[2].error == "Execution failed"
+        assert isinstance(results[2].response, ErrorResponse)
+
+    def test_chat_many_invalid_concurrency(self, agent):
+        with pytest.raises(ValueError, match="max_concurrency"):
+            agent.chat_many(["a"], max_concurrency=0)
+
+    def test_chat_with_code_candidates(self, sample_df):
+        table = sample_df.schema.name
+        responses = [
+            "I don't know",
+            "result = {'type': 'number', 'value': execute_sql_query("
+            f"'SELECT missing FROM {table}')}}",
+            "result = {'type': 'number', 'value': execute_sql_query("
+            f"'SELECT COUNT(*) AS n FROM {table}')['n'][0]}}",
+        ]
+        lock = threading.Lock()
+
+        class CandidatesFakeLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                with lock:
+                    return responses.pop()
+
+        agent = Agent(
+            sample_df,
+            {"llm": CandidatesFakeLLM(), "enable_cache": False, "code_candidates": 3},
+        )
+
+        response = agent.chat("How many rows?")
+
+        assert response.value == len(sample_df)
+        assert "COUNT(*)" in response.last_code_executed
+
+    def test_execute_code_candidates_cancels_the_others(self, agent):
+        errors = []
+
+        def execute_code(code):
+            if code == "slow":
+                time.sleep(0.5)
+                try:
+                    agent._execute_sql_query("SELECT 1")
+                except CodeExecutionError as e:
+                    errors.append(e)
+                    raise
+            return {"type": "number", "value": len(code)}
+
+        agent.execute_code = execute_code
+
+        start = time.perf_counter()
+        code, result = agent._execute_code_candidates(["slow", "fast"])
+
+        assert code == "fast"
+        assert result.value == 4
+        # The response doesn't wait for the other candidate, which is stopped
+        # at its next SQL query
+        assert time.perf_counter() - start < 0.4
+        assert not errors
+        wait_for(lambda: errors)
+        assert "Another code candidate already succeeded" in str(errors[0])
+
+    def test_execute_code_candidates_save_their_own_charts(self, agent):
+        os.makedirs(DEFAULT_CHART_DIRECTORY, exist_ok=True)
+        charts = set(os.listdir(DEFAULT_CHART_DIRECTORY))
+        code = """import time
+time.sleep({delay})
+with open('{path}', 'w') as chart:
+    chart.write('{name}')
+result = {{'type': 'plot', 'value': '{path}'}}"""
+        codes = [
+            code.format(delay=delay, path=DEFAULT_CHART_PATH, name=name)
+            for delay, name in [(0.2, "slow"), (0, "fast")]
+        ]
+
+        code, result = agent._execute_code_candidates(codes)
+
+        assert "fast" in code
+        assert result.value != DEFAULT_CHART_PATH
+        with open(result.value) as chart:
+            assert chart.read() == "fast"
+        os.remove(result.value)
+        # The chart of the other candidate is removed once it finished
+        wait_for(lambda: set(os.listdir(DEFAULT_CHART_DIRECTORY)) == charts)
+
+    def test_execute_code_candidates_all_failing(self, agent):
+        agent._state.config.max_retries = 1
+        agent.execute_code = Mock(
+            side_effect=[
+                CodeExecutionError("First error"),
+                CodeExecutionError("Second error"),
+                {"type": "string", "value": "Success"},
+            ]
+        )
+        agent._regenerate_code_after_error = Mock(return_value="fixed_code")
+
+        code, result = agent._execute_code_candidates(["code_a", "code_b"])
+
+        assert code == "fixed_code"
+        assert result.value == "Success"
+        agent._regenerate_code_after_error.assert_called_once()
+        assert agent._regenerate_code_after_error.call_args.args[0] == "code_a"
+
+        agent._state.config.max_retries = 0
+        agent.execute_code.side_effect = CodeExecutionError("Error")
+        with pytest.raises(CodeExecutionError):
+            agent._execute_code_candidates(["code_a", "code_b"])
+
+    def test_compact_error_prompt(self, sample_df):
+        table = sample_df.schema.name
+        prompts = []
+
+        class RetryFakeLLM(FakeLLM):
+            def call(self, instruction, context=None):
+                prompts.append(instruction.to_string())
+                column = "missing" if len(prompts) == 1 else "COUNT(*)"
+                return (
+                    "result = {'type': 'number', 'value': execute_sql_query("
+                    f"'SELECT {column} AS n FROM {table}')['n'][0]}}"
+                )
+
+        agent = Agent(
+            sample_df,
+            {
+                "llm": RetryFakeLLM(),
+                "enable_cache": False,
+                "compact_error_prompts": True,
+            },
+        )
+        agent.add_message("A previous question", is_user=True)
+
+        with patch.object(
+            DataFrame,
+            "serialize_dataframe",
+            autospec=True,
+            side_effect=DataFrame.serialize_dataframe,
+        ) as mock_serialize:
+            response = agent.follow_up("How many rows?")
+
+        assert response.value == len(sample_df)
+        # The tables of the first prompt are reused without serializing again
+        assert mock_serialize.call_count == 1
+        retry_prompt = prompts[1]
+        assert prompts[0].split("</tables>")[0] in retry_prompt
+        assert "A previous question" not in retry_prompt
+        assert "SELECT missing AS n" in retry_prompt
+        assert "RuntimeError: SQL execution failed" in retry_prompt
+        assert 'File "' not in retry_prompt
+
+    def test_chat_trace(self, sample_df):
+        table = sample_df.schema.name
+        llm = FakeLLM()
+        llm.response = (
+            "result = {'type': 'number', 'value': execute_sql_query("
+            f"'SELECT COUNT(*) AS n FROM {table}')['n'][0]}}"
+        )
+        exported = []
+        agent = Agent(
+            sample_df,
+            {"llm": llm, "enable_cache": False, "trace_exporter": exported.append},
+            vectorstore=MagicMock(),
+        )
+
+        response = agent.chat("How many rows?")
+
+        trace = response.trace
+        assert exported == [trace]
+        assert trace.name == "chat"
+        assert trace.attributes == {"query": "How many rows?"}
+        assert [child.name for child in trace.children] == [
+            "code_generation",
+            "code_execution",
+            "response_parsing",
+        ]
+        code_generation = trace.children[0]
+        assert [child.name for child in code_generation.children] == [
+            "prompt_rendering",
+            "llm_call",
+            "code_validation",
+            "code_cleaning",
+        ]
+        prompt_rendering = trace.find("prompt_rendering")[0]
+        assert {child.name for child in prompt_rendering.children} == {
+            "serialize_dataframe",
+            "vectorstore",
+        }
+        (sql_query,) = trace.find("execute_sql_query")
+        assert sql_query.attributes["rows"] == 1
+        assert table in sql_query.attributes["query"]
+        assert "trace" not in response.to_dict()
+        assert (
+            json.loads(trace.to_json())["children"][1]["children"][0]["attributes"][
+                "rows"
+            ]
+            == 1
+        )
+
+    def test_warm_up(self, agent):
+        responses = {
+            "What is the average age?": NumberResponse(30.5, "code"),
+            "What is the invalid operation?": ErrorResponse(error="failed"),
+        }
+
+        def chat(query):
+            if query not in responses:
+                raise ValueError("Unexpected error")
+            return responses[query]
+
+        agent.chat = Mock(side_effect=chat)
+        agent.start_new_conversation = Mock()
+
+        counts = agent.warm_up([*responses, "Who is the oldest?"])
+
+        assert counts == {"cached": 1, "failed": 2}
+        assert agent.chat.call_count == 3
+        agent.start_new_conversation.assert_called_once()
+
+    def test_warm_up_requires_cache(self, agent):
+        agent._state.config.enable_cache = False
+
+        with pytest.raises(InvalidConfigError, match="must be enabled"):
+            agent.warm_up(["What is the average age?"])
+
     def test_process_query_execution_error(self, agent, config):
         """Test the _process_query method with execution error"""
         query = "What is the invalid operation?"
@@ -86,6 +86,52 @@ class TestCodeCleaner(unittest.TestCase):
         updated_node = self.cleaner._validate_and_make_table_name_case_sensitive(node)
         self.assertEqual(updated_node.value.value, "SELECT * FROM my_table")
 
+    def test_validate_table_names_with_positional_arguments(self):
+        mock_dataframe = MagicMock(spec=object)
+        mock_dataframe.name = "my_table"
+        mock_dataframe.schema = MagicMock()
+        mock_dataframe.schema.name = "my_table"
+        self.cleaner.context.dfs = [mock_dataframe]
+
+        for code in (
+            "df = execute_sql_query('SELECT * FROM other_table', 'pyarrow', 1000)",
+            "execute_sql_query('SELECT * FROM other_table', 'pyarrow')",
+        ):
+            node = ast.parse(code).body[0]
+            with self.assertRaises(MaliciousQueryError):
+                self.cleaner._validate_and_make_table_name_case_sensitive(node)
+
+        node = ast.parse(
+            "df = execute_sql_query('SELECT * FROM my_table;', 'pyarrow', 1000)"
+        ).body[0]
+        updated_node = self.cleaner._validate_and_make_table_name_case_sensitive(node)
+        self.assertEqual(updated_node.value.args[0].value, "SELECT * FROM my_table")
+
+    def test_validate_table_names_in_nested_calls(self):
+        mock_dataframe = MagicMock(spec=object)
+        mock_dataframe.name = "my_table"
+        mock_dataframe.schema = MagicMock()
+        mock_dataframe.schema.name = "my_table"
+        self.cleaner.context.dfs = [mock_dataframe]
+
+        for code in (
+            "for chunk in execute_sql_query('SELECT * FROM other_table', "
+            "chunksize=1000):\n    total += len(chunk)",
+            "if ready:\n    df = execute_sql_query('SELECT * FROM other_table')",
+            "def load():\n    return execute_sql_query('SELECT * FROM other_table')",
+            "total = len(execute_sql_query(sql_query='SELECT * FROM other_table'))",
+        ):
+            node = ast.parse(code).body[0]
+            with self.assertRaises(MaliciousQueryError):
+                self.cleaner._validate_and_make_table_name_case_sensitive(node)
+
+        node = ast.parse(
+            "for chunk in execute_sql_query('SELECT * FROM my_table;', "
+            "chunksize=1000):\n    total += len(chunk)"
+        ).body[0]
+        updated_node = self.cleaner._validate_and_make_table_name_case_sensitive(node)
+        self.assertEqual(updated_node.iter.args[0].value, "SELECT * FROM my_table")
+
     def test_extract_fix_dataframe_redeclarations(self):
         node = ast.Assign(
             targets=[ast.Name(id="df", ctx=ast.Store())],
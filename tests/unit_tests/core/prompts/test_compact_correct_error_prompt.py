@@ -0,0 +1,68 @@
+from unittest.mock import Mock
+
+from pandasai.core.prompts.compact_correct_error_prompt import (
+    CompactCorrectErrorPrompt,
+)
+
+
+def get_context():
+    mock_memory = Mock()
+    mock_memory.to_json.return_value = [
+        {"role": "user", "message": "first question"},
+        {"role": "user", "message": "last question"},
+    ]
+    mock_memory.get_last_message.return_value = "last question"
+    mock_memory.agent_description = "test agent"
+
+    mock_dataset = Mock()
+    mock_dataset.to_json.return_value = {"data": "test data"}
+
+    mock_context = Mock()
+    mock_context.memory = mock_memory
+    mock_context.dfs = [mock_dataset]
+    return mock_context
+
+
+def test_to_json():
+    prompt = CompactCorrectErrorPrompt(
+        context=get_context(),
+        code="test code",
+        error="KeyError: 'a'",
+        exception_type="ExecuteSQLQueryNotUsed",
+        output_type="number",
+        tables="<tables>test tables</tables>",
+    )
+
+    result = prompt.to_json()
+
+    assert result["datasets"] == [{"data": "test data"}]
+    assert result["conversation"] == [{"role": "user", "message": "last question"}]
+    assert result["system_prompt"] == "test agent"
+    assert result["error"] == {
+        "code": "test code",
+        "error_trace": "KeyError: 'a'",
+        "exception_type": "ExecuteSQLQueryNotUsed",
+    }
+    assert result["config"] == {"output_type": "number"}
+
+
+def test_to_string_reuses_the_tables():
+    context = get_context()
+    prompt = CompactCorrectErrorPrompt(
+        context=context,
+        code="test code",
+        error="KeyError: 'a'",
+        exception_type="InvalidLLMOutputType",
+        output_type="number",
+        tables="<tables>test tables</tables>",
+    )
+
+    result = prompt.to_string()
+
+    assert result.startswith("<tables>test tables</tables>")
+    assert "last question" in result
+    assert "first question" not in result
+    assert "```python\ntest code\n```" in result
+    assert "KeyError: 'a'" in result
+    assert "the result type should be: number" in result
+    context.serialize_dataframe.assert_not_called()
@@ -1,5 +1,13 @@
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pandas as pd
 import pytest
 
+from pandasai.config import ConfigManager
 from pandasai.data_loader.duck_db_connection_manager import DuckDBConnectionManager
 
 
@@ -10,3 +18,310 @@ class TestDuckDBConnectionManager:
 
     def test_connection_correct_closing_doesnt_throw(self, duck_db_manager):
         duck_db_manager.close()
+
+    def test_singleton(self, duck_db_manager):
+        assert DuckDBConnectionManager() is duck_db_manager
+
+    def test_each_thread_uses_its_own_cursor(self, duck_db_manager):
+        cursors = {}
+
+        def get_cursor(name):
+            cursors[name] = duck_db_manager._get_cursor()
+
+        threads = [threading.Thread(target=get_cursor, args=(name,)) for name in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cursors["a"] is not cursors["b"]
+        assert duck_db_manager._get_cursor() is duck_db_manager._get_cursor()
+
+    def test_tables_registered_in_a_thread_are_visible_in_others(self, duck_db_manager):
+        duck_db_manager.register("shared_table", pd.DataFrame({"a": [1, 2, 3]}))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            counts = list(
+                executor.map(
+                    lambda _: duck_db_manager.sql(
+                        "SELECT COUNT(*) AS total FROM shared_table"
+                    ).fetchone()[0],
+                    range(8),
+                )
+            )
+
+        assert counts == [3] * 8
+
+    def test_concurrent_register_and_sql(self, duck_db_manager):
+        def run(index):
+            name = f"concurrent_table_{index % 8}"
+            duck_db_manager.register(name, pd.DataFrame({"a": range(index % 8 + 1)}))
+            return duck_db_manager.sql(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(run, range(200)))
+
+        assert results == [index % 8 + 1 for index in range(200)]
+
+    def test_register_skips_already_registered_data(self, duck_db_manager):
+        df = pd.DataFrame({"a": [1, 2, 3]})
+
+        assert duck_db_manager.register("registry_table", df) is True
+        assert duck_db_manager.register("registry_table", df) is False
+        assert duck_db_manager.is_registered("registry_table", df)
+
+        # The same object with a different structure is registered again
+        df["b"] = df["a"] * 2
+        assert not duck_db_manager.is_registered("registry_table", df)
+        assert duck_db_manager.register("registry_table", df) is True
+        assert (
+            duck_db_manager.sql("SELECT SUM(b) FROM registry_table").fetchone()[0] == 12
+        )
+
+        # An explicit version is compared without requiring the same object
+        assert duck_db_manager.register("registry_table", df.copy(), version="v1")
+        assert duck_db_manager.is_registered("registry_table", version="v1")
+        assert not duck_db_manager.is_registered("registry_table", version="v2")
+
+        duck_db_manager.unregister("registry_table")
+
+    def test_unregister_in_all_threads(self, duck_db_manager):
+        duck_db_manager.register("unregistered_table", pd.DataFrame({"a": [1]}))
+
+        def count():
+            return duck_db_manager.sql(
+                "SELECT COUNT(*) FROM unregistered_table"
+            ).fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(count).result() == 1
+
+            duck_db_manager.unregister("unregistered_table")
+
+            assert not duck_db_manager.is_registered("unregistered_table", version=1)
+            with pytest.raises(duckdb.CatalogException):
+                count()
+            with pytest.raises(duckdb.CatalogException):
+                executor.submit(count).result()
+
+    def test_cleanup(self, duck_db_manager):
+        duck_db_manager.register("cleanup_table_1", pd.DataFrame({"a": [1]}))
+        duck_db_manager.register("cleanup_table_2", pd.DataFrame({"a": [1]}))
+
+        duck_db_manager.cleanup()
+
+        assert duck_db_manager._registered_tables == {}
+        with pytest.raises(duckdb.CatalogException):
+            duck_db_manager.sql("SELECT * FROM cleanup_table_1")
+
+    def test_namespaces_isolate_tables_with_the_same_name(self, duck_db_manager):
+        duck_db_manager.register("tenants", pd.DataFrame({"a": [1]}))
+        duck_db_manager.register(
+            "tenants", pd.DataFrame({"a": [1, 2]}), namespace="tenant_a"
+        )
+        duck_db_manager.register(
+            "tenants", pd.DataFrame({"a": [1, 2, 3]}), namespace="tenant_b"
+        )
+
+        def count(namespace):
+            return duck_db_manager.sql(
+                "SELECT COUNT(*) FROM tenants", namespace=namespace
+            ).fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            namespaces = [None, "tenant_a", "tenant_b"] * 20
+            results = list(executor.map(count, namespaces))
+
+        assert results == [1, 2, 3] * 20
+        assert duck_db_manager.is_registered(
+            "tenants", version=(2, ("a",)), namespace="tenant_a"
+        )
+        assert not duck_db_manager.is_registered("tenants", version=(2, ("a",)))
+
+        duck_db_manager.drop_namespace("tenant_a")
+        with pytest.raises(duckdb.CatalogException):
+            count("tenant_a")
+        assert count("tenant_b") == 3
+
+        duck_db_manager.release_namespace("tenant_b")
+        with pytest.raises(duckdb.CatalogException):
+            count("tenant_b")
+        assert count(None) == 1
+
+        duck_db_manager.unregister("tenants")
+
+    def test_cursors_only_sync_the_queried_namespace(self, duck_db_manager):
+        duck_db_manager.register(
+            "tenants", pd.DataFrame({"a": [1]}), namespace="tenant_c"
+        )
+
+        def query(namespace):
+            duck_db_manager.sql("SELECT COUNT(*) FROM tenants", namespace=namespace)
+            return {
+                namespace: set(tables)
+                for namespace, tables in (
+                    duck_db_manager._thread_local.registered_tables.items()
+                )
+            }
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(query, "tenant_c").result()
+
+            # Registering a table in another namespace leaves the cursor alone
+            duck_db_manager.register(
+                "tenants", pd.DataFrame({"a": [1, 2]}), namespace="tenant_d"
+            )
+            assert executor.submit(query, "tenant_c").result() == {
+                "tenant_c": {"__tenant_c__tenants"}
+            }
+
+            # The tables of a dropped namespace are unregistered in all the
+            # cursors, whatever the namespace they query
+            executor.submit(query, "tenant_d").result()
+            duck_db_manager.drop_namespace("tenant_d")
+            assert executor.submit(query, "tenant_c").result() == {
+                "tenant_c": {"__tenant_c__tenants"}
+            }
+
+        duck_db_manager.drop_namespace("tenant_c")
+
+    @pytest.mark.parametrize("namespace", ["", "1tenant", "tenant-a", 'a"; DROP'])
+    def test_invalid_namespace(self, duck_db_manager, namespace):
+        with pytest.raises(ValueError, match="Invalid namespace"):
+            duck_db_manager.register("table", pd.DataFrame(), namespace=namespace)
+
+    def test_fetch_record_batches(self, duck_db_manager):
+        duck_db_manager.register("batched_table", pd.DataFrame({"a": range(10)}))
+
+        batches = duck_db_manager.fetch_record_batches(
+            "SELECT a FROM batched_table ORDER BY a", 3
+        )
+        rows = [value for batch in batches for value in batch.column("a").to_pylist()]
+
+        assert rows == list(range(10))
+        duck_db_manager.unregister("batched_table")
+
+    @staticmethod
+    def get_setting(manager, name):
+        return manager.sql(
+            f"SELECT value FROM duckdb_settings() WHERE name = '{name}'"
+        ).fetchone()[0]
+
+    def test_settings_applied_at_creation(self, tmp_path):
+        config = ConfigManager.get()
+        DuckDBConnectionManager().close()
+        try:
+            ConfigManager.update(
+                {
+                    "duckdb_threads": 2,
+                    "duckdb_memory_limit": "1GB",
+                    "duckdb_temp_directory": str(tmp_path),
+                    "duckdb_preserve_insertion_order": False,
+                }
+            )
+            manager = DuckDBConnectionManager()
+
+            assert self.get_setting(manager, "threads") == "2"
+            assert self.get_setting(manager, "memory_limit") == "953.6 MiB"
+            assert self.get_setting(manager, "temp_directory") == str(tmp_path)
+            assert self.get_setting(manager, "preserve_insertion_order") == "false"
+        finally:
+            ConfigManager._config = config
+            DuckDBConnectionManager().close()
+
+    def test_settings_adjusted_at_runtime(self, duck_db_manager):
+        config = ConfigManager.get()
+        default_threads = self.get_setting(duck_db_manager, "threads")
+        try:
+            ConfigManager.update({"duckdb_threads": 1})
+            assert self.get_setting(duck_db_manager, "threads") == "1"
+
+            # The other threads share the database settings
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                assert (
+                    executor.submit(
+                        self.get_setting, duck_db_manager, "threads"
+                    ).result()
+                    == "1"
+                )
+
+            ConfigManager.update({"duckdb_threads": None})
+            assert self.get_setting(duck_db_manager, "threads") == default_threads
+        finally:
+            ConfigManager._config = config
+
+    def test_configure_invalid_setting(self, duck_db_manager):
+        with pytest.raises(ValueError, match="Invalid DuckDB settings"):
+            duck_db_manager.configure(**{"threads = 1; DROP": 1})
+
+    @pytest.mark.parametrize("read_only", [False, True])
+    def test_persistent_store_locked_by_another_process(self, tmp_path, read_only):
+        config = ConfigManager.get()
+        database_path = str(tmp_path / "pandasai.duckdb")
+        duckdb.connect(database_path).close()
+        options = ", read_only=True" if read_only else ""
+        other_process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                f"import duckdb, sys; c = duckdb.connect({database_path!r}{options}); "
+                "print('ready', flush=True); sys.stdin.read()",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        DuckDBConnectionManager().close()
+        try:
+            assert other_process.stdout.readline() == b"ready\n"
+            ConfigManager.update({"duckdb_database_path": database_path})
+            manager = DuckDBConnectionManager()
+
+            # Attached read-only next to a reader, not at all next to a writer
+            assert manager._store_attached == read_only
+            assert not manager._store_writable
+            assert not manager.import_table("stored_table", pd.DataFrame(), "v1")
+        finally:
+            other_process.communicate()
+            ConfigManager._config = config
+            DuckDBConnectionManager().close()
+
+    def test_persistent_store(self, tmp_path):
+        config = ConfigManager.get()
+        database_path = str(tmp_path / "pandasai.duckdb")
+        DuckDBConnectionManager().close()
+        try:
+            ConfigManager.update({"duckdb_database_path": database_path})
+            manager = DuckDBConnectionManager()
+            df = pd.DataFrame({"a": [1, 2, 3]})
+
+            assert not manager.register_stored("stored_table", "v1")
+            assert manager.import_table("stored_table", df, "v1")
+            assert manager.is_registered("stored_table", version="v1")
+            assert manager.sql("SELECT SUM(a) FROM stored_table").fetchone()[0] == 6
+            manager.close()
+
+            # A later process attaches the store read-only
+            ConfigManager.update({"duckdb_read_only": True})
+            manager = DuckDBConnectionManager()
+
+            assert not manager.register_stored("stored_table", "v2")
+            assert manager.register_stored("stored_table", "v1", namespace="reader")
+            assert (
+                manager.sql(
+                    "SELECT SUM(a) FROM stored_table", namespace="reader"
+                ).fetchone()[0]
+                == 6
+            )
+            assert not manager.import_table("stored_table", df, "v2")
+
+            # Registering a DataFrame replaces the stored table
+            manager.register("stored_table", df.head(1), namespace="reader")
+            assert (
+                manager.sql(
+                    "SELECT SUM(a) FROM stored_table", namespace="reader"
+                ).fetchone()[0]
+                == 1
+            )
+        finally:
+            ConfigManager._config = config
+            DuckDBConnectionManager().close()
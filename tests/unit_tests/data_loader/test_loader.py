@@ -1,13 +1,19 @@
-from unittest.mock import mock_open, patch
+import os
+from unittest.mock import MagicMock, mock_open, patch
 
 import pandas as pd
 import pytest
 
+from pandasai.agent import Agent
+from pandasai.config import ConfigManager
+from pandasai.data_loader.duck_db_connection_manager import DuckDBConnectionManager
 from pandasai.data_loader.loader import DatasetLoader
 from pandasai.data_loader.local_loader import LocalDatasetLoader
 from pandasai.data_loader.semantic_layer_schema import SemanticLayerSchema
+from pandasai.data_loader.view_loader import ViewDatasetLoader
 from pandasai.dataframe.base import DataFrame
 from pandasai.exceptions import InvalidDataSourceType
+from pandasai.llm.fake import FakeLLM
 from pandasai.query_builders import LocalQueryBuilder
 
 
@@ -179,3 +185,205 @@ class TestDatasetLoader:
 
         with pytest.raises(KeyError, match="None of.*are in the.*columns"):
             filtered_df = loader._filter_columns(df)
+
+    def test_register_table_only_loads_changed_data(self, sample_schema, tmp_path):
+        data_file = tmp_path / "users.csv"
+        data_file.write_text("email\ntest@example.com\n")
+        sample_schema.name = "register_table_users"
+        sample_schema.transformations = None
+        loader = LocalDatasetLoader(sample_schema, "test/test")
+        df = DataFrame({"email": ["test@example.com"]})
+
+        with patch(
+            "pandasai.data_loader.local_loader.os.path.join",
+            return_value=str(data_file),
+        ), patch.object(LocalDatasetLoader, "load", return_value=df) as mock_load:
+            loader.register_table()
+            loader.register_table()
+            assert mock_load.call_count == 1
+
+            # A change in the source file makes the table registered again
+            data_file.write_text("email\ntest@example.com\nother@example.com\n")
+            os.utime(data_file, ns=(0, 0))
+            loader.register_table()
+            assert mock_load.call_count == 2
+
+        DuckDBConnectionManager().unregister(sample_schema.name)
+
+    def test_register_table_in_namespaces(self, sample_schema, tmp_path):
+        sample_schema.name = "namespaced_users"
+        sample_schema.transformations = None
+        db_manager = DuckDBConnectionManager()
+
+        for namespace, emails in [
+            ("tenant_a", ["a@example.com"]),
+            ("tenant_b", ["b@example.com", "c@example.com"]),
+        ]:
+            data_file = tmp_path / f"{namespace}.csv"
+            data_file.write_text("\n".join(["email", *emails]) + "\n")
+            with patch(
+                "pandasai.data_loader.local_loader.os.path.join",
+                return_value=str(data_file),
+            ), patch.object(
+                LocalDatasetLoader, "load", return_value=DataFrame({"email": emails})
+            ):
+                loader = LocalDatasetLoader(sample_schema, "test/test")
+                loader.register_table(namespace=namespace)
+                version = loader.get_data_version()
+
+        for namespace, count in [("tenant_a", 1), ("tenant_b", 2)]:
+            result = db_manager.sql(
+                "SELECT COUNT(*) FROM namespaced_users", namespace=namespace
+            )
+            assert result.fetchone()[0] == count
+        # The global namespace is untouched
+        assert version is not None
+        assert not db_manager.is_registered(sample_schema.name, version=version)
+
+        db_manager.drop_namespace("tenant_a")
+        db_manager.drop_namespace("tenant_b")
+
+    def test_view_queries_local_datasets_in_namespace(self):
+        db_manager = DuckDBConnectionManager()
+        db_manager.register(
+            "view_users",
+            pd.DataFrame({"email": ["a@example.com"]}),
+            namespace="view_ns",
+        )
+        dependency = MagicMock(spec=LocalDatasetLoader)
+        loader = ViewDatasetLoader.__new__(ViewDatasetLoader)
+        loader.schema_dependencies_dict = {"view_users": dependency}
+
+        result = loader.execute_local_query(
+            "SELECT COUNT(*) AS n FROM view_users", namespace="view_ns"
+        )
+
+        assert result["n"][0] == 1
+        dependency.register_table.assert_called_once_with(namespace="view_ns")
+        db_manager.drop_namespace("view_ns")
+
+    def test_data_fingerprint_changes_with_source_file(self, sample_schema, tmp_path):
+        data_file = tmp_path / "users.csv"
+        data_file.write_text("email\ntest@example.com\n")
+        df = DataFrame(
+            {"email": ["test@example.com"]}, schema=sample_schema, path="test/test"
+        )
+
+        with patch(
+            "pandasai.data_loader.local_loader.os.path.join",
+            return_value=str(data_file),
+        ):
+            fingerprint = df.get_data_fingerprint()
+            assert df.get_data_fingerprint() == fingerprint
+
+            data_file.write_text("email\ntest@example.com\nother@example.com\n")
+            assert df.get_data_fingerprint() != fingerprint
+
+    def test_register_table_imports_into_persistent_store(
+        self, sample_schema, tmp_path
+    ):
+        data_file = tmp_path / "users.csv"
+        data_file.write_text("email\ntest@example.com\n")
+        sample_schema.name = "stored_users"
+        sample_schema.transformations = None
+        df = DataFrame({"email": ["test@example.com"]})
+        config = ConfigManager.get()
+        DuckDBConnectionManager().close()
+
+        try:
+            ConfigManager.update({"duckdb_database_path": str(tmp_path / "db")})
+            with patch(
+                "pandasai.data_loader.local_loader.os.path.join",
+                return_value=str(data_file),
+            ), patch.object(LocalDatasetLoader, "load", return_value=df) as mock_load:
+                LocalDatasetLoader(sample_schema, "test/test").register_table()
+                assert mock_load.call_count == 1
+
+                # A new process reads the imported table without loading the file
+                DuckDBConnectionManager().close()
+                ConfigManager.update({"duckdb_read_only": True})
+                LocalDatasetLoader(sample_schema, "test/test").register_table()
+                assert mock_load.call_count == 1
+
+            result = DuckDBConnectionManager().sql("SELECT email FROM stored_users")
+            assert result.fetchall() == [("test@example.com",)]
+        finally:
+            ConfigManager._config = config
+            DuckDBConnectionManager().close()
+
+    def test_load_reads_persistent_store(self, sample_schema, tmp_path):
+        data_file = tmp_path / "users.csv"
+        data_file.write_text("email\ntest@example.com\n")
+        sample_schema.name = "loaded_users"
+        sample_schema.columns = None
+        sample_schema.transformations = None
+        config = ConfigManager.get()
+        DuckDBConnectionManager().close()
+
+        try:
+            ConfigManager.update({"duckdb_database_path": str(tmp_path / "db")})
+            with patch(
+                "pandasai.data_loader.local_loader.os.path.join",
+                return_value=str(data_file),
+            ):
+                df = LocalDatasetLoader(sample_schema, "test/test").load()
+                assert df["email"].tolist() == ["test@example.com"]
+
+                # A new process reads the imported dataset instead of its file
+                DuckDBConnectionManager().close()
+                ConfigManager.update({"duckdb_read_only": True})
+                with patch.object(
+                    LocalDatasetLoader, "_load_from_local_source"
+                ) as mock_read:
+                    df = LocalDatasetLoader(sample_schema, "test/test").load()
+                    mock_read.assert_not_called()
+                assert df["email"].tolist() == ["test@example.com"]
+
+                # The file is read again once it changes
+                data_file.write_text("email\nother@example.com\n")
+                os.utime(data_file, ns=(0, 0))
+                df = LocalDatasetLoader(sample_schema, "test/test").load()
+                assert df["email"].tolist() == ["other@example.com"]
+        finally:
+            ConfigManager._config = config
+            DuckDBConnectionManager().close()
+
+    def test_agent_queries_the_stored_table(self, sample_schema, tmp_path):
+        data_file = tmp_path / "users.csv"
+        data_file.write_text("email\na@example.com\nb@example.com\n")
+        sample_schema.name = "agent_users"
+        sample_schema.columns = None
+        sample_schema.transformations = None
+        config = ConfigManager.get()
+        DuckDBConnectionManager().close()
+
+        try:
+            ConfigManager.update({"duckdb_database_path": str(tmp_path / "db")})
+            with patch(
+                "pandasai.data_loader.local_loader.os.path.join",
+                return_value=str(data_file),
+            ):
+                df = LocalDatasetLoader(sample_schema, "test/test").load()
+
+            agent = Agent(df, {"llm": FakeLLM()})
+            db_manager = DuckDBConnectionManager()
+            namespace = agent._get_namespace(db_manager)
+
+            result = agent._execute_local_sql_query(
+                "SELECT COUNT(*) AS n FROM agent_users"
+            )
+            assert result["n"][0] == 2
+            # The native table of the store is queried, not the DataFrame
+            assert db_manager._namespace_views[namespace]["agent_users"] == (
+                db_manager._get_stored_table_name("agent_users")
+            )
+
+            # Once the DataFrame changes, the DataFrame is queried
+            df.drop(index=0, inplace=True)
+            result = agent._execute_local_sql_query(
+                "SELECT COUNT(*) AS n FROM agent_users"
+            )
+            assert result["n"][0] == 1
+        finally:
+            ConfigManager._config = config
+            DuckDBConnectionManager().close()
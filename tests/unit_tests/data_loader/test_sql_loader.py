@@ -5,7 +5,8 @@ import pandas as pd
 import pytest
 
 from pandasai import VirtualDataFrame
-from pandasai.data_loader.sql_loader import SQLDatasetLoader
+from pandasai.config import ConfigManager
+from pandasai.data_loader.sql_loader import SQLDatasetLoader, memoize_data_versions
 from pandasai.dataframe.base import DataFrame
 from pandasai.exceptions import MaliciousQueryError
 
@@ -155,6 +156,144 @@ LIMIT 5"""
             assert isinstance(result, DataFrame)
             mock_sql_query.assert_called_once_with("SELECT\n  *\nFROM users", "mysql")
 
+    def test_execute_query_sends_optimized_query(self, mysql_schema):
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader._get_loader_function"
+        ) as mock_loader_function, patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader._apply_transformations"
+        ):
+            load_function = MagicMock(return_value=pd.DataFrame({"email": []}))
+            mock_loader_function.return_value = load_function
+            loader = SQLDatasetLoader(mysql_schema, "test/users")
+
+            loader.execute_query(
+                "SELECT email FROM (SELECT * FROM users) AS u WHERE first_name = 'John'"
+            )
+
+            load_function.assert_called_once_with(
+                mysql_schema.source.connection,
+                "SELECT\n  users.email AS email\nFROM users AS users\nWHERE\n  users.first_name = 'John'",
+                None,
+            )
+
+    def test_get_row_count_statistic_is_cached(self, mysql_schema):
+        SQLDatasetLoader._row_count_statistics.clear()
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader.get_row_count_estimate",
+            return_value=42,
+        ) as mock_get_row_count_estimate:
+            assert (
+                SQLDatasetLoader(mysql_schema, "test/users").get_row_count_statistic()
+                == 42
+            )
+            # A new loader for the same dataset reuses the statistic
+            assert (
+                SQLDatasetLoader(mysql_schema, "test/users").get_row_count_statistic()
+                == 42
+            )
+
+            mock_get_row_count_estimate.assert_called_once()
+
+    def test_get_row_count_statistic_unavailable(self, mysql_schema):
+        SQLDatasetLoader._row_count_statistics.clear()
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader.get_row_count_estimate",
+            side_effect=RuntimeError("connection refused"),
+        ):
+            loader = SQLDatasetLoader(mysql_schema, "test/users")
+            assert loader.get_row_count_statistic() is None
+
+    def test_get_row_count_statistic_reads_the_catalog(self, mysql_schema):
+        SQLDatasetLoader._row_count_statistics.clear()
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader._get_loader_function"
+        ) as mock_loader_function, patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader.get_row_count"
+        ) as mock_get_row_count:
+            load_function = MagicMock(return_value=pd.DataFrame({"TABLE_ROWS": [42]}))
+            mock_loader_function.return_value = load_function
+
+            loader = SQLDatasetLoader(mysql_schema, "test/users")
+            assert loader.get_row_count_statistic() == 42
+
+            # The rows are never counted, which would scan the whole table
+            mock_get_row_count.assert_not_called()
+            load_function.assert_called_once_with(
+                mysql_schema.source.connection,
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = 'test_db' AND TABLE_NAME = 'users'",
+                None,
+            )
+
+    @pytest.mark.parametrize("estimate", [None, -1])
+    def test_get_row_count_estimate_unknown(self, mysql_schema, estimate):
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader._get_loader_function"
+        ) as mock_loader_function:
+            mock_loader_function.return_value = MagicMock(
+                return_value=pd.DataFrame({"reltuples": [estimate]})
+            )
+            loader = SQLDatasetLoader(mysql_schema, "test/users")
+            assert loader.get_row_count_estimate() is None
+
+    def test_get_row_count_estimate_unsupported_source(self, mysql_schema):
+        schema = mysql_schema.model_copy(deep=True)
+        schema.source.type = "sqlite"
+        with patch(
+            "pandasai.data_loader.sql_loader.SQLDatasetLoader._get_loader_function"
+        ) as mock_loader_function:
+            loader = SQLDatasetLoader(schema, "test/users")
+            assert loader.get_row_count_estimate() is None
+            mock_loader_function.assert_not_called()
+
+    def test_get_data_version_runs_configured_query(self, mysql_schema):
+        config = ConfigManager.get()
+        loader = SQLDatasetLoader(mysql_schema, "test/users")
+        try:
+            with patch(
+                "pandasai.data_loader.sql_loader.SQLDatasetLoader.execute_query",
+                return_value=pd.DataFrame({"updated_at": ["2025-01-01"]}),
+            ) as mock_execute_query:
+                assert loader.get_data_version() is None
+                mock_execute_query.assert_not_called()
+
+                ConfigManager.update(
+                    {"sql_data_version_query": "SELECT MAX(updated_at) FROM {table}"}
+                )
+                assert loader.get_data_version() == (("2025-01-01",),)
+                mock_execute_query.assert_called_once_with(
+                    "SELECT MAX(updated_at) FROM users"
+                )
+
+                mock_execute_query.side_effect = RuntimeError("connection refused")
+                assert loader.get_data_version() is None
+        finally:
+            ConfigManager._config = config
+
+    def test_memoize_data_versions(self, mysql_schema):
+        config = ConfigManager.get()
+        ConfigManager.update(
+            {"sql_data_version_query": "SELECT MAX(updated_at) FROM {table}"}
+        )
+        try:
+            with patch(
+                "pandasai.data_loader.sql_loader.SQLDatasetLoader.execute_query",
+                return_value=pd.DataFrame({"updated_at": ["2025-01-01"]}),
+            ) as mock_execute_query:
+                with memoize_data_versions():
+                    loader = SQLDatasetLoader(mysql_schema, "test/users")
+                    assert loader.get_data_version() == (("2025-01-01",),)
+                    with memoize_data_versions():
+                        other_loader = SQLDatasetLoader(mysql_schema, "test/users")
+                        assert other_loader.get_data_version() == (("2025-01-01",),)
+                assert mock_execute_query.call_count == 1
+
+                loader.get_data_version()
+                loader.get_data_version()
+                assert mock_execute_query.call_count == 3
+        finally:
+            ConfigManager._config = config
+
     def test_mysql_malicious_with_no_import(self, mysql_schema):
         """Test loading data from a MySQL source creates a VirtualDataFrame and handles queries correctly."""
         with patch(
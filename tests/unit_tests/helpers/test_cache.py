@@ -1,6 +1,19 @@
+import hashlib
+import itertools
+import multiprocessing
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
-from pandasai.core.cache import Cache
+import duckdb
+import pytest
+
+from pandasai.constants import CACHE_TOKEN
+from pandasai.core.cache import Cache, MemoryCache
+from pandasai.core.cache_backends import CacheBackend
+from pandasai.dataframe.base import DataFrame
+from pandasai.exceptions import InvalidConfigError
 
 
 class TestCache:
@@ -26,3 +39,365 @@ class TestCache:
         assert cache.get("key") == "value"
 
         cache.destroy()
+
+    def test_set_replaces_value(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}")
+        cache.set("key", "value")
+        cache.set("key", "new value")
+
+        assert cache.get("key") == "new value"
+        assert cache.backend.connection.execute(
+            "SELECT COUNT(*) FROM cache_entries"
+        ).fetchone() == (1,)
+
+        cache.destroy()
+
+    def test_keys_are_hashed(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}")
+        cache.set("a very long conversation " * 100, "value")
+
+        (key_hash,) = cache.backend.connection.execute(
+            "SELECT key_hash FROM cache_entries"
+        ).fetchone()
+        assert len(key_hash) == 64
+        assert key_hash == cache.hashed_key("a very long conversation " * 100)
+
+        cache.destroy()
+
+    def test_cache_key_changes_with_data_version(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}")
+        df = DataFrame({"a": [1, 2, 3]})
+        context = MagicMock(dfs=[df])
+        context.memory.get_conversation.return_value = "conversation"
+
+        key = cache.get_cache_key(context)
+        assert cache.get_cache_key(context) == key
+
+        # Another structure of the same dataset gets another key
+        context.dfs = [DataFrame({"a": [1], "b": [2]}, schema=df.schema)]
+        assert cache.get_cache_key(context) != key
+
+        # So do other versions of the data of the dataset
+        context.dfs = [df]
+        with patch.object(DataFrame, "_get_data_version", return_value=(10, 1)):
+            assert cache.get_cache_key(context) != key
+
+        cache.destroy()
+
+    def test_migrate_legacy_cache(self, tmp_path):
+        legacy_connection = duckdb.connect(str(tmp_path / "cache_db_0.12.db"))
+        legacy_connection.execute("CREATE TABLE cache (key STRING, value STRING)")
+        legacy_connection.executemany(
+            "INSERT INTO cache VALUES (?, ?)",
+            [
+                [f"{CACHE_TOKEN}-key", "old value"],
+                [f"{CACHE_TOKEN}-other key", "other value"],
+                [f"{CACHE_TOKEN}-key", "new value"],
+            ],
+        )
+        legacy_connection.close()
+
+        cache = Cache(abs_path=str(tmp_path))
+
+        assert cache.get("key") == "new value"
+        assert cache.get("other key") == "other value"
+        assert not cache.backend.connection.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_name = 'cache'"
+        ).fetchone()
+
+        cache.close()
+
+    def test_ttl(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}", ttl=10)
+        with patch("pandasai.core.cache.time.time", return_value=1000):
+            cache.set("key", "value")
+            cache.set("long lived key", "value", ttl=100)
+
+        with patch("pandasai.core.cache.time.time", return_value=1009):
+            assert cache.get("key") == "value"
+        with patch("pandasai.core.cache.time.time", return_value=1011):
+            assert cache.get("key") is None
+            assert cache.get("long lived key") == "value"
+
+        assert cache.stats()["expirations"] == 1
+        cache.destroy()
+
+    def test_lru_eviction(self):
+        cache = Cache(
+            filename=f"cache_{uuid.uuid4().hex}", max_entries=2, sweep_interval=1
+        )
+        with patch("pandasai.core.cache.time.time", side_effect=itertools.count(1000)):
+            cache.set("first", "value")
+            cache.set("second", "value")
+            # Accessing the first entry makes the second the least recently used
+            assert cache.get("first") == "value"
+            cache.set("third", "value")
+
+        assert cache.get("first") == "value"
+        assert cache.get("second") is None
+        assert cache.get("third") == "value"
+        assert cache.stats()["evictions"] == 1
+        cache.destroy()
+
+    def test_max_bytes_eviction(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}", max_bytes=10)
+        with patch("pandasai.core.cache.time.time", side_effect=itertools.count(1000)):
+            cache.set("first", "12345")
+            cache.set("second", "12345")
+            cache.set("third", "12345")
+
+        # The limit is enforced by the next sweep
+        assert cache.stats()["bytes"] == 15
+        cache.sweep()
+
+        assert cache.stats()["bytes"] == 10
+        assert cache.get("first") is None
+        assert cache.get("third") == "12345"
+        cache.destroy()
+
+    def test_stats(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}")
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get("missing key")
+
+        assert cache.stats() == {
+            "memory_hits": 0,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+            "expirations": 0,
+            "entries": 1,
+            "bytes": 5,
+        }
+        cache.destroy()
+
+    def test_migrate_entries_without_eviction_columns(self, tmp_path):
+        connection = duckdb.connect(str(tmp_path / "cache_db_0.12.db"))
+        connection.execute(
+            "CREATE TABLE cache_entries (key_hash VARCHAR(64) PRIMARY KEY, value STRING)"
+        )
+        connection.execute(
+            "INSERT INTO cache_entries VALUES (?, ?)",
+            [hashlib.sha256(f"{CACHE_TOKEN}-key".encode()).hexdigest(), "value"],
+        )
+        connection.close()
+
+        cache = Cache(abs_path=str(tmp_path), max_entries=0)
+        assert cache.get("key") == "value"
+        assert cache.stats()["bytes"] == 5
+
+        cache.sweep()
+        assert cache.get("key") is None
+        cache.close()
+
+    def test_memory_cache_lru(self):
+        memory = MemoryCache(max_size=2)
+        memory.set("first", 1)
+        memory.set("second", 2)
+        assert memory.get("first") == 1
+        memory.set("third", 3)
+
+        assert memory.get("second") is None
+        assert memory.get("first") == 1
+        assert memory.get("third") == 3
+
+        with patch("pandasai.core.cache.time.time", return_value=1000):
+            memory.set("expiring", 4, expires_at=1000)
+            assert memory.get("expiring") is None
+
+    def test_validated_code_tier(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}")
+        cache.set_validated("key", "code")
+
+        assert cache.get_validated("key") == "code"
+        # The in-memory tier doesn't touch the database
+        assert cache.get("key") is None
+
+        cache.delete("key")
+        assert cache.get_validated("key") is None
+
+        cache.destroy()
+
+    def test_validated_code_tier_shared_by_the_process(self, tmp_path):
+        # e.g. the caches of the agents created by each call to `pai.chat`
+        cache = Cache(abs_path=str(tmp_path))
+        cache.set_validated("key", "code")
+
+        other_cache = Cache(abs_path=str(tmp_path))
+        assert other_cache.get_validated("key") == "code"
+        assert other_cache.stats()["memory_hits"] == 1
+
+        # Caches of other backends have their own tier
+        assert (
+            Cache(abs_path=str(tmp_path), backend="sqlite").get_validated("key") is None
+        )
+        assert (
+            Cache(filename="other", abs_path=str(tmp_path)).get_validated("key") is None
+        )
+
+        other_cache.close()
+        cache.destroy()
+        assert Cache(abs_path=str(tmp_path)).get_validated("key") is None
+
+    def test_validated_code_tier_disabled(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}", memory_size=0)
+        cache.set_validated("key", "code")
+        assert cache.get_validated("key") is None
+        cache.destroy()
+
+    @pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+    def test_backends(self, tmp_path, backend):
+        cache = Cache(
+            abs_path=str(tmp_path), backend=backend, max_entries=2, memory_size=0
+        )
+        assert cache.filepath.endswith(cache.backend.extension)
+
+        with patch("pandasai.core.cache.time.time", side_effect=itertools.count()):
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.set("expiring", "3", ttl=1)
+            cache.set("b", "20")
+
+            assert cache.get("a") == "1"
+            assert cache.get("b") == "20"
+            assert cache.get("expiring") is None
+
+            cache.set("c", "3")
+            cache.sweep()
+
+        assert cache.get("a") is None
+        assert cache.get("c") == "3"
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["evictions"] == 1
+
+        cache.delete("c")
+        assert cache.get("c") is None
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+
+        cache.destroy()
+        assert not os.path.exists(cache.filepath)
+
+    @pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+    def test_append(self, tmp_path, backend):
+        cache = Cache(abs_path=str(tmp_path), backend=backend, memory_size=0)
+
+        cache.append("key", "a\n")
+        cache.append("key", "b\n")
+
+        assert cache.get("key") == "a\nb\n"
+        assert cache.stats()["bytes"] == 4
+        cache.destroy()
+
+    @pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+    def test_backends_shared_by_threads(self, tmp_path, backend):
+        cache = Cache(abs_path=str(tmp_path), backend=backend, memory_size=0)
+
+        def set_and_get(index):
+            cache.set(f"key {index}", f"value {index}")
+            return cache.get(f"key {index}")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(executor.map(set_and_get, range(400)))
+
+        assert values == [f"value {index}" for index in range(400)]
+        assert cache.stats()["entries"] == 400
+        cache.destroy()
+
+    def test_invalid_backend(self, tmp_path):
+        with pytest.raises(InvalidConfigError, match="Unsupported cache backend"):
+            Cache(abs_path=str(tmp_path), backend="memcached")
+
+    def test_custom_backend_must_implement_iter_entries(self):
+        methods = {
+            name: lambda *args, **kwargs: None
+            for name in CacheBackend.__abstractmethods__ - {"iter_entries"}
+        }
+        IncompleteBackend = type("IncompleteBackend", (CacheBackend,), methods)
+
+        # Without it, the cache would only fail when exported
+        with pytest.raises(TypeError, match="iter_entries"):
+            IncompleteBackend()
+
+    @pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+    @pytest.mark.parametrize("extension", ["jsonl", "parquet"])
+    def test_export_import_entries(self, tmp_path, backend, extension):
+        source = Cache(abs_path=str(tmp_path / "source"), backend=backend)
+        with patch("pandasai.core.cache.time.time", return_value=1000):
+            for index in range(5):
+                source.set(f"key {index}", f"value {index}")
+            source.set("expiring", "value", ttl=10)
+            source.set("long lived", "value", ttl=1000)
+
+        path = str(tmp_path / f"cache.{extension}")
+        with patch("pandasai.core.cache.time.time", return_value=1500):
+            assert source.export_entries(path, batch_size=2) == 6
+
+            target = Cache(abs_path=str(tmp_path / "target"), backend=backend)
+            target.set("key 0", "stale value")
+            assert target.import_entries(path, batch_size=4) == 6
+
+            assert target.get("key 0") == "value 0"
+            assert target.get("key 4") == "value 4"
+            assert target.get("expiring") is None
+            assert target.get("long lived") == "value"
+            assert target.stats()["entries"] == 6
+
+        # The expiration of the entries is preserved
+        with patch("pandasai.core.cache.time.time", return_value=2001):
+            assert target.get("long lived") is None
+
+        source.destroy()
+        target.destroy()
+
+    def test_import_entries_rolls_back_on_error(self, tmp_path):
+        path = tmp_path / "cache.jsonl"
+        path.write_text('{"key_hash": "a", "value": "1"}\nnot json\n')
+        cache = Cache(abs_path=str(tmp_path), backend="sqlite")
+
+        with pytest.raises(ValueError):
+            cache.import_entries(str(path), batch_size=1)
+
+        assert cache.stats()["entries"] == 0
+        cache.destroy()
+
+    def test_export_entries_invalid_format(self, tmp_path):
+        cache = Cache(abs_path=str(tmp_path))
+
+        with pytest.raises(ValueError, match="Unsupported cache file format"):
+            cache.export_entries(str(tmp_path / "cache.csv"))
+        with pytest.raises(ValueError, match="Unsupported cache file format"):
+            cache.import_entries(str(tmp_path / "cache.jsonl"), file_format="csv")
+
+        cache.destroy()
+
+    def test_sqlite_backend_shared_by_processes(self, tmp_path):
+        cache = Cache(abs_path=str(tmp_path), backend="sqlite")
+        cache.set("parent", "value")
+
+        context = multiprocessing.get_context("fork")
+        with context.Pool(4) as pool:
+            results = pool.starmap(
+                _write_and_read_entries,
+                [(str(tmp_path), worker) for worker in range(4)],
+            )
+
+        assert results == [True] * 4
+        assert cache.stats()["entries"] == 1 + 4 * 50
+        assert cache.get("3-49") == "3-49"
+
+        cache.destroy()
+
+
+def _write_and_read_entries(cache_dir: str, worker: int) -> bool:
+    cache = Cache(abs_path=cache_dir, backend="sqlite", memory_size=0)
+    for index in range(50):
+        cache.set(f"{worker}-{index}", f"{worker}-{index}")
+
+    # Entries written by the parent and this process are visible
+    found = cache.get("parent") == "value" and all(
+        cache.get(f"{worker}-{index}") == f"{worker}-{index}" for index in range(50)
+    )
+    cache.close()
+    return found
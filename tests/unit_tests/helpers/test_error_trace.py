@@ -0,0 +1,87 @@
+import pytest
+
+from pandasai.config import Config
+from pandasai.core.code_execution.code_executor import CodeExecutor
+from pandasai.exceptions import CodeExecutionError, InvalidOutputValueMismatch
+from pandasai.helpers.error_trace import format_code_error
+
+
+def run(code, environment=None):
+    executor = CodeExecutor(Config())
+    for name, value in (environment or {}).items():
+        executor.add_to_env(name, value)
+    with pytest.raises(CodeExecutionError) as error:
+        executor.execute(code)
+    return error.value
+
+
+def test_format_code_error_keeps_the_frames_of_the_code():
+    code = "import pandas as pd\ndf = pd.DataFrame({'a': [1]})\nresult = df['b'].sum()"
+
+    trace = format_code_error(run(code), code)
+
+    assert trace == (
+        "Traceback (most recent call last):\n"
+        "  Line 3, in <module>\n"
+        "    result = df['b'].sum()\n"
+        "KeyError: 'b'"
+    )
+
+
+def test_format_code_error_of_a_function_of_the_code():
+    def execute_sql_query(query):
+        try:
+            raise ValueError("Table not found")
+        except ValueError as e:
+            raise RuntimeError(f"SQL execution failed: {e}") from e
+
+    code = "def total():\n    return execute_sql_query('SELECT 1')\n\nresult = total()"
+
+    trace = format_code_error(run(code, {"execute_sql_query": execute_sql_query}), code)
+
+    assert trace == (
+        "ValueError: Table not found\n"
+        "\n"
+        "Traceback (most recent call last):\n"
+        "  Line 4, in <module>\n"
+        "    result = total()\n"
+        "  Line 2, in total\n"
+        "    return execute_sql_query('SELECT 1')\n"
+        "RuntimeError: SQL execution failed: Table not found"
+    )
+    assert "pandasai" not in trace
+
+
+def test_format_code_error_keeps_the_root_cause_of_a_remote_query():
+    class UndefinedColumn(Exception):
+        pass
+
+    def execute_sql_query(query):
+        try:
+            raise UndefinedColumn('column "missing" does not exist')
+        except UndefinedColumn as e:
+            raise RuntimeError(
+                f"Failed to execute query for 'postgres' with: {query}"
+            ) from e
+
+    code = "df = execute_sql_query('SELECT missing FROM orders')\nresult = df"
+
+    trace = format_code_error(run(code, {"execute_sql_query": execute_sql_query}), code)
+
+    root_cause, code_error = trace.split("\n\n")
+    assert root_cause.endswith('UndefinedColumn: column "missing" does not exist')
+    assert code_error == (
+        "Traceback (most recent call last):\n"
+        "  Line 1, in <module>\n"
+        "    df = execute_sql_query('SELECT missing FROM orders')\n"
+        "RuntimeError: Failed to execute query for 'postgres' with: "
+        "SELECT missing FROM orders"
+    )
+
+
+def test_format_code_error_without_frames_of_the_code():
+    error = InvalidOutputValueMismatch("Expected a numeric value")
+
+    assert format_code_error(error) == (
+        "pandasai.exceptions.InvalidOutputValueMismatch: Expected a numeric value"
+    )
@@ -0,0 +1,263 @@
+import fnmatch
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from pandasai.core.cache import Cache
+from pandasai.core.cache_backends import RedisCacheBackend, RedisConnectionPool
+from pandasai.core.cache_backends.redis_backend import RedisConnection
+from pandasai.exceptions import CacheBackendError
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """In-process server speaking the subset of the Redis protocol the backend uses."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.password = password
+        self.data = {}
+        self.expires_at = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def run_command(self, command, state):
+        name, args = command[0].upper(), command[1:]
+        if name == b"AUTH":
+            state["authenticated"] = args[-1].decode() == self.password
+            return "+OK" if state["authenticated"] else "-WRONGPASS invalid password"
+        if self.password and not state.get("authenticated"):
+            return "-NOAUTH Authentication required."
+
+        with self.lock:
+            now = time.time()
+            for key, expires_at in list(self.expires_at.items()):
+                if expires_at <= now:
+                    self.data.pop(key, None)
+                    del self.expires_at[key]
+
+            if name == b"SELECT":
+                return "+OK"
+            if name == b"GET":
+                return self.data.get(args[0])
+            if name == b"SET":
+                self.data[args[0]] = args[1]
+                self.expires_at.pop(args[0], None)
+                if len(args) == 4 and args[2].upper() == b"PXAT":
+                    self.expires_at[args[0]] = int(args[3]) / 1000
+                return "+OK"
+            if name == b"APPEND":
+                self.data[args[0]] = self.data.get(args[0], b"") + args[1]
+                return len(self.data[args[0]])
+            if name == b"PEXPIREAT":
+                if args[0] not in self.data:
+                    return 0
+                self.expires_at[args[0]] = int(args[1]) / 1000
+                return 1
+            if name == b"DEL":
+                return sum(self.data.pop(key, None) is not None for key in args)
+            if name == b"PTTL":
+                if args[0] not in self.data:
+                    return -2
+                if args[0] not in self.expires_at:
+                    return -1
+                return int((self.expires_at[args[0]] - now) * 1000)
+            if name == b"STRLEN":
+                return len(self.data.get(args[0], b""))
+            if name == b"SCAN":
+                pattern = args[2].decode()
+                keys = [
+                    key
+                    for key in self.data
+                    if fnmatch.fnmatchcase(key.decode(), pattern)
+                ]
+                return [b"0", keys]
+        return f"-ERR unknown command '{name.decode()}'"
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        state = {}
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            self.wfile.write(self.encode(self.server.run_command(command, state)))
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        command = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            command.append(self.rfile.read(length + 2)[:-2])
+        return command
+
+    def encode(self, reply):
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"{reply}\r\n".encode()
+        if isinstance(reply, list):
+            return f"*{len(reply)}\r\n".encode() + b"".join(map(self.encode, reply))
+        return f"${len(reply)}\r\n".encode() + reply + b"\r\n"
+
+
+class TestRedisCacheBackend:
+    @pytest.fixture
+    def server(self):
+        server = FakeRedisServer()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def cache(self, server):
+        cache = Cache(backend="redis", url=server.url, memory_size=0)
+        yield cache
+        cache.close()
+
+    def test_set_get_delete(self, cache, server):
+        cache.set("key", "value")
+        cache.set("key", "new value")
+
+        assert cache.get("key") == "new value"
+        assert cache.get("missing") is None
+        assert list(server.data) == [
+            f"pandasai:cache_db_0.12:{cache.hashed_key('key')}".encode()
+        ]
+
+        cache.delete("key")
+        assert cache.get("key") is None
+
+    def test_ttl_handled_by_server(self, cache, server):
+        cache.set("key", "value", ttl=60)
+        cache.set("expired", "value", ttl=-1)
+
+        assert cache.get("expired") is None
+        ((key, expires_at),) = server.expires_at.items()
+        assert key.endswith(cache.hashed_key("key").encode())
+        assert expires_at == pytest.approx(time.time() + 60, abs=5)
+
+    def test_append(self, cache, server):
+        cache.append("key", "a\n")
+        cache.append("key", "b\n", ttl=60)
+
+        assert cache.get("key") == "a\nb\n"
+        ((key, expires_at),) = server.expires_at.items()
+        assert expires_at == pytest.approx(time.time() + 60, abs=5)
+
+    def test_batches_are_pipelined(self, cache, server):
+        items = {f"key {index}": f"value {index}" for index in range(100)}
+
+        with patch.object(
+            RedisConnection, "send", autospec=True, side_effect=RedisConnection.send
+        ) as mock_send:
+            cache.set_many(items)
+            values = cache.get_many(list(items) + ["missing"])
+
+        assert values == list(items.values()) + [None]
+        assert mock_send.call_count == 2
+        assert cache.stats()["hits"] == 100
+        assert cache.stats()["misses"] == 1
+
+    def test_connections_are_pooled(self, server):
+        pool = RedisConnectionPool.from_url(server.url, max_connections=4)
+        backend = RedisCacheBackend(pool)
+
+        def set_and_get(index):
+            backend.set(f"key_{index}", str(index), time.time())
+            return backend.get(f"key_{index}")[0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(set_and_get, range(200)))
+
+        assert results == [str(index) for index in range(200)]
+        assert 1 <= server.connections <= 4
+        backend.close()
+
+    def test_export_import_entries(self, cache, server, tmp_path):
+        cache.set("key", "value")
+        cache.set("expiring", "value", ttl=60)
+        path = str(tmp_path / "cache.jsonl")
+
+        assert cache.export_entries(path, batch_size=1) == 2
+
+        target = Cache(filename="imported", backend="redis", url=server.url)
+        assert target.import_entries(path) == 2
+        assert target.get("key") == "value"
+        assert target.get("expiring") == "value"
+
+        (key,) = [key for key in server.expires_at if b":imported:" in key]
+        assert server.expires_at[key] == pytest.approx(time.time() + 60, abs=5)
+        target.close()
+
+    def test_count_and_clear_only_own_keys(self, cache, server):
+        other_cache = Cache(
+            filename="other", backend="redis", url=server.url, memory_size=0
+        )
+        cache.set_many({"a": "12", "b": "345"})
+        other_cache.set("a", "value")
+
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["bytes"] == 5
+
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+        assert other_cache.get("a") == "value"
+        other_cache.close()
+
+    def test_authentication(self):
+        server = FakeRedisServer(password="secret")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            cache = Cache(backend="redis", url=server.url)
+            cache.set("key", "value")
+            assert cache.get("key") == "value"
+            cache.close()
+
+            wrong_password = server.url.replace("secret", "wrong")
+            with pytest.raises(CacheBackendError, match="WRONGPASS"):
+                Cache(backend="redis", url=wrong_password).get("key")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_unreachable_server(self, server):
+        host, port = server.server_address
+        server.shutdown()
+        server.server_close()
+
+        cache = Cache(backend="redis", url=f"redis://{host}:{port}")
+        with pytest.raises(CacheBackendError, match="Failed to reach"):
+            cache.get("key")
+
+    def test_custom_backend_instance(self, server):
+        backend = RedisCacheBackend.from_url(server.url, prefix="custom:")
+        cache = Cache(backend=backend)
+
+        cache.set("key", "value")
+
+        assert cache.backend is backend
+        assert cache.filepath is None
+        assert all(key.startswith(b"custom:") for key in server.data)
+        cache.close()
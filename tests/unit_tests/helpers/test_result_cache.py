@@ -0,0 +1,123 @@
+import base64
+import uuid
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pandasai.core.cache import Cache
+from pandasai.core.response import (
+    ChartResponse,
+    DataFrameResponse,
+    ErrorResponse,
+    NumberResponse,
+    StringResponse,
+)
+from pandasai.core.result_cache import ResultCache
+from pandasai.dataframe.base import DataFrame
+from pandasai.dataframe.virtual_dataframe import VirtualDataFrame
+
+
+class TestResultCache:
+    @pytest.fixture
+    def result_cache(self):
+        result_cache = ResultCache(Cache(filename=f"result_cache_{uuid.uuid4().hex}"))
+        yield result_cache
+        result_cache.cache.destroy()
+
+    @pytest.fixture
+    def df(self):
+        return DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+    def test_dataframe_result(self, result_cache, df):
+        fingerprint = ResultCache.get_data_fingerprint([df])
+        value = pd.DataFrame({"a": [1, 2], "b": ["x", None]})
+
+        assert result_cache.set("code", fingerprint, DataFrameResponse(value, "code"))
+        response = result_cache.get("code", fingerprint)
+
+        assert isinstance(response, DataFrameResponse)
+        pd.testing.assert_frame_equal(response.value, value)
+        assert response.last_code_executed == "code"
+
+    def test_series_result(self, result_cache, df):
+        fingerprint = ResultCache.get_data_fingerprint([df])
+        value = pd.Series([1, 2], name="a")
+
+        result_cache.set("code", fingerprint, DataFrameResponse(value, "code"))
+
+        pd.testing.assert_frame_equal(
+            result_cache.get("code", fingerprint).value, value.to_frame()
+        )
+
+    def test_chart_result_stored_as_image_bytes(self, result_cache, df, tmp_path):
+        fingerprint = ResultCache.get_data_fingerprint([df])
+        chart_path = tmp_path / "chart.png"
+        chart_path.write_bytes(b"\x89PNG image")
+
+        result_cache.set("code", fingerprint, ChartResponse(str(chart_path), "code"))
+        chart_path.unlink()
+        response = result_cache.get("code", fingerprint)
+
+        assert isinstance(response, ChartResponse)
+        assert response.value == "data:image/png;base64," + base64.b64encode(
+            b"\x89PNG image"
+        ).decode("ascii")
+
+    @pytest.mark.parametrize(
+        "response",
+        [NumberResponse(np.int64(42), "code"), StringResponse("answer", "code")],
+    )
+    def test_scalar_results(self, result_cache, df, response):
+        fingerprint = ResultCache.get_data_fingerprint([df])
+
+        result_cache.set("code", fingerprint, response)
+        cached_response = result_cache.get("code", fingerprint)
+
+        assert type(cached_response) is type(response)
+        assert cached_response.value == response.value
+
+    def test_unsupported_results_are_not_cached(self, result_cache, df, tmp_path):
+        fingerprint = ResultCache.get_data_fingerprint([df])
+        missing_chart = ChartResponse(str(tmp_path / "missing.png"), "code")
+
+        assert not result_cache.set("code", fingerprint, missing_chart)
+        assert not result_cache.set("code", fingerprint, ErrorResponse("code"))
+        assert result_cache.get("code", fingerprint) is None
+
+    def test_results_invalidated_when_data_changes(self, result_cache, df):
+        fingerprint = ResultCache.get_data_fingerprint([df])
+        result_cache.set("code", fingerprint, NumberResponse(6, "code"))
+
+        df.loc[0, "a"] = 10
+        new_fingerprint = ResultCache.get_data_fingerprint([df])
+
+        assert new_fingerprint != fingerprint
+        assert result_cache.get("code", new_fingerprint) is None
+        assert result_cache.get("other code", fingerprint) is None
+        assert result_cache.get("code", fingerprint).value == 6
+
+    def test_unhashable_data_has_no_fingerprint(self):
+        df = DataFrame({"a": [[1], [2]]})
+
+        assert ResultCache.get_data_fingerprint([df]) is None
+
+    def test_unversioned_virtual_data_has_no_fingerprint(self, mysql_schema):
+        loader = MagicMock()
+        loader.get_data_version.return_value = None
+        df = VirtualDataFrame(schema=mysql_schema, data_loader=loader)
+
+        assert ResultCache.get_data_fingerprint([df]) is None
+        assert ResultCache.get_data_fingerprint([df], allow_unversioned=True)
+
+    def test_virtual_data_fingerprint_changes_with_version(self, mysql_schema):
+        loader = MagicMock()
+        loader.get_data_version.return_value = (("2024-01-01",),)
+        df = VirtualDataFrame(schema=mysql_schema, data_loader=loader)
+        fingerprint = ResultCache.get_data_fingerprint([df])
+
+        loader.get_data_version.return_value = (("2024-01-02",),)
+
+        assert fingerprint is not None
+        assert ResultCache.get_data_fingerprint([df]) != fingerprint
@@ -0,0 +1,114 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from pandasai.config import Config
+from pandasai.core.cache import Cache
+from pandasai.core.semantic_cache import HashingEmbedding, SemanticCache
+
+
+class TestSemanticCache:
+    @pytest.fixture
+    def cache(self):
+        cache = Cache(filename=f"cache_{uuid.uuid4().hex}")
+        yield cache
+        cache.destroy()
+
+    def test_reuses_code_of_rephrased_question(self, cache):
+        semantic_cache = SemanticCache(cache)
+        semantic_cache.set("total sales by region", "context", "code")
+
+        assert semantic_cache.get("What are the total sales per region?", "context")
+        assert semantic_cache.get("total sales by country", "context") is None
+        assert semantic_cache.get("average age", "context") is None
+
+    def test_documented_example_matches_at_the_default_threshold(self, cache):
+        semantic_cache = SemanticCache(cache)
+        assert semantic_cache.threshold == Config().semantic_cache_threshold
+        semantic_cache.set("total sales by region", "context", "code")
+
+        assert (
+            semantic_cache.get("What are the total sales for each region?", "context")
+            == "code"
+        )
+        # The same words in another order are not matched
+        assert semantic_cache.get("sales per region total", "context") is None
+
+    def test_questions_of_other_contexts_are_not_reused(self, cache):
+        semantic_cache = SemanticCache(cache)
+        semantic_cache.set("total sales by region", "context", "code")
+
+        assert semantic_cache.get("total sales by region", "other context") is None
+
+    def test_returns_most_similar_question(self, cache):
+        semantic_cache = SemanticCache(cache, threshold=0.5)
+        semantic_cache.set("total sales by region", "context", "sales code")
+        semantic_cache.set("total revenue by region", "context", "revenue code")
+
+        assert semantic_cache.get("revenue per region total", "context") == (
+            "revenue code"
+        )
+
+    def test_index_stored_in_cache(self, cache):
+        SemanticCache(cache).set("total sales by region", "context", "code")
+
+        assert SemanticCache(cache).get("total sales per region", "context") == "code"
+
+    def test_concurrent_writes_keep_all_questions(self, cache):
+        semantic_cache = SemanticCache(cache)
+        questions = [f"total sales of product {index}" for index in range(40)]
+
+        def add(index):
+            # Each writer has its own instance, like the agents of a process
+            SemanticCache(cache).set(questions[index], "context", f"code {index}")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(add, range(40)))
+
+        for index, question in enumerate(questions):
+            assert semantic_cache.get(question, "context") == f"code {index}"
+
+    def test_writers_of_other_processes_keep_all_questions(self, cache):
+        SemanticCache(cache).set("total sales by region", "context", "sales code")
+
+        # Another process read the questions before the first one was added
+        other_process = SemanticCache(cache)
+        with patch.object(other_process, "_load_question_hashes", return_value=[]):
+            other_process.set("average age by country", "context", "age code")
+
+        semantic_cache = SemanticCache(cache)
+        assert semantic_cache.get("total sales by region", "context") == "sales code"
+        assert semantic_cache.get("average age by country", "context") == "age code"
+
+    def test_custom_embedding_function(self, cache):
+        def embed(texts):
+            return [[1.0, float("sales" in text)] for text in texts]
+
+        semantic_cache = SemanticCache(cache, embedding_function=embed, threshold=0.99)
+        semantic_cache.set("sales", "context", "code")
+
+        assert semantic_cache.get("how much did we sell? sales", "context") == "code"
+        assert semantic_cache.get("costs", "context") is None
+
+        # Embeddings of another function are ignored
+        semantic_cache.embedding_function = HashingEmbedding(dimensions=8)
+        assert semantic_cache.get("sales", "context") is None
+
+    def test_hashing_embedding_ignores_stop_words(self):
+        embed = HashingEmbedding()
+
+        assert embed(["What are the total sales by region?"]) == embed(
+            ["total sales region"]
+        )
+
+    def test_hashing_embedding_keeps_word_order(self, cache):
+        embed = HashingEmbedding()
+        first, second = np.array(
+            embed(["ratio of revenue to cost", "ratio of cost to revenue"])
+        )
+
+        similarity = first @ second / np.linalg.norm(first) / np.linalg.norm(second)
+        assert similarity < SemanticCache(cache).threshold
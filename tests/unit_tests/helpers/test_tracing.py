@@ -0,0 +1,78 @@
+import contextvars
+import json
+import threading
+
+import pytest
+
+from pandasai.core.tracing import start_span, start_trace
+
+
+def test_spans_are_nested():
+    with start_trace("chat", query="How many rows?") as trace:
+        with start_span("code_generation"):
+            with start_span("llm_call") as llm_call:
+                pass
+        with start_span("execute_sql_query", query="SELECT 1") as sql_query:
+            sql_query.set_attribute("rows", 1)
+
+    assert [child.name for child in trace.children] == [
+        "code_generation",
+        "execute_sql_query",
+    ]
+    assert trace.find("llm_call") == [llm_call]
+    assert trace.attributes == {"query": "How many rows?"}
+    assert sql_query.attributes == {"query": "SELECT 1", "rows": 1}
+    assert trace.duration >= llm_call.duration >= 0
+
+
+def test_span_outside_of_a_trace():
+    with start_span("llm_call") as span:
+        assert span is None
+
+
+def test_spans_of_threads():
+    def execute():
+        with start_span("code_execution"):
+            pass
+
+    with start_trace("chat") as trace:
+        with start_span("candidates"):
+            threads = [
+                threading.Thread(target=contextvars.copy_context().run, args=(execute,))
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    assert len(trace.find("candidates")[0].children) == 3
+
+
+def test_error_and_export():
+    exported = []
+
+    with pytest.raises(ValueError):
+        with start_trace("chat", exported.append) as trace:
+            with start_span("llm_call"):
+                raise ValueError("No response")
+
+    assert exported == [trace]
+    assert trace.error == trace.children[0].error == "ValueError: No response"
+    duration = trace.duration
+    assert trace.duration == duration
+
+    exported_trace = json.loads(trace.to_json())
+    assert exported_trace["name"] == "chat"
+    assert exported_trace["children"][0]["name"] == "llm_call"
+    assert exported_trace["children"][0]["duration"] >= 0
+
+
+def test_exporter_errors_are_ignored():
+    def exporter(span):
+        raise RuntimeError("Exporter unavailable")
+
+    with start_trace("chat", exporter) as trace:
+        pass
+
+    assert trace.error is None
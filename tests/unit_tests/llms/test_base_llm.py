@@ -1,10 +1,15 @@
 """Unit tests for the base LLM class"""
 
+import asyncio
+import threading
+
 import pytest
 
+from pandasai.core.prompts.base import BasePrompt
 from pandasai.exceptions import APIKeyNotFoundError, NoCodeFoundError
 from pandasai.helpers.memory import Memory
 from pandasai.llm import LLM
+from pandasai.llm.fake import FakeLLM
 
 
 class TestBaseLLM:
@@ -136,3 +141,53 @@ print('Hello World')
 
     def test_prepend_system_prompt_with_memory_none(self):
         assert LLM().prepend_system_prompt("hello world", None) == "hello world"
+
+    def test_acall_runs_call_in_a_thread(self):
+        llm = FakeLLM()
+        llm.response = "```python\nprint('Hello World')\n```"
+        threads = []
+        call = llm.call
+
+        def call_in_thread(instruction, context=None):
+            threads.append(threading.current_thread())
+            return call(instruction, context)
+
+        llm.call = call_in_thread
+
+        class MockBasePrompt(BasePrompt):
+            template: str = "instruction"
+
+        code = asyncio.run(llm.agenerate_code(MockBasePrompt(), None))
+
+        assert code == "print('Hello World')"
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_generate_code_candidates(self):
+        llm = FakeLLM()
+        responses = ["```python\nprint('a')\n```", "I don't know", "print('b')"]
+        lock = threading.Lock()
+        threads = set()
+
+        def call(instruction, context=None):
+            with lock:
+                threads.add(threading.current_thread())
+                return responses.pop(0)
+
+        llm.call = call
+
+        class MockBasePrompt(BasePrompt):
+            template: str = "instruction"
+
+        codes = llm.generate_code_candidates(MockBasePrompt(), None, 3)
+
+        assert sorted(codes) == ["print('a')", "print('b')"]
+        assert threading.main_thread() not in threads
+
+    def test_generate_code_candidates_without_code(self):
+        llm = FakeLLM(output="I don't know")
+
+        class MockBasePrompt(BasePrompt):
+            template: str = "instruction"
+
+        with pytest.raises(NoCodeFoundError):
+            llm.generate_code_candidates(MockBasePrompt(), None, 2)
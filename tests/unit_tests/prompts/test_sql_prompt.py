@@ -73,8 +73,10 @@ class TestGeneratePythonCodeWithSQLPrompt:
 
 You are already provided with the following functions that you can call:
 <function>
-def execute_sql_query(sql_query: str) -> pd.Dataframe
-    """This method connects to the database, executes the sql query and returns the dataframe"""
+def execute_sql_query(sql_query: str, dtype_backend: str = None, chunksize: int = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]
+    """This method connects to the database, executes the sql query and returns the dataframe.
+    Pass dtype_backend="pyarrow" to get Arrow-backed columns, which use less memory for large text results.
+    Pass chunksize to get an iterator of dataframes of at most chunksize rows instead, to process very large results incrementally."""
 </function>
 
 
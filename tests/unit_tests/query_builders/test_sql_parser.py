@@ -1,4 +1,6 @@
+import duckdb
 import pytest
+from sqlglot import exp, parse_one
 
 from pandasai.exceptions import MaliciousQueryError
 from pandasai.query_builders.sql_parser import SQLParser
@@ -81,6 +83,151 @@ JOIN "department" AS d
         result = SQLParser.replace_table_and_column_names(query, table_mapping)
         assert result.strip() == expected.strip()
 
+    def test_replace_table_names_with_parsed_mapping(self):
+        parsed_mapping = SQLParser.parse_table_mapping(
+            {"orders": "(SELECT * FROM sales) AS orders"}
+        )
+        expected = SQLParser.replace_table_and_column_names(
+            "SELECT * FROM orders", {"orders": "(SELECT * FROM sales) AS orders"}
+        )
+
+        # The parsed mapping can be reused without being altered
+        for _ in range(2):
+            result = SQLParser.replace_table_and_column_names(
+                "SELECT * FROM orders", parsed_mapping
+            )
+            assert result == expected
+
+    def test_parse_table_mapping_invalid_expression(self):
+        with pytest.raises(ValueError, match="is not a valid SQL expression"):
+            SQLParser.parse_table_mapping({"orders": "SELECT FROM ("})
+
+    def test_optimize_query_pushes_predicates_into_subqueries(self):
+        query = """SELECT b FROM (
+    SELECT t.a AS a, t.b AS b, t.c AS c FROM (SELECT * FROM t) AS t
+) AS v WHERE a = 1"""
+
+        before = parse_one(query)
+        after = parse_one(SQLParser.optimize_query(query))
+
+        # Before: the filter is applied on top of two nested subqueries
+        assert len(list(before.find_all(exp.Subquery))) == 2
+        assert before.args["where"] is not None
+
+        # After: the subqueries are merged and the filter hits the table directly
+        assert not list(after.find_all(exp.Subquery))
+        assert after.args["from"].this.name == "t"
+        assert after.args["where"].sql() == "WHERE t.a = 1"
+        assert [projection.alias_or_name for projection in after.selects] == ["b"]
+
+    def test_optimize_query_keeps_unnamed_projections(self):
+        query = "SELECT COUNT(*), MAX(a) FROM (SELECT a FROM t) AS v"
+        optimized = parse_one(SQLParser.optimize_query(query))
+        assert [projection.output_name for projection in optimized.selects] == [
+            "",
+            "",
+        ]
+
+    def test_optimize_query_keeps_quoted_output_names(self):
+        query = (
+            'SELECT "Region", "Total", amount AS "Amount", v.code FROM '
+            '(SELECT "Region", "Total", amount, code FROM "sales") AS "v" '
+            "WHERE \"Region\" = 'EU'"
+        )
+        optimized = parse_one(SQLParser.optimize_query(query))
+
+        assert not list(optimized.find_all(exp.Subquery))
+        # Unquoted, the mixed-case names would be folded, e.g. by Postgres
+        assert [
+            (projection.args["alias"].name, projection.args["alias"].quoted)
+            for projection in optimized.selects
+        ] == [("Region", True), ("Total", True), ("Amount", True), ("code", False)]
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            # Filter on the top 3 rows by amount
+            "SELECT * FROM (SELECT name, amount FROM sales ORDER BY amount DESC "
+            "LIMIT 3) AS t WHERE name LIKE 'A%'",
+            "SELECT * FROM (SELECT name, amount FROM sales ORDER BY amount "
+            "LIMIT 3 OFFSET 2) AS t WHERE name LIKE 'A%'",
+            "SELECT COUNT(*) AS n FROM (SELECT DISTINCT name FROM sales) AS t "
+            "WHERE name <> 'Bob'",
+            "SELECT * FROM (SELECT name, SUM(amount) AS total FROM sales "
+            "GROUP BY name) AS t WHERE total > 20",
+            "SELECT * FROM (SELECT name, amount, ROW_NUMBER() OVER "
+            "(ORDER BY amount) AS rn FROM sales) AS t WHERE name = 'Bob'",
+            "SELECT * FROM (SELECT MAX(amount) AS top FROM sales) AS t "
+            "WHERE top > 100",
+        ],
+    )
+    def test_optimize_query_keeps_set_dependent_subqueries(self, query):
+        connection = duckdb.connect()
+        connection.execute(
+            "CREATE TABLE sales AS SELECT * FROM (VALUES "
+            "('Alice', 10), ('Bob', 30), ('Ann', 20), ('Bob', 5), "
+            "('Carl', 40), ('Amy', 1)) AS v(name, amount)"
+        )
+
+        optimized = SQLParser.optimize_query(query)
+
+        assert optimized == query
+        assert sorted(connection.execute(optimized).fetchall()) == sorted(
+            connection.execute(query).fetchall()
+        )
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "SELECT email FROM users WHERE first_name = 'John'",
+            "DROP TABLE users",
+            "not a query",
+        ],
+    )
+    def test_optimize_query_leaves_other_queries_untouched(self, query):
+        assert SQLParser.optimize_query(query) == query
+
+    @pytest.mark.parametrize(
+        "query, expected",
+        [
+            ("SELECT * FROM users", "SELECT\n  *\nFROM users\nLIMIT 10"),
+            ("SELECT * FROM users LIMIT 500", "SELECT\n  *\nFROM users\nLIMIT 10"),
+            ("SELECT * FROM users LIMIT 5", "SELECT * FROM users LIMIT 5"),
+            ("DROP TABLE users", "DROP TABLE users"),
+        ],
+    )
+    def test_limit_query(self, query, expected):
+        assert SQLParser.limit_query(query, 10) == expected
+
+    def test_sample_query(self):
+        query = "SELECT * FROM sales AS s JOIN regions AS r ON s.region_id = r.id"
+        sampled = SQLParser.sample_query(query, 100)
+
+        assert (
+            sampled
+            == """SELECT
+  *
+FROM sales AS s TABLESAMPLE (100 ROWS)
+JOIN regions AS r
+  ON s.region_id = r.id"""
+        )
+
+    def test_sample_query_from_subquery_is_untouched(self):
+        query = "SELECT * FROM (SELECT * FROM sales) AS s"
+        assert SQLParser.sample_query(query, 100) == query
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "SELECT COUNT(*) FROM sales",
+            "SELECT region, amount FROM sales GROUP BY region, amount",
+            "SELECT DISTINCT region FROM sales",
+            "SELECT amount, SUM(amount) OVER () AS total FROM sales",
+        ],
+    )
+    def test_sample_query_aggregating_query_is_untouched(self, query):
+        assert SQLParser.sample_query(query, 100) == query
+
     def test_mysql_transpilation(self):
         query = '''SELECT COUNT(*) AS "total_rows"'''
         expected = """SELECT\n  COUNT(*) AS `total_rows`"""
@@ -1,9 +1,10 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from pandasai.data_loader.semantic_layer_schema import SemanticLayerSchema
 from pandasai.data_loader.sql_loader import SQLDatasetLoader
+from pandasai.query_builders.sql_parser import SQLParser
 from pandasai.query_builders.sql_query_builder import SqlQueryBuilder
 from pandasai.query_builders.view_query_builder import ViewQueryBuilder
 
@@ -335,6 +336,102 @@ FROM (
 ) AS patient_records"""
         )
 
+    def test_star_schema_join_order_uses_row_counts(self):
+        """Test the fact table is joined last when row counts are available."""
+        schema_dict = {
+            "name": "sales_by_region",
+            "columns": [
+                {"name": "sales.amount"},
+                {"name": "regions.name"},
+                {"name": "products.name"},
+            ],
+            "relations": [
+                {"from": "sales.region_id", "to": "regions.id"},
+                {"from": "sales.product_id", "to": "products.id"},
+            ],
+            "view": "true",
+        }
+        schema = SemanticLayerSchema(**schema_dict)
+        dependencies = {
+            "sales": self._create_mock_loader("sales"),
+            "regions": self._create_mock_loader("regions"),
+            "products": self._create_mock_loader("products"),
+        }
+        dependencies["sales"].get_row_count_statistic.return_value = 1_000_000
+        dependencies["regions"].get_row_count_statistic.return_value = 10
+        dependencies["products"].get_row_count_statistic.return_value = 500
+        query_builder = ViewQueryBuilder(schema, dependencies)
+
+        assert (
+            query_builder._get_table_expression()
+            == """(
+  SELECT
+    sales.amount AS sales_amount,
+    regions.name AS regions_name,
+    products.name AS products_name
+  FROM (
+    SELECT
+      *
+    FROM regions
+  ) AS regions
+  JOIN (
+    SELECT
+      *
+    FROM sales
+  ) AS sales
+    ON sales.region_id = regions.id
+  JOIN (
+    SELECT
+      *
+    FROM products
+  ) AS products
+    ON sales.product_id = products.id
+) AS sales_by_region"""
+        )
+
+    def test_chain_join_order_uses_row_counts(self):
+        """Test the smallest table is selected first and the others follow by size."""
+        schema_dict = {
+            "name": "orders_chain",
+            "columns": [
+                {"name": "customers.name"},
+                {"name": "orders.total"},
+                {"name": "items.sku"},
+            ],
+            "relations": [
+                {"from": "customers.id", "to": "orders.customer_id"},
+                {"from": "orders.id", "to": "items.order_id"},
+            ],
+            "view": "true",
+        }
+        schema = SemanticLayerSchema(**schema_dict)
+        dependencies = {
+            "customers": self._create_mock_loader("customers"),
+            "orders": self._create_mock_loader("orders"),
+            "items": self._create_mock_loader("items"),
+        }
+        dependencies["customers"].get_row_count_statistic.return_value = 5_000
+        dependencies["orders"].get_row_count_statistic.return_value = 50_000
+        dependencies["items"].get_row_count_statistic.return_value = 100
+        query_builder = ViewQueryBuilder(schema, dependencies)
+
+        first_dataset, joins = query_builder._get_join_order()
+
+        assert first_dataset == "items"
+        assert joins == [
+            ("orders", ["orders.id = items.order_id"]),
+            ("customers", ["customers.id = orders.customer_id"]),
+        ]
+
+    def test_join_order_without_row_counts(self, view_query_builder):
+        for loader in view_query_builder.schema_dependencies_dict.values():
+            loader.get_row_count_statistic.return_value = None
+
+        assert view_query_builder._get_join_order() == (
+            "parents",
+            [("children", ["parents.id = children.id"])],
+        )
+
     def test_column_name_comment_injection(self, view_query_builder):
         view_query_builder.schema.columns[0].name = "column --"
         query = view_query_builder.build_query()
@@ -362,3 +459,47 @@ FROM (
     ON parents.id = children.id
 ) AS parent_children"""
         )
+
+    def test_table_expression_is_compiled_once(self, view_query_builder):
+        parents_loader = view_query_builder.schema_dependencies_dict["parents"]
+        with patch.object(
+            parents_loader.query_builder,
+            "build_query",
+            wraps=parents_loader.query_builder.build_query,
+        ) as mock_build_query:
+            first = view_query_builder._get_table_expression()
+            view_query_builder.build_query()
+            view_query_builder.get_head_query()
+            assert view_query_builder._get_table_expression() == first
+
+        assert mock_build_query.call_count == 1
+
+    def test_table_expression_is_recompiled_on_schema_change(self, view_query_builder):
+        view_query_builder._get_table_expression()
+        view_query_builder.schema.name = "parents_with_children"
+
+        assert view_query_builder._get_table_expression().endswith(
+            ") AS parents_with_children"
+        )
+
+        children_loader = view_query_builder.schema_dependencies_dict["children"]
+        children_loader.schema.source.table = "kids"
+
+        assert "FROM kids" in view_query_builder._get_table_expression()
+
+    def test_optimized_query_pushes_filter_into_view(self, view_query_builder):
+        query = SQLParser.replace_table_and_column_names(
+            "SELECT children_name FROM parent_children WHERE parents_name = 'EU'",
+            {"parent_children": view_query_builder._get_table_expression()},
+        )
+
+        assert (
+            SQLParser.optimize_query(query)
+            == """SELECT
+  children.name AS "children_name"
+FROM "parents" AS parents
+JOIN "children" AS children
+  ON children.id = parents.id
+WHERE
+  parents.name = 'EU'"""
+        )
@@ -0,0 +1,194 @@
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+import pandasai as pai
+from pandasai.exceptions import WorkerPoolBusyError, WorkerPoolError
+from pandasai.helpers.path import find_project_root
+from pandasai.llm.fake import FakeLLM
+from pandasai.server import WorkerPool, create_server
+
+# The tests start worker processes
+pytestmark = pytest.mark.slow
+
+
+class PoolFakeLLM(FakeLLM):
+    """Fake LLM answering the questions of the tests"""
+
+    def call(self, instruction, context=None) -> str:
+        question = context.memory.get_last_message()
+        if "slow" in question:
+            time.sleep(0.5)
+        if "unknown" in question:
+            raise ValueError("Unknown question")
+        offset = question.split()[-1] if question.split()[-1].isdigit() else 0
+        return (
+            "result = {'type': 'number', 'value': "
+            f"execute_sql_query('SELECT SUM(a) + {offset} AS n FROM sales')['n'][0]}}"
+        )
+
+
+def configure_llm():
+    pai.config.set({"llm": PoolFakeLLM(), "save_logs": False})
+
+
+def fail_to_start():
+    raise RuntimeError("No LLM available")
+
+
+@pytest.fixture(scope="module")
+def project():
+    pai.create("test-org/sales", pai.DataFrame(pd.DataFrame({"a": [1, 2, 3]})))
+    yield
+    shutil.rmtree(os.path.join(find_project_root(), "datasets", "test-org", "sales"))
+
+
+@pytest.fixture(scope="module")
+def pool(project):
+    # Starting workers takes seconds, so the tests share the pool when they can
+    with WorkerPool(
+        ["test-org/sales"], workers=2, max_concurrency=2, initializer=configure_llm
+    ) as pool:
+        yield pool
+
+
+def post(url, body, **kwargs):
+    request = urllib.request.Request(
+        url, json.dumps(body).encode(), {"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, **kwargs) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestWorkerPool:
+    def test_chat(self, pool):
+        futures = [pool.submit(f"Total {index}?") for index in range(8)]
+
+        responses = [future.result(timeout=30) for future in futures]
+
+        assert all(response["type"] == "number" for response in responses)
+        assert all(response["value"] == 6 for response in responses)
+        assert responses[0]["trace"]["name"] == "chat"
+        assert pool.stats() == {
+            "accepting": True,
+            "workers": 2,
+            "pending": 0,
+            "running": 0,
+        }
+
+    def test_failed_question(self, pool):
+        with pytest.raises(WorkerPoolError, match="Unknown question"):
+            pool.chat("An unknown question", timeout=30)
+
+        with pytest.raises(WorkerPoolError, match="not loaded by the server"):
+            pool.chat("Total?", datasets=["test-org/other"], timeout=30)
+
+    def test_workers_share_the_cache(self, pool):
+        responses = [pool.chat("Cached total?", timeout=30) for _ in range(3)]
+
+        assert all(response["value"] == 6 for response in responses)
+
+    def test_threads_of_a_worker_share_the_cache(self, pool):
+        # Once to cache the code, then from the cache
+        for _ in range(2):
+            futures = [pool.submit(f"Total plus {index}") for index in range(12)]
+            values = [future.result(timeout=30)["value"] for future in futures]
+
+            assert values == [6 + index for index in range(12)]
+
+    def test_http_api(self, pool):
+        server = create_server(pool, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = "http://{}:{}".format(*server.server_address)
+        try:
+            status, body = post(f"{url}/chat", {"query": "Total?"}, timeout=30)
+            assert status == 200
+            assert body["response"]["value"] == 6
+
+            status, body = post(f"{url}/chat", {"question": "Total?"}, timeout=30)
+            assert status == 400
+
+            status, body = post(f"{url}/chat", {"query": "An unknown question"})
+            assert status == 500
+            assert "Unknown question" in body["error"]
+
+            with urllib.request.urlopen(f"{url}/health", timeout=30) as response:
+                assert json.loads(response.read())["status"] == "ok"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_unix_socket_api(self, pool, tmp_path):
+        socket_path = str(tmp_path / "pandasai.sock")
+        server = create_server(pool, socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            body = json.dumps({"query": "Total?"}).encode()
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                client.sendall(
+                    b"POST /chat HTTP/1.0\r\nContent-Length: "
+                    + str(len(body)).encode()
+                    + b"\r\n\r\n"
+                    + body
+                )
+                reply = b""
+                while chunk := client.recv(4096):
+                    reply += chunk
+
+            headers, content = reply.split(b"\r\n\r\n", 1)
+            assert headers.startswith(b"HTTP/1.0 200")
+            assert json.loads(content)["response"]["value"] == 6
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_queue_and_draining(self, project):
+        pool = WorkerPool(
+            ["test-org/sales"],
+            workers=1,
+            max_concurrency=1,
+            max_queue_size=1,
+            initializer=configure_llm,
+        )
+        pool.start()
+
+        future = pool.submit("A slow question")
+        with pytest.raises(
+            WorkerPoolBusyError, match="queue of the worker pool is full"
+        ):
+            pool.submit("Total?")
+
+        # The pending questions are answered before the workers stop
+        pool.close()
+        assert future.result(timeout=0)["value"] == 6
+        assert pool.stats()["workers"] == 0
+        with pytest.raises(WorkerPoolBusyError, match="not accepting"):
+            pool.submit("Total?")
+
+    def test_worker_fails_to_start(self, project):
+        pool = WorkerPool(["test-org/sales"], workers=1, initializer=fail_to_start)
+
+        with pytest.raises(WorkerPoolError, match="No LLM available"):
+            pool.start()
+
+        pool.close()
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError, match="At least one dataset"):
+            WorkerPool([])
+        with pytest.raises(ValueError, match="positive integers"):
+            WorkerPool(["test-org/sales"], max_concurrency=0)